@@ -0,0 +1,244 @@
+"""
+无界面批处理入口
+
+对一个目录或通配符匹配到的多个 xlsx 文件运行指定插件，不创建 QApplication 窗口。
+文件在进程池中并发处理，每个文件完成后立即以一行 JSON 输出结果（耗时、修改数量、错误）。
+读取时以只读模式流式加载到 ColumnTableHandle，只有存在修改时才完整加载工作簿，写回修改的值和背景色。
+
+用法示例：
+    python batch.py xzltxs data/2024-06/*.xlsx --output-dir out --workers 4
+    python batch.py xzltxs data/2024-06 --dry-run
+"""
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from logging_config import setup_logging, setup_worker_logging
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUGIN_DIR = os.path.join(ROOT_DIR, 'plugin_manager', 'plugins')
+
+# 每个工作进程中的插件实例，由 _init_worker 初始化
+_worker_plugin = None
+_worker_parameters: Dict[str, Any] = {}
+
+
+def collect_files(patterns: List[str]) -> List[str]:
+    """把目录和通配符展开为 xlsx 文件列表，去重并保持顺序"""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, '*.xlsx')))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+        for path in matches:
+            # 跳过 Excel 打开文件时产生的锁文件
+            if os.path.basename(path).startswith('~$'):
+                continue
+            path = os.path.abspath(path)
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def get_input_root(files: List[str]) -> str:
+    """所有输入文件的公共父目录，--output-dir 模式下按相对它的路径保存结果"""
+    try:
+        return os.path.commonpath([os.path.dirname(path) for path in files])
+    except ValueError:
+        # Windows 下文件位于不同盘符，没有公共目录
+        return ''
+
+
+def get_output_path(file_path: str, output_dir: Optional[str], in_place: bool, input_root: str = '') -> str:
+    """
+    计算处理结果的保存路径
+
+    指定 output_dir 时保留文件相对 input_root 的子目录，
+    不同目录下的同名文件不会互相覆盖；input_root 为空时只使用文件名。
+    """
+    if in_place:
+        return file_path
+    if output_dir:
+        relative = os.path.relpath(file_path, input_root) if input_root else os.path.basename(file_path)
+        return os.path.join(output_dir, relative)
+    stem, ext = os.path.splitext(file_path)
+    return f"{stem}.processed{ext}"
+
+
+def get_output_paths(files: List[str], output_dir: Optional[str], in_place: bool,
+                     input_root: Optional[str] = None) -> Dict[str, str]:
+    """计算所有文件的保存路径，多个文件的保存路径相同时抛出 ValueError"""
+    if input_root is None:
+        input_root = get_input_root(files)
+    output_paths = {path: get_output_path(path, output_dir, in_place, input_root) for path in files}
+    # 没有公共目录时只能使用文件名，同名文件会互相覆盖
+    if len(set(output_paths.values())) != len(output_paths):
+        raise ValueError('多个输入文件的保存路径相同，请分别处理')
+    return output_paths
+
+
+def _to_argb(color: Tuple[int, int, int]) -> str:
+    """(R, G, B) 元组转换为 openpyxl 使用的十六进制颜色"""
+    return 'FF%02X%02X%02X' % color
+
+
+def _init_worker(plugin_name: str, config: Dict[str, Any], permissions: int,
+                 parameters: Dict[str, Any], log_queue) -> None:
+    """
+    工作进程初始化：只加载并激活目标插件，每个进程只执行一次
+
+    插件配置和已授予的权限由主进程读取后传入，工作进程不打开插件存储，
+    也不创建插件系统的事件总线、执行服务和异步运行器。
+    """
+    global _worker_plugin, _worker_parameters
+    # 日志交给主进程写入，多个进程不会同时轮转同一个日志文件
+    setup_worker_logging(log_queue)
+    from plugin_manager.utils.plugin_loader import PluginLoader
+
+    _worker_plugin = PluginLoader(PLUGIN_DIR).load_standalone(plugin_name, permissions, config)
+    if not hasattr(_worker_plugin, 'process_table'):
+        raise RuntimeError(f"插件 {plugin_name} 不支持无界面运行")
+
+    # 插件配置作为默认参数，命令行参数优先
+    _worker_parameters = dict(config)
+    _worker_parameters.update(parameters)
+
+
+def process_file(file_path: str, output_path: str, sheet_name: Optional[str]) -> Dict[str, Any]:
+    """在工作进程中处理单个文件，返回结构化结果"""
+    import openpyxl
+    from openpyxl.styles import PatternFill
+    from plugin_manager.core.table_handle import ColumnTableHandle
+
+    result = {'file': file_path, 'output': None, 'status': 'ok', 'changes': None}
+    timings = {}
+    start = time.perf_counter()
+    try:
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            worksheet = workbook[sheet_name] if sheet_name else workbook.active
+            table = ColumnTableHandle.from_worksheet(worksheet)
+        finally:
+            workbook.close()
+        timings['load'] = time.perf_counter() - start
+
+        step = time.perf_counter()
+        result['changes'] = _worker_plugin.process_table(table, **_worker_parameters)
+        timings['process'] = time.perf_counter() - step
+
+        if _worker_plugin.write_mode != 'dry_run' and (table.changes or table.colors):
+            step = time.perf_counter()
+            workbook = openpyxl.load_workbook(file_path)
+            worksheet = workbook[sheet_name] if sheet_name else workbook.active
+            for (row, col), value in table.changes.items():
+                worksheet.cell(row=row + 1, column=col + 1).value = value
+            # 同一种颜色共用一个 PatternFill
+            fills = {}
+            for (row, col), color in table.colors.items():
+                if color not in fills:
+                    argb = _to_argb(color)
+                    fills[color] = PatternFill(start_color=argb, end_color=argb, fill_type='solid')
+                worksheet.cell(row=row + 1, column=col + 1).fill = fills[color]
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            workbook.save(output_path)
+            timings['save'] = time.perf_counter() - step
+            result['output'] = output_path
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+        logging.getLogger(__name__).debug(traceback.format_exc())
+
+    timings['total'] = time.perf_counter() - start
+    result['seconds'] = {key: round(value, 4) for key, value in timings.items()}
+    return result
+
+
+def parse_parameters(items: List[str]) -> Dict[str, Any]:
+    """解析 key=value 形式的插件参数，整数值自动转换"""
+    parameters = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"参数格式应为 key=value: {item}")
+        try:
+            parameters[key] = int(value)
+        except ValueError:
+            parameters[key] = value
+    return parameters
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="对多个 xlsx 文件批量运行插件（无界面）")
+    parser.add_argument('plugin', help="插件名称，例如 xzltxs")
+    parser.add_argument('paths', nargs='+', help="xlsx 文件、目录或通配符")
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument('--output-dir',
+                              help="结果保存目录，保留相对输入文件公共目录的子目录；默认保存为 <文件名>.processed.xlsx")
+    output_group.add_argument('--in-place', action='store_true', help="直接覆盖原文件")
+    parser.add_argument('--sheet', help="要处理的工作表，默认处理活动工作表")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="并发进程数")
+    parser.add_argument('--dry-run', action='store_true', help="只统计将要修改的单元格，不保存文件")
+    parser.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                        help="插件参数，可重复，例如 --param start_row=3")
+    args = parser.parse_args(argv)
+
+    log_queue = multiprocessing.Queue()
+    setup_logging(log_queue=log_queue)
+    parameters = parse_parameters(args.param)
+    if args.dry_run:
+        parameters['write_mode'] = 'dry_run'
+
+    files = collect_files(args.paths)
+    if not files:
+        print(json.dumps({'status': 'error', 'error': '没有找到 xlsx 文件'}, ensure_ascii=False))
+        return 2
+
+    try:
+        output_paths = get_output_paths(files, args.output_dir, args.in_place)
+    except ValueError as e:
+        print(json.dumps({'status': 'error', 'error': str(e)}, ensure_ascii=False))
+        return 2
+
+    from plugin_manager.core.plugin_system import read_plugin_settings
+    # 配置和权限只在主进程中读取一次，旧版文件的导入也只在这里执行
+    config, permissions = read_plugin_settings(PLUGIN_DIR, args.plugin)
+
+    start = time.perf_counter()
+    failed = 0
+    workers = max(1, min(args.workers, len(files)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(args.plugin, config, permissions, parameters, log_queue)) as executor:
+        futures = {
+            executor.submit(process_file, path, output_paths[path], args.sheet): path
+            for path in files
+        }
+        # 每个文件完成后立即输出一行结果
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'file': futures[future], 'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+            if result['status'] != 'ok':
+                failed += 1
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    print(json.dumps({
+        'status': 'done',
+        'files': len(files),
+        'failed': failed,
+        'seconds': round(time.perf_counter() - start, 4)
+    }, ensure_ascii=False), flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+性能基准测试
+
+生成合成成本表，测量表格模型构建、滚动时的 data() 调用、筛选、xzltxs 处理和保存的耗时、
+吞吐量和内存峰值，并与基线比较：
+
+    python -m benchmarks                                  # 运行并与基线比较，有回退时退出码为 1
+    python -m benchmarks --rows 20000 --columns 40 --part-mix TIRE=1,DISK=1
+    python -m benchmarks --only scroll,filter
+    python -m benchmarks --update                         # 用本次结果更新基线
+
+每项先预热一次，再运行 --repeat 次取中位数。内存峰值在计时之外单独运行一次，用 tracemalloc 测量，
+不影响耗时。基线与机器有关，只在表格参数相同时比较，换机器后先用 --update 重新生成。
+"""
+import argparse
+import gc
+import io
+import json
+import logging
+import os
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QCoreApplication, Qt
+
+from .workbook_factory import (DEFAULT_PART_MIX, HEADER_ROWS, PART_CODE_COLUMN, PART_NAME_COLUMN,
+                               PRICE_COLUMN, XS_COLUMN, make_cost_workbook, parse_part_mix)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_DIR = os.path.join(ROOT_DIR, 'plugin_manager', 'plugins')
+REPORT_PATH = os.path.join('logs', 'benchmark.json')
+BASELINE_PATH = os.path.join(ROOT_DIR, 'benchmarks', 'baseline.json')
+DEFAULT_ROWS = 2000
+DEFAULT_COLUMNS = 20
+DEFAULT_REPEAT = 5
+WARMUP_RUNS = 1
+# 耗时超出基线 30% 以上且多出 BASELINE_MIN_MS 以上才算回退，基准测试的波动比启动耗时大
+BASELINE_TOLERANCE = 0.3
+BASELINE_MIN_MS = 5.0
+# 内存峰值超出基线 20% 以上且多出 1MB 以上才算回退
+MEMORY_TOLERANCE = 0.2
+MEMORY_MIN_BYTES = 1024 * 1024
+
+# xzltxs 使用与合成表格一致的列设置，不受本机保存的插件配置影响
+PLUGIN_PARAMETERS = {
+    'part_code_column': PART_CODE_COLUMN,
+    'part_name_column': PART_NAME_COLUMN,
+    'price_column': PRICE_COLUMN,
+    'xs_column': XS_COLUMN,
+    'start_row': HEADER_ROWS,
+    'write_mode': 'diff'
+}
+
+
+@dataclass
+class Benchmark:
+    """一项测试：setup 准备数据（不计时），run 是被计时的操作，返回处理的单元格数"""
+    name: str
+    description: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], int]
+
+
+def load_plugin(plugin_name: str = 'xzltxs'):
+    """加载并激活插件，与批处理相同"""
+    from plugin_manager.core.plugin_system import PluginSystem
+
+    plugin_system = PluginSystem(plugin_dir=PLUGIN_DIR)
+    if not plugin_system.load_plugin(plugin_name) or not plugin_system.activate_plugin(plugin_name):
+        raise RuntimeError(f"加载或激活插件 {plugin_name} 失败")
+    return plugin_system.get_plugin(plugin_name)
+
+
+def make_benchmarks(params: Dict[str, Any], plugin) -> List[Benchmark]:
+    from models.table_model import TableModel, TableModelHandle
+    from utils.excel_operations import FilterProxyModel
+
+    def new_workbook():
+        return make_cost_workbook(params['rows'], params['columns'], params['part_mix'], params['seed'])
+
+    worksheet = new_workbook().active
+    display, background = Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.BackgroundRole
+
+    def cell_count(model) -> int:
+        return model.rowCount() * model.columnCount()
+
+    def load(_) -> int:
+        return cell_count(TableModel(worksheet))
+
+    def scroll(model) -> int:
+        # 从头滚动到底，每个单元格请求一次显示文本和背景色，与视图绘制时的调用相同
+        rows, columns = model.rowCount(), model.columnCount()
+        data, index = model.data, model.index
+        for row in range(rows):
+            for col in range(columns):
+                cell = index(row, col)
+                data(cell, display)
+                data(cell, background)
+        return rows * columns
+
+    def filter_setup():
+        model = TableModel(worksheet)
+        proxy = FilterProxyModel()
+        proxy.setSourceModel(model)
+        return proxy, model  # 保留模型的引用，避免被回收
+
+    def filter_rows(state) -> int:
+        proxy, model = state
+        proxy.setFilterByColumn(PART_NAME_COLUMN, 'disk')
+        proxy.rowCount()
+        proxy.setFilterByColumn(PART_NAME_COLUMN, '')
+        return model.rowCount() * 2
+
+    def process(handle) -> int:
+        plugin.process_table(handle, **PLUGIN_PARAMETERS)
+        return cell_count(handle.model)
+
+    # 保存会修改工作表，使用单独的工作簿
+    save_workbook = new_workbook()
+
+    def save_setup():
+        handle = TableModelHandle(TableModel(save_workbook.active))
+        plugin.process_table(handle, **PLUGIN_PARAMETERS)
+        return handle.model
+
+    def save(model) -> int:
+        model.save_changes()
+        save_workbook.save(io.BytesIO())  # 保存到内存，不受磁盘速度影响
+        return cell_count(model)
+
+    return [
+        Benchmark('load', "TableModel 构建", lambda: None, load),
+        Benchmark('scroll', "滚动时的 data() 调用", lambda: TableModel(worksheet), scroll),
+        Benchmark('filter', "FilterProxyModel 筛选和清除", filter_setup, filter_rows),
+        Benchmark('process', "xzltxs 处理", lambda: TableModelHandle(TableModel(worksheet)), process),
+        Benchmark('save', "写回工作表并保存 xlsx", save_setup, save)
+    ]
+
+
+def run_benchmark(benchmark: Benchmark, repeat: int, measure_memory: bool = True) -> Dict[str, Any]:
+    """
+    运行一项测试
+
+    Returns:
+        {'description', 'median_ms', 'min_ms', 'cells', 'cells_per_sec', 'peak_memory'}，
+        不测量内存时 peak_memory 为 0
+    """
+    durations = []
+    cells = 0
+    for run in range(WARMUP_RUNS + repeat):
+        state = benchmark.setup()
+        gc.collect()
+        start = time.perf_counter()
+        cells = benchmark.run(state)
+        elapsed = (time.perf_counter() - start) * 1000
+        if run >= WARMUP_RUNS:
+            durations.append(elapsed)
+        del state
+
+    peak_memory = 0
+    if measure_memory:
+        state = benchmark.setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            benchmark.run(state)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    median = statistics.median(durations)
+    return {
+        'description': benchmark.description,
+        'median_ms': round(median, 2),
+        'min_ms': round(min(durations), 2),
+        'cells': cells,
+        'cells_per_sec': round(cells * 1000 / median) if median > 0 else 0,
+        'peak_memory': peak_memory
+    }
+
+
+def run_suite(params: Dict[str, Any], repeat: int = DEFAULT_REPEAT, only: Optional[List[str]] = None,
+              measure_memory: bool = True) -> Dict[str, Any]:
+    """
+    运行全部或指定的测试
+
+    Returns:
+        {'params', 'results': {测试名称: run_benchmark 的结果}}
+    """
+    if QCoreApplication.instance() is None:
+        QCoreApplication([])
+    benchmarks = make_benchmarks(params, load_plugin())
+    if only:
+        unknown = set(only) - {benchmark.name for benchmark in benchmarks}
+        if unknown:
+            raise ValueError(f"未知的测试: {', '.join(sorted(unknown))}")
+        benchmarks = [benchmark for benchmark in benchmarks if benchmark.name in only]
+    return {
+        'params': params,
+        'results': {benchmark.name: run_benchmark(benchmark, repeat, measure_memory) for benchmark in benchmarks}
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    params = report['params']
+    lines = [f"{params['rows']} 行，{params['columns']} 个系数列，零件比例 {params['part_mix']}",
+             f"  {'测试':<8}{'中位数':>10}{'最快':>10}{'单元格/秒':>14}{'内存峰值':>10}"]
+    for name, result in report['results'].items():
+        lines.append(f"  {name:<8}{result['median_ms']:>8.1f}ms{result['min_ms']:>8.1f}ms"
+                     f"{result['cells_per_sec']:>14,}{result['peak_memory'] / 1024 / 1024:>8.1f}MB"
+                     f"  {result['description']}")
+    return '\n'.join(lines)
+
+
+def make_baseline(report: Dict[str, Any]) -> Dict[str, Any]:
+    """用测试报告生成基线：表格参数和每项测试的耗时中位数、内存峰值"""
+    return {
+        'params': report['params'],
+        'results': {
+            name: {'median_ms': result['median_ms'], 'peak_memory': result['peak_memory']}
+            for name, result in report['results'].items()
+        }
+    }
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                   tolerance: float = BASELINE_TOLERANCE) -> List[str]:
+    """
+    检查测试报告是否比基线回退，表格参数不同时不比较
+
+    Returns:
+        回退的项目说明，没有回退时返回空列表
+    """
+    if baseline.get('params') != report['params']:
+        return []
+    violations = []
+    for name, result in report['results'].items():
+        expected = baseline.get('results', {}).get(name)
+        if expected is None:
+            continue
+        actual_ms, limit_ms = result['median_ms'], expected['median_ms']
+        if actual_ms > limit_ms * (1 + tolerance) and actual_ms - limit_ms > BASELINE_MIN_MS:
+            violations.append(f"{name}: {actual_ms:.1f}ms > 基线 {limit_ms:.1f}ms")
+        actual_memory, limit_memory = result['peak_memory'], expected.get('peak_memory', 0)
+        # 本次或基线没有测量内存时不比较
+        if actual_memory and limit_memory and actual_memory > limit_memory * (1 + MEMORY_TOLERANCE) \
+                and actual_memory - limit_memory > MEMORY_MIN_BYTES:
+            violations.append(f"{name}: 内存峰值 {actual_memory / 1024 / 1024:.1f}MB > "
+                              f"基线 {limit_memory / 1024 / 1024:.1f}MB")
+    return violations
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='运行性能基准测试并与基线比较')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='数据行数')
+    parser.add_argument('--columns', type=int, default=DEFAULT_COLUMNS, help='系数列数')
+    parser.add_argument('--part-mix', type=parse_part_mix, default=DEFAULT_PART_MIX,
+                        help='零件比例，例如 TIRE=4,DISK=3,CAP=2,OTHER=1')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='每项测试的计时次数')
+    parser.add_argument('--only', help='只运行指定的测试，逗号分隔：load,scroll,filter,process,save')
+    parser.add_argument('--no-memory', action='store_true', help='不测量内存峰值')
+    parser.add_argument('--report', default=REPORT_PATH, help='测试报告路径')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='基线文件路径')
+    parser.add_argument('--update', action='store_true', help='用本次结果更新基线')
+    parser.add_argument('--tolerance', type=float, default=BASELINE_TOLERANCE, help='允许超出基线的比例')
+    args = parser.parse_args(argv)
+    # 只输出报告；内存测量时 tracemalloc 使处理变慢，插件监视器的回退警告没有意义
+    logging.basicConfig(level=logging.ERROR)
+
+    params = {'rows': args.rows, 'columns': args.columns,
+              'part_mix': {name: float(weight) for name, weight in args.part_mix.items()}, 'seed': args.seed}
+    only = [name.strip() for name in args.only.split(',')] if args.only else None
+    report = run_suite(params, max(1, args.repeat), only, not args.no_memory)
+
+    os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(format_report(report))
+
+    if args.update:
+        # 只运行部分测试时保留其他测试的基线
+        baseline = make_baseline(report)
+        if only and os.path.exists(args.baseline):
+            previous = load_baseline(args.baseline)
+            if previous.get('params') == params:
+                baseline['results'] = dict(previous.get('results', {}), **baseline['results'])
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"已更新基线: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"没有基线文件 {args.baseline}，使用 --update 生成")
+        return 0
+    baseline = load_baseline(args.baseline)
+    if baseline.get('params') != params:
+        print("基线的表格参数与本次不同，跳过比较")
+        return 0
+    violations = check_baseline(report, baseline, args.tolerance)
+    for violation in violations:
+        print(f"性能回退: {violation}")
+    return 1 if violations else 0
@@ -0,0 +1,74 @@
+"""生成用于性能测试的合成成本表"""
+import random
+from typing import Dict, Optional
+
+import openpyxl
+
+# 列布局与 xzltxs 插件的默认配置一致（列号从 0 开始）
+PART_CODE_COLUMN = 2
+PART_NAME_COLUMN = 3
+PRICE_COLUMN = 4
+XS_COLUMN = 19
+HEADER_ROWS = 2
+
+# 零件类型：(编码, 名称)，OTHER 是插件不处理的行
+PART_TYPES = {
+    'TIRE': ('42751', 'TIRE'),
+    'DISK': ('42700', 'DISK'),
+    'CAP': ('44732', 'CAP'),
+    'OTHER': ('10000', 'BOLT')
+}
+# 默认的零件比例
+DEFAULT_PART_MIX = {'TIRE': 4, 'DISK': 3, 'CAP': 2, 'OTHER': 1}
+# 系数单元格为空或 0 的比例，插件会跳过这些单元格
+EMPTY_RATIO = 0.2
+
+
+def parse_part_mix(value: str) -> Dict[str, float]:
+    """解析 "TIRE=4,DISK=3,CAP=2,OTHER=1" 格式的零件比例"""
+    mix = {}
+    for item in value.split(','):
+        name, sep, weight = item.partition('=')
+        name = name.strip().upper()
+        if not sep or name not in PART_TYPES:
+            raise ValueError(f"无效的零件比例: {item}，可用的零件类型: {', '.join(PART_TYPES)}")
+        mix[name] = float(weight)
+    return mix
+
+
+def make_cost_workbook(rows: int = 5000, coefficient_columns: int = 20,
+                       part_mix: Optional[Dict[str, float]] = None, seed: int = 0) -> openpyxl.Workbook:
+    """
+    生成成本表
+
+    Args:
+        rows: 数据行数，不包括表头
+        coefficient_columns: 从 XS_COLUMN 开始的系数列数
+        part_mix: 各零件类型的比例，默认为 DEFAULT_PART_MIX
+        seed: 随机种子，相同参数生成的表格完全相同
+    """
+    part_mix = part_mix or DEFAULT_PART_MIX
+    rng = random.Random(seed)
+    names = list(part_mix)
+    weights = [part_mix[name] for name in names]
+    column_count = XS_COLUMN + coefficient_columns
+
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.title = 'cost'
+    for header in range(HEADER_ROWS):
+        worksheet.append([f'H{header}-{col}' for col in range(column_count)])
+
+    for row in range(rows):
+        code, name = PART_TYPES[rng.choices(names, weights)[0]]
+        values = [None] * column_count
+        values[0] = row + 1
+        values[PART_CODE_COLUMN] = code
+        values[PART_NAME_COLUMN] = name
+        # DISK 价格在阈值（150）上下，两种 DISK 都会出现
+        values[PRICE_COLUMN] = rng.randint(80, 220)
+        for col in range(XS_COLUMN, column_count):
+            if rng.random() >= EMPTY_RATIO:
+                values[col] = rng.randint(1, 5)
+        worksheet.append(values)
+    return workbook
@@ -1,6 +1,6 @@
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
-from utils.event_bus import EventBus
+from utils.event_bus import EventBus, get_event_bus
 from PyQt6.QtWidgets import QTabWidget
 
 @dataclass
@@ -23,7 +23,7 @@ class GlobalState:
             cls._instance = super().__new__(cls)
             cls._instance.workbook = WorkbookState()
             cls._instance.settings = Settings()
-            cls._instance._event_bus = EventBus()
+            cls._instance._event_bus = get_event_bus()  # 与插件系统共用
             cls._instance.current_table_view = None
         return cls._instance
 
@@ -1,18 +1,137 @@
 # logging_config.py
+"""
+日志配置
+
+所有记录先放入队列，由后台线程中的 QueueListener 写入文件和控制台，界面线程和工作线程记录日志时
+不等待磁盘写入。日志文件每行一个 JSON 对象，超过 LOG_MAX_BYTES 后轮转；控制台仍输出普通文本。
+
+插件通过 get_plugin_logger 获取名为 plugin.<插件名> 的记录器，可以用 set_plugin_log_level 或
+环境变量 PLUGIN_LOG_LEVELS（如 "xzltxs=DEBUG,plugin_template=WARNING"）单独设置级别；
+整体级别由环境变量 LOG_LEVEL 设置。
+"""
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Union
+
+LOG_DIR = 'logs'
+LOG_FILE = 'plugin.log'
+# 单个日志文件的最大字节数和保留的轮转文件数
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# 插件记录器的名称前缀
+PLUGIN_LOGGER_PREFIX = 'plugin'
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord 自带的属性，其余属性是通过 extra 传入的结构化字段
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """每条记录输出为一行 JSON，插件记录器的记录带 plugin 字段，extra 传入的字段原样保留"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'process': record.process,
+            'message': record.getMessage()
+        }
+        if record.name.startswith(PLUGIN_LOGGER_PREFIX + '.'):
+            data['plugin'] = record.name[len(PLUGIN_LOGGER_PREFIX) + 1:]
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def get_plugin_logger(plugin_name: str) -> logging.Logger:
+    """获取插件的记录器，级别可以用 set_plugin_log_level 单独设置"""
+    return logging.getLogger(f'{PLUGIN_LOGGER_PREFIX}.{plugin_name}')
+
+
+def set_plugin_log_level(plugin_name: str, level: Union[int, str]) -> None:
+    """设置插件记录器的级别，level 可以是级别名称，设为 NOTSET 时恢复使用整体级别"""
+    get_plugin_logger(plugin_name).setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def _parse_plugin_levels(value: str) -> Dict[str, str]:
+    """解析 "插件=级别,插件=级别" 格式的设置"""
+    levels = {}
+    for item in value.split(','):
+        name, sep, level = item.partition('=')
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip()
+    return levels
+
+
+def setup_worker_logging(log_queue, level: Union[int, str] = logging.INFO) -> None:
+    """
+    把当前进程的日志发送到队列
+
+    setup_logging 内部使用；批处理的工作进程用它把日志交给主进程的 multiprocessing 队列，
+    由主进程统一写入文件，避免多个进程同时轮转同一个日志文件。
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    level = os.environ.get('LOG_LEVEL', level)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    for plugin_name, plugin_level in _parse_plugin_levels(os.environ.get('PLUGIN_LOG_LEVELS', '')).items():
+        try:
+            set_plugin_log_level(plugin_name, plugin_level)
+        except ValueError:
+            root.warning(f"忽略无效的插件日志级别: {plugin_name}={plugin_level}")
+
+
+def setup_logging(level: Union[int, str] = logging.INFO, log_queue=None) -> QueueListener:
+    """
+    配置日志，重复调用时返回已启动的监听器
+
+    Args:
+        level: 整体级别，环境变量 LOG_LEVEL 优先
+        log_queue: 日志队列，默认使用线程队列；需要收集子进程的日志时传入 multiprocessing 队列
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        os.makedirs(LOG_DIR, exist_ok=True)
+        file_handler = RotatingFileHandler(os.path.join(LOG_DIR, LOG_FILE), maxBytes=LOG_MAX_BYTES,
+                                           backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
 
+        if log_queue is None:
+            log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        setup_worker_logging(log_queue, level)
+        # 退出前写完队列中剩余的记录
+        atexit.register(stop_logging)
+        return _listener
 
-def setup_logging():
-    log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(os.path.join(log_dir, 'plugin.log')),
-            logging.StreamHandler()
-        ]
-    )
+def stop_logging() -> None:
+    """停止后台写入线程，队列中剩余的记录会先写完"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
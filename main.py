@@ -1,38 +1,79 @@
+import os
 import sys
+# 启动分析需要在其他模块之前启用，才能记录到全部导入耗时
+from utils.startup_profiler import profiler, is_requested
+if is_requested():
+    profiler.enable()
+profiler.begin('导入模块')
 from PyQt6.QtWidgets import QApplication, QMainWindow
 from PyQt6.QtGui import QIcon, QAction
+from PyQt6.QtCore import QTimer
 from ui.main_window import MainWindow
 from logging_config import setup_logging
 from globals import GlobalState
 from utils.error_handler import ErrorHandler
 from utils.event_bus import EventBus
+from utils.lazy_import import warm_up
 from plugin_manager.core.plugin_system import PluginSystem
 import logging
+profiler.end('导入模块')
 
 def main():
     try:
         setup_logging()
-        app = QApplication(sys.argv)
+        with profiler.phase('创建 QApplication'):
+            app = QApplication(sys.argv)
         
         # 初始化全局状态
-        state = GlobalState()
+        with profiler.phase('GlobalState 初始化'):
+            state = GlobalState()
+
+        # 设置 EVENT_METRICS_INTERVAL（秒）时定期把事件总线统计写入日志，用于定位界面卡顿
+        metrics_interval = os.environ.get('EVENT_METRICS_INTERVAL')
+        if metrics_interval:
+            state.event_bus.start_metrics_dump(float(metrics_interval))
 
         # 初始化插件系统
-        plugin_system = PluginSystem(state.event_bus)
+        with profiler.phase('PluginSystem 初始化'):
+            plugin_system = PluginSystem(state.event_bus)
 
-        # 加载所有插件
-        plugin_system.load_all_plugins()
-        
         # 确保全局状态已初始化
         state = GlobalState()
         
         # 初始化主窗口
-        window = MainWindow(plugin_system)
-        window.show()
+        with profiler.phase('MainWindow 构建'):
+            window = MainWindow(plugin_system)
+            window.show()
+
+        if profiler.enabled:
+            # 所有插件加载完成即视为启动完成
+            def on_startup_finished(data=None):
+                profiler.end('插件加载')
+                profiler.finish()
+                state.event_bus.unsubscribe('plugin.all_loaded', on_startup_finished)
+            state.event_bus.subscribe('plugin.all_loaded', on_startup_finished)
+            profiler.begin('插件加载')
+
+        # 窗口显示后在后台加载插件，工具栏按钮随插件加载完成逐个出现
+        QTimer.singleShot(0, plugin_system.load_all_plugins_async)
+        # 再在后台预先导入打开文件时才需要的 numpy、openpyxl、pandas
+        QTimer.singleShot(0, warm_up)
+
+        # 设置 PLUGIN_HOT_RELOAD=1 时监视插件目录，修改插件后自动重新加载，不需要重启应用
+        if os.environ.get('PLUGIN_HOT_RELOAD', '') not in ('', '0'):
+            plugin_system.enable_hot_reload()
+
+        # 设置 PLUGIN_TRACE_MEMORY=1 时用 tracemalloc 记录插件运行的内存峰值，会使插件处理明显变慢
+        if os.environ.get('PLUGIN_TRACE_MEMORY', '') not in ('', '0'):
+            plugin_system.monitor.trace_memory = True
 
         # 应用程序退出时清理
         def cleanup():
+            plugin_system.config.flush()
+            plugin_system.executor.shutdown(wait=False)
+            plugin_system.async_runner.shutdown()
             state.event_bus.clear()
+            state.event_bus.shutdown()
             logging.info("应用程序清理完成")
             
         app.aboutToQuit.connect(cleanup)
@@ -1,18 +1,20 @@
 import threading
-from typing import Any, Optional, List
+from typing import Any, Dict, Iterable, Optional, List, TYPE_CHECKING
 from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSlot, QMetaObject
 from PyQt6.QtGui import QColor, QBrush
-from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.cell import Cell
 from utils.error_handler import ErrorHandler
 from globals import GlobalState
-from plugin_manager.features.plugin_permissions import PluginPermission
+from plugin_manager.core.table_handle import TableHandle, Color
+from plugin_manager.features.plugin_permissions import TABLE_READ_MASK, TABLE_WRITE_MASK
 import logging
 
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+
 class TableModel(QAbstractTableModel):
     """Excel工作表的数据模型"""
     
-    def __init__(self, worksheet: Worksheet):
+    def __init__(self, worksheet: 'Worksheet'):
         super().__init__()
         self.worksheet = worksheet
         self._data = {}  # 缓存修改的数据
@@ -21,6 +23,7 @@ class TableModel(QAbstractTableModel):
         self._max_row = worksheet.max_row
         self._max_column = worksheet.max_column
         self._save_lock = threading.Lock()  # 用于保护保存操作的线程锁
+        self._logger = logging.getLogger(__name__)
         self.load_data()
 
     def load_data(self):
@@ -100,6 +103,14 @@ class TableModel(QAbstractTableModel):
             
         return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
         
+    def get_column_values(self, column: int, rows: List[int]) -> List[str]:
+        """批量获取一列中指定行的当前值（优先返回修改的数据）"""
+        data = self._data
+        return [
+            data[(row, column)] if (row, column) in data else self.get_cell_value(row, column)
+            for row in rows
+        ]
+
     def get_cell_value(self, row: int, col: int) -> str:
         """获取原始单元格值"""
         try:
@@ -122,9 +133,11 @@ class TableModel(QAbstractTableModel):
         with self._save_lock:  # 使用线程锁保护保存操作
             try:
                 self._logger.info("保存更改到worksheet")
+                sheet_protected = self.worksheet.protection.sheet
                 for (row, col), value in self._data.items():
                     cell = self.worksheet.cell(row=row+1, column=col+1)
-                    if not cell.protection.locked:  # 检查单元格是否只读
+                    # 只有启用了工作表保护时，锁定的单元格才是只读的
+                    if not (sheet_protected and cell.protection.locked):
                         cell.value = value
                         
             except Exception as e:
@@ -169,7 +182,8 @@ class TableModel(QAbstractTableModel):
                 # 更新数据 - 修复这里的错误
                 self._data[(row, column)] = str(update['value'])  # 使用元组作为键，并确保值是字符串
                 # 更新颜色
-                self._colors[(row, column)] = update['color']
+                if update.get('color') is not None:
+                    self._colors[(row, column)] = update['color']
                 
             # 完成批量更新
             self.endResetModel()
@@ -187,3 +201,66 @@ class TableModel(QAbstractTableModel):
         except Exception as e:
             logging.error(f"批量更新单元格时发生错误: {str(e)}")
             raise
+
+
+class TableModelHandle(TableHandle):
+    """把 TableModel（或任意 Qt 表格模型）适配为插件使用的 TableHandle"""
+
+    def __init__(self, model, view=None):
+        self.model = model
+        self.view = view
+
+    @classmethod
+    def from_view(cls, table_view) -> 'TableModelHandle':
+        """从表格视图创建句柄，保留视图供需要界面交互的插件使用"""
+        return cls(table_view.model(), table_view)
+
+    def row_count(self) -> int:
+        return self.model.rowCount()
+
+    def column_count(self) -> int:
+        return self.model.columnCount()
+
+    def get_value(self, row: int, col: int) -> str:
+        if not self.permissions & TABLE_READ_MASK:
+            self._denied('读取')
+        value = self.model.data(self.model.index(row, col))
+        return '' if value is None else str(value)
+
+    def get_column(self, col: int, rows: Optional[Iterable[int]] = None) -> List[str]:
+        if not self.permissions & TABLE_READ_MASK:
+            self._denied('读取')
+        if rows is None:
+            rows = range(self.row_count())
+        if isinstance(self.model, TableModel):
+            return self.model.get_column_values(col, list(rows))
+        return super().get_column(col, rows)
+
+    def set_values(self, col: int, updates: Dict[int, Any], color: Optional[Color] = None) -> None:
+        if not self.permissions & TABLE_WRITE_MASK:
+            self._denied('修改')
+        qcolor = QColor(*color) if color is not None else None
+        if isinstance(self.model, TableModel):
+            self.model.batch_update_cells(col, [
+                {'row': row, 'value': value, 'color': qcolor}
+                for row, value in updates.items()
+            ])
+            return
+        # 对于标准模型，使用常规方式更新
+        for row, value in updates.items():
+            index = self.model.index(row, col)
+            self.model.setData(index, value, Qt.ItemDataRole.EditRole)
+            if qcolor is not None:
+                self.model.setData(index, qcolor, Qt.ItemDataRole.BackgroundRole)
+
+    def set_color(self, row: int, col: int, color: Color) -> None:
+        if not self.permissions & TABLE_WRITE_MASK:
+            self._denied('修改')
+        if isinstance(self.model, TableModel):
+            self.model.set_cell_color(row, col, QColor(*color))
+        else:
+            self.model.setData(self.model.index(row, col), QColor(*color), Qt.ItemDataRole.BackgroundRole)
+
+    def commit(self) -> None:
+        if isinstance(self.model, TableModel):
+            self.model.save_changes()
@@ -2,5 +2,7 @@
 from .plugin_system import PluginSystem
 from .plugin_interface import PluginInterface
 from .plugin_base import PluginBase
+from .table_handle import TableHandle, ColumnTableHandle
+from .async_api import PluginContext
 
-__all__ = ['PluginSystem', 'PluginInterface', 'PluginBase'] 
\ No newline at end of file
+__all__ = ['PluginSystem', 'PluginInterface', 'PluginBase', 'TableHandle', 'ColumnTableHandle', 'PluginContext'] 
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+插件的异步处理接口
+
+插件可以实现协程方法代替 process_data：
+
+    async def process(self, table: TableHandle, context: PluginContext, **parameters):
+        values = await context.run_in_thread(load_values, table)     # 计算放到工作线程
+        for done, chunk in enumerate(chunks, 1):
+            context.check_cancelled()
+            ...
+            context.report_progress(done, len(chunks))
+        await context.run_in_gui(show_summary)                       # 需要访问界面时切回界面线程
+        return summary
+
+协程在后台线程的 asyncio 事件循环中运行（不依赖 qasync），界面线程不会被阻塞；
+进度、取消和回到界面线程都由框架统一处理，插件不需要自己创建线程或调用 invokeMethod。
+"""
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from PyQt6.QtCore import QObject, QCoreApplication, QEventLoop, QThread, Qt, pyqtSignal as Signal, pyqtSlot
+
+from utils.event_bus import Priority, ProgressEvent
+from .cancellation import CancellationToken
+from .execution_service import ExecutionService
+from .table_handle import TableHandle
+from ..utils.plugin_error import PluginCancelledError
+
+
+def is_async_plugin(plugin) -> bool:
+    """插件是否实现了 async def process"""
+    return inspect.iscoroutinefunction(getattr(plugin, 'process', None))
+
+
+class _GuiBridge(QObject):
+    """把调用排队到创建它的线程（界面线程）中执行"""
+    _invoke = Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._invoke.connect(self._run, Qt.ConnectionType.QueuedConnection)
+
+    # 声明为槽，排队的调用投递给本对象，wait 可以用 sendPostedEvents 立即执行
+    @pyqtSlot(object)
+    def _run(self, call: Callable[[], None]) -> None:
+        call()
+
+    def call(self, fn: Callable, *args, **kwargs) -> Future:
+        """在界面线程中执行 fn，没有 Qt 应用（如批处理）或已在界面线程时直接执行"""
+        future: Future = Future()
+
+        def call():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        if QCoreApplication.instance() is None or QThread.currentThread() is self.thread():
+            call()
+        else:
+            self._invoke.emit(call)
+        return future
+
+
+class AsyncRunner:
+    """
+    后台线程中的 asyncio 事件循环，第一次提交协程时启动
+
+    需要在界面线程中创建（插件系统初始化时），run_in_gui 的调用会排队到创建它的线程。
+    """
+
+    def __init__(self):
+        self._bridge = _GuiBridge()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name='PluginAsyncLoop', daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro, cancel_token: Optional[CancellationToken] = None) -> Future:
+        """
+        在事件循环中运行协程，返回 concurrent.futures.Future
+
+        cancel_token 取消时协程在下一个 await 处被取消，Future 的异常为 PluginCancelledError。
+        """
+        loop = self._get_loop()
+
+        async def run():
+            task = asyncio.current_task()
+            if cancel_token is not None:
+                def cancel():
+                    loop.call_soon_threadsafe(task.cancel)
+
+                cancel_token.add_callback(cancel)
+                # 任务结束后注销回调，长期使用的令牌不会持有已结束的任务，也不会取消它们
+                task.add_done_callback(lambda _: cancel_token.remove_callback(cancel))
+            try:
+                return await coro
+            except asyncio.CancelledError:
+                raise PluginCancelledError("处理已取消") from None
+
+        return asyncio.run_coroutine_threadsafe(run(), loop)
+
+    def call_in_gui(self, fn: Callable, *args, **kwargs) -> Future:
+        return self._bridge.call(fn, *args, **kwargs)
+
+    def wait(self, future: Future) -> Any:
+        """
+        等待结果；在界面线程中用局部事件循环等待，等待期间界面保持响应，
+        协程中的 run_in_gui 也能执行。返回前先执行已排队的界面调用，调用方拿到结果时进度回调都已执行
+        """
+        if QCoreApplication.instance() is not None and QThread.currentThread() is self._bridge.thread():
+            if not future.done():
+                loop = QEventLoop()
+                future.add_done_callback(lambda _: self._bridge.call(loop.quit))
+                if not future.done():
+                    loop.exec()
+            QCoreApplication.sendPostedEvents(self._bridge)
+        return future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=1)
+
+
+class PluginContext:
+    """传给 async def process 的上下文：表格、进度、取消以及切换执行位置的方法"""
+
+    def __init__(self, plugin_name: str, table: TableHandle, runner: AsyncRunner, executor: ExecutionService,
+                 event_bus=None, cancel_token: Optional[CancellationToken] = None,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        self.plugin_name = plugin_name
+        self.table = table
+        self.cancel_token = cancel_token or CancellationToken()
+        self._runner = runner
+        self._executor = executor
+        self._event_bus = event_bus
+        self._progress = progress
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_token.cancelled
+
+    def check_cancelled(self) -> None:
+        """已请求取消时抛出 PluginCancelledError"""
+        self.cancel_token.raise_if_cancelled()
+
+    def report_progress(self, current: int, total: int) -> None:
+        """
+        报告进度：发送 plugin.progress 事件，并在界面线程中调用调用方传入的进度回调
+
+        可以频繁调用，事件没有订阅者时几乎没有开销。
+        """
+        if self._event_bus is not None:
+            self._event_bus.emit(ProgressEvent('plugin.progress', {
+                'plugin_name': self.plugin_name, 'current': current, 'total': total
+            }, source=self.plugin_name))
+        if self._progress is not None:
+            self._runner.call_in_gui(self._progress, current, total)
+
+    async def run_in_thread(self, fn: Callable, *args, priority: int = Priority.NORMAL, **kwargs) -> Any:
+        """在执行服务的工作线程中运行 fn，取消时尚未开始的任务不再执行"""
+        future = self._executor.submit(fn, *args, priority=priority, cancel_token=self.cancel_token, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    async def run_in_process(self, fn: Callable, *args, priority: int = Priority.NORMAL, **kwargs) -> Any:
+        """在执行服务的工作进程中运行 fn，fn 和参数必须可以序列化"""
+        future = self._executor.submit_process(fn, *args, priority=priority, cancel_token=self.cancel_token, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    async def run_in_gui(self, fn: Callable, *args, **kwargs) -> Any:
+        """在界面线程中运行 fn，用于显示对话框或直接访问 Qt 控件"""
+        return await asyncio.wrap_future(self._runner.call_in_gui(fn, *args, **kwargs))
+
+
+_runner: Optional[AsyncRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_async_runner() -> AsyncRunner:
+    """获取应用共用的异步运行器，第一次调用应在界面线程中"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = AsyncRunner()
+        return _runner
@@ -0,0 +1,58 @@
+import threading
+from typing import Callable, List, Optional
+
+from ..utils.plugin_error import PluginCancelledError
+
+
+class CancellationToken:
+    """
+    协作式取消令牌
+
+    由发起方调用 cancel()，处理代码在数据块边界调用 raise_if_cancelled()
+    检查并尽快退出。检查只是读取一个 Event，可以放在热点循环中。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    def cancel(self) -> None:
+        """请求取消，并在当前线程中调用已登记的回调"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """登记取消时调用的回调，已取消时立即调用；用于把取消传递给无法轮询令牌的代码（如协程）"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """取消登记的回调，回调未登记或已经调用过时不做任何事"""
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已请求取消"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """已请求取消时抛出 PluginCancelledError"""
+        if self._event.is_set():
+            raise PluginCancelledError("处理已取消")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待取消请求，返回是否已取消，可代替 sleep 使用"""
+        return self._event.wait(timeout)
@@ -0,0 +1,216 @@
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.event_bus import Priority
+from .cancellation import CancellationToken
+
+# 线程数不超过 CPU 核心数：插件任务主要是 Python 计算，线程再多也会被 GIL 串行化
+DEFAULT_THREADS = min(8, os.cpu_count() or 1)
+# 进程数给界面留一个核心
+DEFAULT_PROCESSES = max(1, (os.cpu_count() or 2) - 1)
+
+
+class _Task:
+    """排队中的任务，优先级高的先执行，同优先级按提交顺序"""
+    __slots__ = ('sort_key', 'future', 'fn', 'args', 'kwargs', 'cancel_token')
+
+    def __init__(self, sort_key, future, fn, args, kwargs, cancel_token):
+        self.sort_key = sort_key
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_token = cancel_token
+
+    def __lt__(self, other: '_Task') -> bool:
+        return self.sort_key < other.sort_key
+
+
+class ExecutionService:
+    """
+    插件共用的执行服务
+
+    由插件系统持有，整个应用只有一组常驻的工作线程和一个按需创建的进程池，
+    插件不再每次处理都创建 QThread 和线程池。任务按优先级排队，提交时可以附带取消令牌：
+    令牌取消后尚未开始的任务直接取消，已开始的任务由任务自己检查令牌退出。
+    submit 的结果通过 Future 返回，回调在工作线程中执行，需要更新界面时应发送 Qt 信号。
+    """
+
+    def __init__(self, max_threads: int = DEFAULT_THREADS, max_processes: int = DEFAULT_PROCESSES):
+        self.max_threads = max(1, max_threads)
+        self.max_processes = max(1, max_processes)
+        self._logger = logging.getLogger(__name__)
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._queue: List[_Task] = []
+        self._threads: List[threading.Thread] = []
+        self._busy_threads = 0
+        self._shutdown = False
+
+        # 进程任务单独排队，同时运行的数量不超过 max_processes，由完成回调继续分派
+        self._process_queue: List[_Task] = []
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._busy_processes = 0
+        self._completed = 0
+
+    def submit(self, fn: Callable, *args, priority: int = Priority.NORMAL,
+               cancel_token: Optional[CancellationToken] = None, **kwargs) -> Future:
+        """在工作线程中执行 fn(*args, **kwargs)"""
+        task = self._make_task(fn, args, kwargs, priority, cancel_token)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("执行服务已关闭")
+            heapq.heappush(self._queue, task)
+            # 第一次使用时启动工作线程，之后一直保留
+            if len(self._threads) < self.max_threads and self._busy_threads + len(self._queue) > len(self._threads):
+                self._start_thread()
+            self._condition.notify()
+        return task.future
+
+    def submit_process(self, fn: Callable, *args, priority: int = Priority.NORMAL,
+                       cancel_token: Optional[CancellationToken] = None, **kwargs) -> Future:
+        """
+        在工作进程中执行 fn(*args, **kwargs)，fn 和参数必须可以序列化（模块级函数）
+
+        取消令牌只对尚未开始的任务有效，已经开始的进程任务会执行完成。
+        """
+        task = self._make_task(fn, args, kwargs, priority, cancel_token)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("执行服务已关闭")
+            heapq.heappush(self._process_queue, task)
+        self._dispatch_processes()
+        return task.future
+
+    def _make_task(self, fn, args, kwargs, priority, cancel_token) -> _Task:
+        return _Task((-int(priority), next(self._sequence)), Future(), fn, args, kwargs, cancel_token)
+
+    def cancel(self, cancel_token: CancellationToken) -> int:
+        """取消令牌并取消使用该令牌、尚未开始的所有任务，返回取消的任务数"""
+        cancel_token.cancel()
+        with self._condition:
+            pending = [task for task in self._queue + self._process_queue if task.cancel_token is cancel_token]
+        # Future.cancel 会同步执行完成回调，不能持有锁
+        return sum(task.future.cancel() for task in pending)
+
+    def _start_thread(self) -> None:
+        thread = threading.Thread(target=self._worker, name=f"PluginWorker-{len(self._threads)}", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._shutdown:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                task = heapq.heappop(self._queue)
+                self._busy_threads += 1
+            try:
+                self._run(task)
+            finally:
+                with self._condition:
+                    self._busy_threads -= 1
+                    self._completed += 1
+
+    @staticmethod
+    def _run(task: _Task) -> None:
+        if task.cancel_token is not None and task.cancel_token.cancelled:
+            task.future.cancel()
+        if not task.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = task.fn(*task.args, **task.kwargs)
+        except BaseException as e:
+            task.future.set_exception(e)
+        else:
+            task.future.set_result(result)
+
+    def _dispatch_processes(self) -> None:
+        """把排队的进程任务交给进程池，直到运行数量达到上限"""
+        while True:
+            with self._condition:
+                if not self._process_queue or self._busy_processes >= self.max_processes or self._shutdown:
+                    return
+                task = heapq.heappop(self._process_queue)
+                if task.cancel_token is not None and task.cancel_token.cancelled:
+                    task.future.cancel()
+                if not task.future.set_running_or_notify_cancel():
+                    continue
+                if self._process_pool is None:
+                    # spawn 方式启动，避免在已创建 Qt 对象和线程的进程中 fork
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.max_processes, mp_context=multiprocessing.get_context('spawn'))
+                self._busy_processes += 1
+                pool = self._process_pool
+            try:
+                process_future = pool.submit(task.fn, *task.args, **task.kwargs)
+            except BaseException as e:
+                self._on_process_done(task, None, e)
+            else:
+                process_future.add_done_callback(lambda future, task=task: self._on_process_done(task, future))
+
+    def _on_process_done(self, task: _Task, process_future: Optional[Future],
+                         error: Optional[BaseException] = None) -> None:
+        with self._condition:
+            self._busy_processes -= 1
+            self._completed += 1
+        if error is None:
+            error = process_future.exception()
+        if error is not None:
+            task.future.set_exception(error)
+        else:
+            task.future.set_result(process_future.result())
+        self._dispatch_processes()
+
+    def stats(self) -> Dict[str, Any]:
+        """当前使用情况：线程和进程的总数、工作中的数量、排队任务数和已完成任务数"""
+        with self._condition:
+            return {
+                'threads': len(self._threads),
+                'max_threads': self.max_threads,
+                'busy_threads': self._busy_threads,
+                'queued': len(self._queue),
+                'processes': self.max_processes if self._process_pool is not None else 0,
+                'busy_processes': self._busy_processes,
+                'queued_processes': len(self._process_queue),
+                'completed': self._completed
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭服务，排队中的任务全部取消"""
+        with self._condition:
+            self._shutdown = True
+            pending = self._queue + self._process_queue
+            self._queue, self._process_queue = [], []
+            threads = list(self._threads)
+            pool, self._process_pool = self._process_pool, None
+            self._condition.notify_all()
+        for task in pending:
+            task.future.cancel()
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_service: Optional[ExecutionService] = None
+_service_lock = threading.Lock()
+
+
+def get_execution_service() -> ExecutionService:
+    """获取应用共用的执行服务"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ExecutionService()
+        return _service
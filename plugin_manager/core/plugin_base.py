@@ -1,6 +1,10 @@
 from typing import Dict, Set, Any, Optional, Callable
+from contextlib import nullcontext
 from PyQt6.QtWidgets import QTableView, QWidget, QMessageBox
 from .plugin_interface import PluginInterface
+from .table_handle import TableHandle
+from .execution_service import ExecutionService, get_execution_service
+from .async_api import is_async_plugin
 from ..features.plugin_permissions import PluginPermission
 from ..features.plugin_events import EventBus
 from ..utils.plugin_error import ErrorHandler
@@ -20,6 +24,7 @@ class PluginBase(PluginInterface):
         self._required_permissions: Set[PluginPermission] = set()
         self._optional_permissions: Set[PluginPermission] = set()
         self._granted_permissions: Set[PluginPermission] = set()
+        self._granted_mask = 0  # 已授予权限的位掩码，has_permission 只需一次按位与
         self.plugin_system = None  # 由插件系统设置
         
     # PluginInterface 实现
@@ -35,8 +40,12 @@ class PluginBase(PluginInterface):
     def get_config_schema(self) -> Dict[str, Dict[str, Any]]:
         return {}
         
-    def process_data(self, table_view: QTableView, **parameters) -> Any:
-        raise NotImplementedError("插件必须实现 process_data 方法")
+    def process_data(self, table: TableHandle, **parameters) -> Any:
+        """实现了 async def process 的插件由这里在后台事件循环中运行，界面线程等待时仍可响应"""
+        if not is_async_plugin(self) or self.plugin_system is None:
+            raise NotImplementedError("插件必须实现 process_data 或 async def process 方法")
+        future = self.plugin_system.run_async(self.get_name(), table, **parameters)
+        return self.plugin_system.async_runner.wait(future)
         
     def validate_parameters(self, parameters: Dict[str, Any]) -> Optional[str]:
         """验证参数，返回错误信息或 None"""
@@ -54,6 +63,7 @@ class PluginBase(PluginInterface):
         
     def activate(self, granted_permissions: Set[PluginPermission]) -> None:
         self._granted_permissions = granted_permissions
+        self._granted_mask = PluginPermission.to_mask(granted_permissions)
         self._state = PluginState.ACTIVE
         
     def deactivate(self) -> None:
@@ -129,6 +139,7 @@ class PluginBase(PluginInterface):
             
             if reply == QMessageBox.StandardButton.Yes:
                 self._granted_permissions.add(permission)
+                self._granted_mask |= permission.mask
                 return True
             return False
             
@@ -138,10 +149,20 @@ class PluginBase(PluginInterface):
             
     def has_permission(self, permission: PluginPermission) -> bool:
         """检查是否有某个权限"""
-        return permission in self._granted_permissions 
+        return bool(self._granted_mask & permission.mask)
         
     def get_configuration(self) -> Dict[str, Any]:
         """获取插件配置"""
         if self.plugin_system:
             return self.plugin_system.config.get_config(self.get_name())
-        return {} 
\ No newline at end of file
+        return {} 
+    def track_task(self, operation: str, rows: int = 0, cells: int = 0):
+        """记录工作线程中一个任务的耗时和吞吐量，插件系统未设置时不记录"""
+        monitor = getattr(self.plugin_system, 'monitor', None)
+        if monitor is None:
+            return nullcontext()
+        return monitor.track_task(self.get_name(), operation, rows, cells)
+
+    def get_execution_service(self) -> ExecutionService:
+        """获取插件系统的执行服务，插件处理任务应提交到这里，而不是自己创建线程或线程池"""
+        return getattr(self.plugin_system, 'executor', None) or get_execution_service()
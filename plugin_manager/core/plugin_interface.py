@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import Dict, Set, Any, Optional
 from PyQt6.QtWidgets import QTableView
 from ..features.plugin_permissions import PluginPermission
+from .table_handle import TableHandle
 from ..features.plugin_events import PluginEventInterface
 from ..features.plugin_lifecycle import PluginLifecycle
 
@@ -29,8 +30,8 @@ class PluginInterface(PluginEventInterface, PluginLifecycle):
         pass
         
     @abstractmethod
-    def process_data(self, table_view: QTableView, **parameters) -> Any:
-        """处理数据"""
+    def process_data(self, table: TableHandle, **parameters) -> Any:
+        """处理数据，table 为表格句柄，在界面中运行时 table.view 为当前表格视图"""
         pass
         
     @abstractmethod
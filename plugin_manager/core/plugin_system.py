@@ -1,16 +1,61 @@
 import os
-from typing import Dict, Any, Optional, List
+import time
+from typing import Callable, Dict, Any, Optional, List, Tuple
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 
 from .plugin_interface import PluginInterface
+from .table_handle import TableHandle
+from .execution_service import get_execution_service
+from .async_api import PluginContext, get_async_runner, is_async_plugin
+from .cancellation import CancellationToken
+from utils.event_bus import PluginEvent, get_event_bus
+from utils.startup_profiler import profiler
 from ..features.plugin_permissions import PluginPermission, PluginPermissionManager
 from ..utils.plugin_loader import PluginLoader
 from ..utils.plugin_error import PluginError, ErrorHandler
 from ..utils.plugin_config import PluginConfig
+from ..utils.plugin_store import PluginStore, STORE_FILE_NAME
 from ..features.plugin_dependencies import DependencyManager
+from ..monitoring.plugin_monitor import PluginMonitor
+from ..security.plugin_sandbox import PluginSandbox
 from ..features.plugin_lifecycle import PluginState
 from ..utils.config_encryption import ConfigEncryption
+from ..utils.plugin_manifest import PluginManifest
+
+# 插件文件修改后等待的时间（毫秒），编辑器保存时会连续触发多次修改通知
+HOT_RELOAD_DEBOUNCE_MS = 300
+
+
+def open_plugin_store(plugin_dir: str) -> Tuple[ConfigEncryption, PluginStore]:
+    """打开插件目录中的配置加密和统一存储，第一次打开时导入旧版文件"""
+    config_dir = os.path.join(plugin_dir, 'configs')
+    os.makedirs(config_dir, exist_ok=True)
+    encryption = ConfigEncryption(os.path.join(config_dir, 'config.key'))
+    store = PluginStore(os.path.join(config_dir, STORE_FILE_NAME))
+    store.migrate_legacy(
+        config_dir,
+        [os.path.join(config_dir, 'permissions.json'), os.path.join(plugin_dir, 'permissions.json')],
+        os.path.join(plugin_dir, 'signatures.json'),
+        encryption
+    )
+    return encryption, store
+
+
+def read_plugin_settings(plugin_dir: str, plugin_name: str) -> Tuple[Dict[str, Any], int]:
+    """
+    只读取一个插件的配置和已授予权限的位掩码，不创建插件系统
+
+    批处理在主进程中读取一次后交给工作进程，工作进程不再打开插件存储。
+    """
+    encryption, store = open_plugin_store(plugin_dir)
+    try:
+        config = PluginConfig(os.path.join(plugin_dir, 'configs'), encryption, store=store).get_config(plugin_name)
+        permissions = PluginPermissionManager(None, store=store).get_granted_mask(plugin_name)
+    finally:
+        store.close()
+    return dict(config), permissions
 
 @dataclass
 class PluginInfo:
@@ -19,7 +64,13 @@ class PluginInfo:
     version: str
     description: str
     path: str
-    instance: PluginInterface
+    instance: Optional[PluginInterface]  # 延迟加载的插件在第一次使用前为 None
+    manifest: Optional[PluginManifest] = None
+
+    @property
+    def imported(self) -> bool:
+        """插件模块是否已导入并实例化"""
+        return self.instance is not None
 
 class PluginSystem:
     """插件系统核心类"""
@@ -29,19 +80,21 @@ class PluginSystem:
         self.plugin_dir = plugin_dir
         self.config_dir = os.path.join(self.plugin_dir, 'configs')  # 插件配置目录
         self.permission_file = os.path.join(self.plugin_dir, 'permissions.json')
+        self.signature_file = os.path.join(self.plugin_dir, 'signatures.json')
         
         # 确保目录结构
         os.makedirs(self.plugin_dir, exist_ok=True)
         os.makedirs(self.config_dir, exist_ok=True)
         
         # 初始化配置加密
-        key_file = os.path.join(self.plugin_dir, 'configs/config.key')
-        self.config_encryption = ConfigEncryption(key_file)
-        
-        # 初始化组件
-        self.config = PluginConfig(self.config_dir, self.config_encryption)
+        with profiler.phase('配置解密'):
+            # 配置、权限和签名保存在同一个数据库中，启动时一次读出，第一次启动时导入旧版文件
+            self.config_encryption, self.store = open_plugin_store(self.plugin_dir)
+
+            # 初始化组件
+            self.config = PluginConfig(self.config_dir, self.config_encryption, store=self.store)
         self.loader = PluginLoader(plugin_dir=self.plugin_dir, plugin_system=self)
-        self.permission_manager = PluginPermissionManager(self.permission_file)
+        self.permission_manager = PluginPermissionManager(self.permission_file, store=self.store)
         self.permission_manager.set_plugin_config(self.config)
         self.dependency_manager = DependencyManager()
         
@@ -50,10 +103,25 @@ class PluginSystem:
         self._plugin_states: Dict[str, PluginState] = {}
         self._running_plugins = {}
         self._logger = logging.getLogger(__name__)
-        self._event_bus = event_bus
+        self._event_bus = event_bus or get_event_bus()  # 与插件共用的事件总线
+        self.monitor = PluginMonitor(self._event_bus)  # 记录 process_data、start、stop 和插件任务的性能
+        self.sandbox = PluginSandbox(self.plugin_dir)  # 清单中启用沙箱的插件在子进程中处理无界面表格
+        self.executor = get_execution_service()  # 所有插件共用的常驻工作线程和进程
+        self.async_runner = get_async_runner()  # 运行插件 async def process 的后台事件循环
+
+        # 后台加载状态
+        self._load_executor: Optional[ThreadPoolExecutor] = None
+        self._load_levels: List[List[str]] = []
+        self._pending_imports = set()
+        self._watcher = None  # 热重载的文件监视器
         
-    def process_data(self, plugin_name: str, table_view, **parameters) -> Any:
-        """使用插件处理数据"""
+    def process_data(self, plugin_name: str, table, **parameters) -> Any:
+        """
+        使用插件处理数据，table 可以是表格句柄或 QTableView
+
+        插件清单中启用了沙箱（"sandbox": {"enabled": true}）时，无界面的表格句柄在子进程中处理，
+        parameters 中的 progress 和 cancel_token 同样有效。
+        """
         plugin = self.get_plugin(plugin_name)
         if not plugin:
             raise PluginError(f"未找到插件 {plugin_name}")
@@ -73,19 +141,30 @@ class PluginSystem:
             raise PluginError(f"无效参数: {error}")
             
         try:
+            table = self.create_table_handle(plugin_name, table)
+
             # 设置表格视图
-            plugin.set_table_view(table_view)
-            
-            # 处理数据，传入合并后的参数
-            result = plugin.process_data(table_view, **parameters)
+            if table.view is not None:
+                plugin.set_table_view(table.view)
+            
+            # 处理数据，传入合并后的参数；吞吐量按整个表格的单元格数计算
+            rows = table.row_count()
+            sandbox = self._sandbox_settings(plugin_name) if table.view is None else {}
+            with self.monitor.track(plugin_name, 'process_data', rows, rows * table.column_count()):
+                if sandbox.get('enabled'):
+                    limits = {key: sandbox[key] for key in ('cpu_seconds', 'memory_mb', 'timeout') if key in sandbox}
+                    result = self.sandbox.execute_in_sandbox(plugin_name, table, limits=limits, config=config,
+                                                           **parameters)
+                else:
+                    result = plugin.process_data(table, **parameters)
             
             # 触发事件
             if self._event_bus:
-                self._event_bus.emit('plugin.data_processed', {
+                self._event_bus.emit(PluginEvent('plugin.data_processed', {
                     'plugin_name': plugin_name,
                     'parameters': parameters,
                     'result': result
-                })
+                }))
                 
             return result
             
@@ -93,6 +172,43 @@ class PluginSystem:
             self._logger.error(f"使用插件 {plugin_name} 处理数据时出错: {str(e)}")
             raise PluginError(f"插件处理错误: {str(e)}")
             
+    def run_async(self, plugin_name: str, table, progress: Optional[Callable[[int, int], None]] = None,
+                  cancel_token: Optional[CancellationToken] = None, **parameters) -> Future:
+        """
+        在后台事件循环中运行插件的 async def process，立即返回 Future
+
+        Args:
+            progress: 进度回调，参数为 (已完成数量, 总数)，在界面线程中调用
+            cancel_token: 取消令牌，取消后协程在下一个 await 处结束，Future 抛出 PluginCancelledError
+        """
+        plugin = self.get_plugin(plugin_name)
+        if not is_async_plugin(plugin):
+            raise PluginError(f"插件 {plugin_name} 没有实现 async def process")
+        table = self.create_table_handle(plugin_name, table)
+        context = PluginContext(plugin_name, table, self.async_runner, self.executor,
+                                self._event_bus, cancel_token, progress)
+        rows = table.row_count()
+
+        async def run():
+            with self.monitor.track(plugin_name, 'process', rows, rows * table.column_count()):
+                return await plugin.process(table, context, **parameters)
+
+        return self.async_runner.submit(run(), context.cancel_token)
+
+    def _sandbox_settings(self, plugin_name: str) -> Dict[str, Any]:
+        """插件清单中的沙箱设置，没有清单时返回空字典"""
+        manifest = self.loader.load_manifest(plugin_name)
+        return manifest.sandbox if manifest is not None else {}
+
+    def create_table_handle(self, plugin_name: str, table) -> TableHandle:
+        """把表格视图包装为表格句柄（已是句柄时直接使用），并附上插件已授予权限的位掩码"""
+        if not isinstance(table, TableHandle):
+            # 延迟导入，避免插件系统依赖界面模型
+            from models.table_model import TableModelHandle
+            table = TableModelHandle.from_view(table)
+        table.permissions = self.permission_manager.get_granted_mask(plugin_name)
+        return table
+        
     def deactivate_plugin(self, plugin_name: str) -> bool:
         """停用插件"""
         if plugin_name not in self._plugins:
@@ -100,14 +216,15 @@ class PluginSystem:
             
         try:
             plugin = self._plugins[plugin_name].instance
-            plugin.deactivate()
+            if plugin is not None:
+                plugin.deactivate()
             self._plugin_states[plugin_name] = PluginState.INACTIVE
             
             # 触发事件
             if self._event_bus:
-                self._event_bus.emit('plugin.deactivated', {
+                self._event_bus.emit(PluginEvent('plugin.deactivated', {
                     'plugin_name': plugin_name
-                })
+                }))
                 
             return True
             
@@ -121,15 +238,16 @@ class PluginSystem:
             return False
             
         try:
-            plugin = self._plugins[plugin_name].instance
-            plugin.start()
+            plugin = self.get_plugin(plugin_name)
+            with self.monitor.track(plugin_name, 'start'):
+                plugin.start()
             self._running_plugins[plugin_name] = plugin
             
             # 触发事件
             if self._event_bus:
-                self._event_bus.emit('plugin.started', {
+                self._event_bus.emit(PluginEvent('plugin.started', {
                     'plugin_name': plugin_name
-                })
+                }))
                 
             return True
             
@@ -142,14 +260,15 @@ class PluginSystem:
         plugin = self._running_plugins.get(plugin_name)
         if plugin:
             try:
-                plugin.stop()
+                with self.monitor.track(plugin_name, 'stop'):
+                    plugin.stop()
                 del self._running_plugins[plugin_name]
                 
                 # 触发事件
                 if self._event_bus:
-                    self._event_bus.emit('plugin.stopped', {
+                    self._event_bus.emit(PluginEvent('plugin.stopped', {
                         'plugin_name': plugin_name
-                    })
+                    }))
                     
                 return True
                 
@@ -166,20 +285,47 @@ class PluginSystem:
         """获取插件状态"""
         return self._plugin_states.get(plugin_name)
         
-    def load_plugin(self, plugin_name: str, show_info: bool = False) -> bool:
-        """加载单个插件"""
+    def load_plugin(self, plugin_name: str, show_info: bool = False, lazy: bool = True) -> bool:
+        """
+        加载单个插件
+
+        插件有清单文件且 lazy 为 True 时只读取清单，模块在第一次激活或使用时才导入；
+        lazy 为 False 时（包括重新加载）立即导入，清单同样保存在插件信息中。
+        """
         try:
-            # 使用 loader 加载插件类
-            plugin_class = self.loader.load_plugin(plugin_name)
-            if not plugin_class:
-                return False
-                
-            # 实例化并初始化插件
-            plugin = plugin_class()
-            plugin.plugin_system = self
-            plugin.initialize()
+            manifest = self.loader.load_manifest(plugin_name)
+            if manifest is not None and lazy:
+                self._register_plugin(plugin_name, None, manifest)
+            else:
+                plugin = self._create_plugin(plugin_name)
+                if plugin is None:
+                    return False
+                self._register_plugin(plugin_name, plugin, manifest)
+            return True
             
-            # 保存插件信息
+        except Exception as e:
+            self._logger.error(f"加载插件 {plugin_name} 失败: {str(e)}")
+            self._plugin_states[plugin_name] = PluginState.ERROR
+            if show_info:
+                raise PluginError(f"加载插件失败: {str(e)}")
+            return False
+
+    def _register_plugin(self, plugin_name: str, plugin: Optional[PluginInterface],
+                         manifest: Optional[PluginManifest] = None) -> PluginInfo:
+        """保存插件信息并触发 plugin.loaded 事件，有清单时插件实例可以为 None"""
+        if manifest is not None:
+            # 注册清单中的依赖，激活时检查，加载时用于排序
+            for dependency in manifest.dependencies:
+                self.dependency_manager.add_dependency(plugin_name, dependency)
+            plugin_info = PluginInfo(
+                name=manifest.name,
+                version=manifest.version,
+                description=manifest.description,
+                path=f"{self.plugin_dir}/{plugin_name}.py",
+                instance=plugin,
+                manifest=manifest
+            )
+        else:
             plugin_info = PluginInfo(
                 name=plugin.get_name(),
                 version=plugin.get_version(),
@@ -187,26 +333,51 @@ class PluginSystem:
                 path=f"{self.plugin_dir}/{plugin_name}.py",
                 instance=plugin
             )
-            
-            self._plugins[plugin_name] = plugin_info
-            self._plugin_states[plugin_name] = PluginState.LOADED
-            
-            # 触发事件
-            if self._event_bus:
-                self._event_bus.emit('plugin.loaded', {
-                    'plugin_name': plugin_name,
-                    'plugin_info': plugin_info
-                })
-                
-            return True
-            
+
+        self._plugins[plugin_name] = plugin_info
+        self._plugin_states[plugin_name] = PluginState.LOADED
+
+        # 触发事件
+        if self._event_bus:
+            self._event_bus.emit(PluginEvent('plugin.loaded', {
+                'plugin_name': plugin_name,
+                'plugin_info': plugin_info
+            }))
+        return plugin_info
+            
+    def _create_plugin(self, plugin_name: str, plugin_class=None) -> Optional[PluginInterface]:
+        """导入插件模块（已在后台导入时直接使用 plugin_class），实例化并初始化插件"""
+        start = time.perf_counter()
+        # 使用 loader 加载插件类
+        if plugin_class is None:
+            plugin_class = self.loader.load_plugin(plugin_name)
+        if not plugin_class:
+            return None
+
+        # 实例化并初始化插件
+        plugin = plugin_class()
+        plugin.plugin_system = self
+        plugin.initialize()
+        self._logger.info(f"创建插件 {plugin_name} 耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+        return plugin
+
+    def _import_plugin(self, plugin_info: PluginInfo, plugin_name: str) -> Optional[PluginInterface]:
+        """导入延迟加载的插件"""
+        try:
+            plugin = self._create_plugin(plugin_name)
         except Exception as e:
-            self._logger.error(f"加载插件 {plugin_name} 失败: {str(e)}")
+            self._logger.error(f"导入插件 {plugin_name} 失败: {str(e)}")
             self._plugin_states[plugin_name] = PluginState.ERROR
-            if show_info:
-                raise PluginError(f"加载插件失败: {str(e)}")
-            return False
-            
+            return None
+        if plugin is None:
+            return None
+        if plugin.get_version() != plugin_info.version:
+            self._logger.warning(
+                f"插件 {plugin_name} 的清单版本 {plugin_info.version} 与模块版本 {plugin.get_version()} 不一致"
+            )
+        plugin_info.instance = plugin
+        return plugin
+
     def load_all_plugins(self) -> None:
         """加载所有可用插件"""
         available_plugins = self.loader.scan_plugins()
@@ -226,14 +397,105 @@ class PluginSystem:
                 self._logger.error(f"加载插件 {plugin_name} 失败: {str(e)}")
                 continue
                 
+    def load_all_plugins_async(self, max_workers: Optional[int] = None) -> None:
+        """
+        在后台加载所有可用插件，需要在主线程调用，且主线程有事件循环
+
+        有清单的插件只读取清单，立即注册；其余插件按依赖层级分组，
+        同一层的插件模块在线程池中并发导入，导入完成后回到主线程实例化并触发 plugin.loaded，
+        一层全部完成后再加载下一层。全部完成后触发 plugin.all_loaded 事件。
+        """
+        if self._load_executor is not None:
+            self._logger.warning("插件正在后台加载")
+            return
+
+        eager_plugins = []
+        for plugin_name in self.loader.scan_plugins():
+            try:
+                manifest = self.loader.load_manifest(plugin_name)
+                if manifest is None:
+                    eager_plugins.append(plugin_name)
+                else:
+                    self._register_plugin(plugin_name, None, manifest)
+            except Exception as e:
+                self._logger.error(f"加载插件 {plugin_name} 失败: {str(e)}")
+                self._plugin_states[plugin_name] = PluginState.ERROR
+
+        try:
+            self._load_levels = self.dependency_manager.get_load_levels(eager_plugins)
+        except PluginError as e:
+            self._logger.error(f"计算插件加载顺序失败: {str(e)}")
+            self._load_levels = [[name] for name in eager_plugins]
+
+        # 导入结果经事件总线排队回到主线程处理
+        self._event_bus.subscribe('plugin.imported', self._on_plugin_imported)
+        self._load_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='PluginLoader')
+        self._load_next_level()
+
+    def _load_next_level(self) -> None:
+        """提交下一层插件的导入任务，没有剩余的层时结束后台加载"""
+        while self._load_levels:
+            level = self._load_levels.pop(0)
+            if level:
+                self._pending_imports = set(level)
+                for plugin_name in level:
+                    self._load_executor.submit(self._import_module, plugin_name)
+                return
+
+        self._load_executor.shutdown(wait=False)
+        self._load_executor = None
+        self._event_bus.unsubscribe('plugin.imported', self._on_plugin_imported)
+        self._event_bus.emit(PluginEvent('plugin.all_loaded', {'plugins': list(self._plugins)}))
+
+    def _import_module(self, plugin_name: str) -> None:
+        """在工作线程中导入插件模块，只加载插件类，不创建任何界面对象"""
+        start = time.perf_counter()
+        try:
+            with profiler.phase(f'导入插件 {plugin_name}'):
+                plugin_class, error = self.loader.load_plugin(plugin_name), None
+        except Exception as e:
+            plugin_class, error = None, str(e)
+        self._logger.info(f"导入插件 {plugin_name} 耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+        self._event_bus.emit(PluginEvent('plugin.imported', {
+            'plugin_name': plugin_name,
+            'plugin_class': plugin_class,
+            'error': error
+        }))
+
+    def _on_plugin_imported(self, data: Dict[str, Any]) -> None:
+        """主线程中实例化后台导入完成的插件"""
+        plugin_name = data['plugin_name']
+        try:
+            if data['error']:
+                raise PluginError(data['error'])
+            with profiler.phase(f'创建插件 {plugin_name}'):
+                plugin = self._create_plugin(plugin_name, data['plugin_class'])
+            if plugin is None:
+                raise PluginError("未找到插件类")
+            self._register_plugin(plugin_name, plugin)
+        except Exception as e:
+            self._logger.error(f"加载插件 {plugin_name} 失败: {str(e)}")
+            self._plugin_states[plugin_name] = PluginState.ERROR
+
+        self._pending_imports.discard(plugin_name)
+        if not self._pending_imports:
+            self._load_next_level()
+
     def unload_plugin(self, plugin_name: str) -> bool:
         """卸载插件"""
         if plugin_name in self._plugins:
             try:
                 plugin = self._plugins[plugin_name].instance
-                plugin.cleanup()
+                if plugin is not None:
+                    plugin.cleanup()
                 del self._plugins[plugin_name]
                 self.loader.unload_plugin(plugin_name)
+
+                # 触发事件
+                if self._event_bus:
+                    self._event_bus.emit(PluginEvent('plugin.unloaded', {
+                        'plugin_name': plugin_name
+                    }))
                 return True
             except Exception as e:
                 self._logger.error(f"卸载插件 {plugin_name} 失败: {str(e)}")
@@ -246,7 +508,10 @@ class PluginSystem:
             return False
             
         try:
-            plugin = self._plugins[plugin_name].instance
+            # 延迟加载的插件在第一次激活时导入
+            plugin = self.get_plugin(plugin_name)
+            if plugin is None:
+                return False
             
             # 检查依赖
             error = self.dependency_manager.check_dependencies(
@@ -258,13 +523,14 @@ class PluginSystem:
                 return False
                 
             # 获取并检查权限
-            required_permissions = plugin.get_required_permissions()
-            granted_permissions = self.permission_manager.get_granted_permissions(plugin_name)
-            
-            missing_permissions = required_permissions - granted_permissions
-            if missing_permissions:
-                self._logger.warning(f"插件 {plugin_name} 缺少必要权限: {missing_permissions}")
+            required_mask = PluginPermission.to_mask(plugin.get_required_permissions())
+            missing_mask = required_mask & ~self.permission_manager.get_granted_mask(plugin_name)
+            if missing_mask:
+                self._logger.warning(
+                    f"插件 {plugin_name} 缺少必要权限: {PluginPermission.from_mask(missing_mask)}"
+                )
                 return False
+            granted_permissions = self.permission_manager.get_granted_permissions(plugin_name)
                 
             # 激活插件
             plugin.activate(granted_permissions)
@@ -272,10 +538,10 @@ class PluginSystem:
             
             # 触发事件
             if self._event_bus:
-                self._event_bus.emit('plugin.activated', {
+                self._event_bus.emit(PluginEvent('plugin.activated', {
                     'plugin_name': plugin_name,
                     'plugin_info': self._plugins[plugin_name]
-                })
+                }))
                 
             return True
             
@@ -285,9 +551,13 @@ class PluginSystem:
             return False
             
     def get_plugin(self, plugin_name: str) -> Optional[PluginInterface]:
-        """获取插件实例"""
+        """获取插件实例，延迟加载的插件在此时导入"""
         plugin_info = self._plugins.get(plugin_name)
-        return plugin_info.instance if plugin_info else None
+        if plugin_info is None:
+            return None
+        if plugin_info.instance is None:
+            return self._import_plugin(plugin_info, plugin_name)
+        return plugin_info.instance
         
     def get_plugin_info(self, plugin_name: str) -> Optional[PluginInfo]:
         """获取插件信息"""
@@ -302,33 +572,64 @@ class PluginSystem:
         return self._plugin_states.get(plugin_name) == PluginState.ACTIVE 
         
     def reload_plugin(self, plugin_name: str) -> bool:
-        """重新加载插件"""
+        """
+        重新加载插件
+
+        保存旧实例的状态后停止、停用并卸载插件，重新导入模块并把状态交给新实例，
+        再恢复到原来的激活/运行状态。
+        """
         try:
             # 1. 保存状态
             old_state = None
+            was_active = self.is_plugin_active(plugin_name)
+            was_running = self.is_plugin_running(plugin_name)
             if plugin_name in self._plugins:
-                old_state = self._plugins[plugin_name].instance.save_state()
+                plugin = self._plugins[plugin_name].instance
+                if plugin is not None:
+                    old_state = plugin.save_state()
+                if was_running:
+                    self.stop_plugin(plugin_name)
+                if was_active:
+                    self.deactivate_plugin(plugin_name)
                 self.unload_plugin(plugin_name)
                 
-            # 2. 重新加载
-            self.load_plugin(plugin_name)
+            # 2. 立即重新导入，模块有错误时在这里暴露出来
+            if not self.load_plugin(plugin_name, lazy=False):
+                return False
             
             # 3. 恢复状态
-            if old_state and plugin_name in self._plugins:
-                self._plugins[plugin_name].instance.restore_state(old_state)
+            plugin = self.get_plugin(plugin_name)
+            if old_state:
+                plugin.restore_state(old_state)
+            if was_active:
+                self.activate_plugin(plugin_name)
+            if was_running:
+                self.start_plugin(plugin_name)
                 
             # 4. 触发事件
             if self._event_bus:
-                self._event_bus.emit('plugin.reloaded', {
+                self._event_bus.emit(PluginEvent('plugin.reloaded', {
                     'plugin_name': plugin_name,
                     'plugin_info': self._plugins.get(plugin_name)
-                })
+                }))
                 
             return True
             
         except Exception as e:
             self._logger.error(f"重新加载插件 {plugin_name} 失败: {str(e)}")
             return False
+
+    def enable_hot_reload(self, debounce_ms: int = HOT_RELOAD_DEBOUNCE_MS) -> None:
+        """监视插件目录，插件文件修改后自动重新加载，需要在主线程调用"""
+        if self._watcher is None:
+            from ..features.plugin_hot_reload import PluginWatcher
+            self._watcher = PluginWatcher(self, debounce_ms)
+
+    def disable_hot_reload(self) -> None:
+        """停止监视插件目录"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
             
     def get_plugin_config(self, plugin_name: str) -> Dict[str, Any]:
         """获取插件配置"""
@@ -351,10 +652,10 @@ class PluginSystem:
         
         # 触发事件
         if self._event_bus:
-            self._event_bus.emit('plugin.config_changed', {
+            self._event_bus.emit(PluginEvent('plugin.config_changed', {
                 'plugin_name': plugin_name,
                 'config': config
-            })
+            }))
             
     def request_permission(self, plugin_name: str, permission: PluginPermission) -> bool:
         """请求插件权限"""
@@ -370,7 +671,7 @@ class PluginSystem:
         
         # 触发事件
         if self._event_bus:
-            self._event_bus.emit('plugin.permission_revoked', {
+            self._event_bus.emit(PluginEvent('plugin.permission_revoked', {
                 'plugin_name': plugin_name,
                 'permission': permission
-            })
+            }))
@@ -0,0 +1,145 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..features.plugin_permissions import ALL_PERMISSIONS, TABLE_READ_MASK, TABLE_WRITE_MASK
+
+# 颜色使用 (R, G, B) 元组表示，避免依赖 QColor
+Color = Tuple[int, int, int]
+HIGHLIGHT_COLOR: Color = (255, 255, 0)  # 黄色，标记插件修改过的单元格
+
+
+class TableHandle:
+    """
+    插件访问表格数据的接口，与界面无关
+
+    插件通过它读写单元格，而不是直接访问 QTableView 和模型，
+    因此同一份插件代码可以在界面、批处理和多进程中运行。
+    行列号均从 0 开始。
+    """
+
+    # 在界面中运行时对应的表格视图，无界面运行时为 None
+    view = None
+
+    # 插件已授予权限的位掩码，由插件系统在交给插件前设置，读写时只需一次按位与；
+    # 批处理等直接创建句柄的调用方默认拥有全部权限
+    permissions = ALL_PERMISSIONS
+
+    def _denied(self, action: str) -> None:
+        raise PermissionError(f"插件没有{action}表格数据的权限")
+
+    def row_count(self) -> int:
+        """返回行数"""
+        raise NotImplementedError
+
+    def column_count(self) -> int:
+        """返回列数"""
+        raise NotImplementedError
+
+    def get_value(self, row: int, col: int) -> str:
+        """获取单元格的当前值，空单元格返回空字符串"""
+        raise NotImplementedError
+
+    def get_column(self, col: int, rows: Optional[Iterable[int]] = None) -> List[str]:
+        """批量获取一列中指定行的值，rows 为 None 时返回整列"""
+        if not self.permissions & TABLE_READ_MASK:
+            self._denied('读取')
+        if rows is None:
+            rows = range(self.row_count())
+        return [self.get_value(row, col) for row in rows]
+
+    def set_values(self, col: int, updates: Dict[int, Any], color: Optional[Color] = None) -> None:
+        """
+        批量设置一列中多个单元格的值
+
+        Args:
+            col: 列号
+            updates: 行号到新值的映射
+            color: 同时设置的背景色，None 表示不修改颜色
+        """
+        raise NotImplementedError
+
+    def set_color(self, row: int, col: int, color: Color) -> None:
+        """设置单元格背景色"""
+        raise NotImplementedError
+
+    def commit(self) -> None:
+        """把修改写回底层数据源（工作表），默认无需处理"""
+        pass
+
+
+class ColumnTableHandle(TableHandle):
+    """
+    基于按列存储数据的表格句柄，不依赖 Qt
+
+    适用于批处理、多进程和测试。修改记录在 changes 和 colors 中，
+    由调用方决定如何写回文件。
+    """
+
+    def __init__(self, columns: Optional[List[List[str]]] = None, row_count: int = 0):
+        self._columns: List[List[str]] = columns or []
+        self._row_count = max([row_count] + [len(column) for column in self._columns])
+        for column in self._columns:
+            column.extend([''] * (self._row_count - len(column)))
+        self.changes: Dict[Tuple[int, int], Any] = {}  # (row, col) -> 新值
+        self.colors: Dict[Tuple[int, int], Color] = {}  # (row, col) -> 背景色
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Iterable[Any]]) -> 'ColumnTableHandle':
+        """从按行迭代的数据构建，None 视为空单元格"""
+        columns: List[List[str]] = []
+        row_count = 0
+        for row_index, row in enumerate(rows):
+            for col_index, value in enumerate(row):
+                if col_index >= len(columns):
+                    columns.append([''] * row_index)
+                columns[col_index].append('' if value is None else str(value))
+            row_count = row_index + 1
+            for column in columns:
+                if len(column) < row_count:
+                    column.append('')
+        return cls(columns, row_count)
+
+    @classmethod
+    def from_worksheet(cls, worksheet) -> 'ColumnTableHandle':
+        """从 openpyxl 工作表流式读取，支持 read_only 模式打开的工作簿"""
+        return cls.from_rows(worksheet.iter_rows(values_only=True))
+
+    def row_count(self) -> int:
+        return self._row_count
+
+    def column_count(self) -> int:
+        return len(self._columns)
+
+    def get_value(self, row: int, col: int) -> str:
+        if not self.permissions & TABLE_READ_MASK:
+            self._denied('读取')
+        if 0 <= col < len(self._columns) and 0 <= row < self._row_count:
+            return self._columns[col][row]
+        return ''
+
+    def get_column(self, col: int, rows: Optional[Iterable[int]] = None) -> List[str]:
+        if not self.permissions & TABLE_READ_MASK:
+            self._denied('读取')
+        if not 0 <= col < len(self._columns):
+            return [''] * (self._row_count if rows is None else len(list(rows)))
+        column = self._columns[col]
+        if rows is None:
+            return list(column)
+        return [column[row] if 0 <= row < self._row_count else '' for row in rows]
+
+    def set_values(self, col: int, updates: Dict[int, Any], color: Optional[Color] = None) -> None:
+        if not self.permissions & TABLE_WRITE_MASK:
+            self._denied('修改')
+        while col >= len(self._columns):
+            self._columns.append([''] * self._row_count)
+        column = self._columns[col]
+        for row, value in updates.items():
+            if row >= self._row_count:
+                continue
+            column[row] = '' if value is None else str(value)
+            self.changes[(row, col)] = value
+            if color is not None:
+                self.colors[(row, col)] = color
+
+    def set_color(self, row: int, col: int, color: Color) -> None:
+        if not self.permissions & TABLE_WRITE_MASK:
+            self._denied('修改')
+        self.colors[(row, col)] = color
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 import logging
 from ..utils.plugin_error import PluginError
 
-@dataclass
+@dataclass(frozen=True)
 class PluginDependency:
     """插件依赖信息"""
     name: str
@@ -44,7 +44,8 @@ class DependencyManager:
                     continue
                 return f"缺少必需的依赖插件: {dep.name}"
                 
-            if dep.version != available_plugins[dep.name]:
+            # 未指定版本时不检查版本
+            if dep.version and dep.version != available_plugins[dep.name]:
                 return f"依赖插件 {dep.name} 版本不匹配"
                 
         return None
@@ -80,4 +81,23 @@ class DependencyManager:
             
         except Exception as e:
             self._logger.error(f"计算插件加载顺序时出错: {str(e)}")
-            raise PluginError(f"计算加载顺序失败: {str(e)}") 
\ No newline at end of file
+            raise PluginError(f"计算加载顺序失败: {str(e)}") 
+
+    def get_load_levels(self, plugins: List[str]) -> List[List[str]]:
+        """
+        按依赖层级分组插件
+
+        同一层的插件互不依赖，可以并发加载；每一层只依赖之前各层的插件。
+        """
+        levels: Dict[str, int] = {}
+        for plugin in self.get_load_order(plugins):
+            levels[plugin] = 1 + max(
+                (levels[dep.name] for dep in self.get_dependencies(plugin)
+                 if not dep.optional and dep.name in levels),
+                default=-1
+            )
+
+        groups: List[List[str]] = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+        for plugin, level in levels.items():
+            groups[level].append(plugin)
+        return groups
@@ -1,33 +1,30 @@
-from typing import Dict, List, Any, Callable
+from typing import Any, Callable, Optional
 from abc import ABC, abstractmethod
+from utils.event_bus import DeliveryMode, EventBus as SharedEventBus, get_event_bus
 
 class EventBus:
-    """事件总线"""
+    """
+    插件使用的事件总线
+
+    不再单独维护监听器，而是转发到应用共享的事件总线（utils.event_bus），
+    插件和界面之间的事件可以互相收到。处理函数在发送线程中同步调用，
+    接收的 Event 对象兼容旧的字典格式（event['type']、event['data']、event['source']）。
+    """
     
-    def __init__(self):
-        self._subscribers: Dict[str, List[Callable]] = {}
+    def __init__(self, bus: Optional[SharedEventBus] = None):
+        self._bus = bus or get_event_bus()
         
     def subscribe(self, event_type: str, handler: Callable) -> None:
         """订阅事件"""
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
-        self._subscribers[event_type].append(handler)
+        self._bus.subscribe(event_type, handler, mode=DeliveryMode.SYNC, pass_event=True)
         
     def unsubscribe(self, event_type: str, handler: Callable) -> None:
         """取消订阅"""
-        if event_type in self._subscribers:
-            self._subscribers[event_type].remove(handler)
+        self._bus.unsubscribe(event_type, handler)
             
     def emit(self, event_type: str, data: Any = None, source: str = None) -> None:
         """触发事件"""
-        if event_type in self._subscribers:
-            event_data = {
-                'type': event_type,
-                'data': data,
-                'source': source
-            }
-            for handler in self._subscribers[event_type]:
-                handler(event_data)
+        self._bus.emit(event_type, data, source=source)
 
 class PluginEventInterface(ABC):
     """插件事件接口"""
@@ -0,0 +1,118 @@
+import os
+import logging
+from typing import Dict, Set
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer
+from ..utils.plugin_manifest import MANIFEST_SUFFIX
+
+
+class PluginWatcher(QObject):
+    """
+    插件目录监视器
+
+    插件文件或清单修改后等待 debounce_ms 毫秒，合并这段时间内的所有修改通知，
+    只重新加载源码哈希真正变化的插件；新增的插件文件会被加载，删除的插件会被卸载。
+    """
+
+    def __init__(self, plugin_system, debounce_ms: int = 300):
+        super().__init__()
+        self.plugin_system = plugin_system
+        self.plugin_dir = plugin_system.plugin_dir
+        self._logger = logging.getLogger(__name__)
+        self._changed: Set[str] = set()
+        self._hashes: Dict[str, str] = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._reload_changed)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.addPath(self.plugin_dir)
+        for plugin_name in self.plugin_system.loader.scan_plugins():
+            self._watch(plugin_name)
+        self._logger.info(f"开始监视插件目录: {self.plugin_dir}")
+
+    def _plugin_files(self, plugin_name: str):
+        return (os.path.join(self.plugin_dir, f"{plugin_name}.py"),
+                os.path.join(self.plugin_dir, f"{plugin_name}{MANIFEST_SUFFIX}"))
+
+    def _watch(self, plugin_name: str) -> None:
+        """监视插件的源码和清单，并记录当前的源码哈希"""
+        watched = set(self._watcher.files())
+        for path in self._plugin_files(plugin_name):
+            if os.path.exists(path) and path not in watched:
+                self._watcher.addPath(path)
+        source_hash = self._source_hash(plugin_name)
+        if source_hash:
+            self._hashes[plugin_name] = source_hash
+
+    def _source_hash(self, plugin_name: str) -> str:
+        try:
+            plugin_path = self._plugin_files(plugin_name)[0]
+            return self.plugin_system.loader.cache.get(plugin_name, plugin_path).source_hash
+        except Exception:
+            # 文件已删除或正在写入
+            return ''
+
+    def _plugin_name(self, path: str) -> str:
+        file_name = os.path.basename(path)
+        if file_name.endswith(MANIFEST_SUFFIX):
+            return file_name[:-len(MANIFEST_SUFFIX)]
+        return os.path.splitext(file_name)[0]
+
+    def _on_file_changed(self, path: str) -> None:
+        self._changed.add(self._plugin_name(path))
+        self._timer.start()
+
+    def _on_directory_changed(self, path: str) -> None:
+        # 新增、删除插件，或编辑器以“写临时文件再改名”的方式保存后原路径不再被监视
+        current = set(self.plugin_system.loader.scan_plugins())
+        watched = set(self._watcher.files())
+        for plugin_name in current | set(self._hashes):
+            if (plugin_name not in current or plugin_name not in self._hashes
+                    or self._plugin_files(plugin_name)[0] not in watched):
+                self._changed.add(plugin_name)
+        if self._changed:
+            self._timer.start()
+
+    def _reload_changed(self) -> None:
+        changed, self._changed = self._changed, set()
+        for plugin_name in sorted(changed):
+            if not os.path.exists(self._plugin_files(plugin_name)[0]):
+                if self._hashes.pop(plugin_name, None) is not None:
+                    self._logger.info(f"插件文件已删除，卸载插件 {plugin_name}")
+                    self.plugin_system.unload_plugin(plugin_name)
+                continue
+
+            old_hash = self._hashes.get(plugin_name)
+            self._watch(plugin_name)
+            plugin_info = self.plugin_system.get_plugin_info(plugin_name)
+
+            if plugin_info is None:
+                self._logger.info(f"发现新插件 {plugin_name}")
+                self.plugin_system.load_plugin(plugin_name)
+            elif self._manifest_changed(plugin_name, plugin_info):
+                self._logger.info(f"插件 {plugin_name} 的清单已修改，重新加载")
+                self.plugin_system.reload_plugin(plugin_name)
+            elif old_hash != self._hashes.get(plugin_name) and plugin_info.imported:
+                # 尚未导入的插件下次使用时自然会导入新代码
+                self._logger.info(f"插件 {plugin_name} 已修改，重新加载")
+                self.plugin_system.reload_plugin(plugin_name)
+
+    def _manifest_changed(self, plugin_name: str, plugin_info) -> bool:
+        """清单文件是否与已加载的清单不同"""
+        try:
+            manifest = self.plugin_system.loader.load_manifest(plugin_name)
+        except Exception as e:
+            self._logger.warning(f"读取插件 {plugin_name} 的清单失败: {str(e)}")
+            return False
+        return manifest != plugin_info.manifest
+
+    def stop(self) -> None:
+        """停止监视"""
+        self._timer.stop()
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
@@ -1,5 +1,5 @@
 from enum import Enum, auto
-from typing import Dict, Set, Optional
+from typing import Dict, Set, Optional, Iterable
 import json
 import os
 import logging
@@ -28,19 +28,51 @@ class PluginPermission(Enum):
         }
         return descriptions.get(permission, "未知权限")
 
+    @property
+    def mask(self) -> int:
+        """权限对应的位"""
+        return 1 << (self.value - 1)
+
+    @staticmethod
+    def to_mask(permissions: Iterable['PluginPermission']) -> int:
+        """把权限集合转换为位掩码"""
+        mask = 0
+        for permission in permissions:
+            mask |= permission.mask
+        return mask
+
+    @staticmethod
+    def from_mask(mask: int) -> Set['PluginPermission']:
+        """把位掩码转换为权限集合"""
+        return {permission for permission in PluginPermission if mask & permission.mask}
+
+
+# 常用的权限掩码，热路径上的检查只需一次按位与
+ALL_PERMISSIONS = PluginPermission.to_mask(PluginPermission)
+# 读写表格数据需要 FILE_*（现有插件按此申请）或 DATA_* 中的任意一个
+TABLE_READ_MASK = PluginPermission.FILE_READ.mask | PluginPermission.DATA_READ.mask
+TABLE_WRITE_MASK = PluginPermission.FILE_WRITE.mask | PluginPermission.DATA_WRITE.mask
+
 class PluginPermissionManager:
     """插件权限管理器"""
     
-    def __init__(self, permission_file: str, encryption: ConfigEncryption = None):
+    def __init__(self, permission_file: str, encryption: ConfigEncryption = None, store=None):
         self.permission_file = permission_file
         self._permissions = {}
+        self._masks: Dict[str, int] = {}  # 每个插件已授予权限的位掩码，随授予和撤销更新
         self._logger = logging.getLogger(__name__)
         self.plugin_config = None  # 将在PluginSystem初始化时设置
         self.permission_file = permission_file
         self._encryption = encryption # 加密配置文件
+        self._store = store  # 统一存储，提供时不再读写权限文件
         
+        if store is not None:
+            for plugin_name, perms in store.get_permissions().items():
+                self._permissions[plugin_name] = {
+                    PluginPermission[p] for p in perms if p in PluginPermission.__members__
+                }
         # 如果提供了权限文件路径，则从文件加载权限
-        if permission_file and os.path.exists(permission_file):
+        elif permission_file and os.path.exists(permission_file):
             try:
                     data=None
                     if self._encryption:
@@ -58,8 +90,11 @@ class PluginPermissionManager:
             except Exception as e:
                 self._logger.error(f"加载权限配置失败: {str(e)}")
         
+        for plugin_name, perms in self._permissions.items():
+            self._masks[plugin_name] = PluginPermission.to_mask(perms)
+
         # 确保权限文件目录存在
-        if permission_file:
+        if permission_file and store is None:
             os.makedirs(os.path.dirname(permission_file), exist_ok=True)
         
     def set_plugin_config(self, plugin_config):
@@ -89,14 +124,31 @@ class PluginPermissionManager:
         if plugin_name not in self._permissions:
             self._permissions[plugin_name] = set()
         self._permissions[plugin_name].add(permission)
-        self._save_permissions()
+        self._masks[plugin_name] = self._masks.get(plugin_name, 0) | permission.mask
+        if self._store is not None:
+            # 只写入变化的一行
+            self._store.add_permission(plugin_name, permission.name)
+        else:
+            self._save_permissions()
         
     def revoke_permission(self, plugin_name: str, permission: PluginPermission) -> None:
         """撤销权限"""
         if plugin_name in self._permissions:
             self._permissions[plugin_name].discard(permission)
-            self._save_permissions()
+            self._masks[plugin_name] = self._masks.get(plugin_name, 0) & ~permission.mask
+            if self._store is not None:
+                self._store.remove_permission(plugin_name, permission.name)
+            else:
+                self._save_permissions()
             
     def get_granted_permissions(self, plugin_name: str) -> Set[PluginPermission]:
         """获取已授予的权限"""
         return self._permissions.get(plugin_name, set())
+
+    def get_granted_mask(self, plugin_name: str) -> int:
+        """获取已授予权限的位掩码"""
+        return self._masks.get(plugin_name, 0)
+
+    def has_permission(self, plugin_name: str, permission: PluginPermission) -> bool:
+        """检查插件是否已被授予某个权限"""
+        return bool(self._masks.get(plugin_name, 0) & permission.mask)
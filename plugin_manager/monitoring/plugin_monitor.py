@@ -1,8 +1,264 @@
+import logging
+import statistics
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict, List, Any, Optional, Tuple
+
+from utils.event_bus import PluginEvent
+
+# 每个插件每种操作保留的运行记录数
+HISTORY_SIZE = 100
+# 计算基线使用的最近运行次数，以及判断回退所需的最少次数
+BASELINE_RUNS = 10
+MIN_BASELINE_RUNS = 3
+# 单位耗时超出基线 50% 以上，且总耗时多出 REGRESSION_MIN_MS 以上才算回退，避免很短的操作误报
+REGRESSION_THRESHOLD = 0.5
+REGRESSION_MIN_MS = 5.0
+# 汇总中列出的最近运行次数
+RECENT_RUNS = 5
+# 界面中一次完整的插件运行，包括等待用户操作对话框的时间，只记录不检查回退
+INTERACTIVE_OPERATION = 'interactive'
+
+
+@dataclass
+class RunRecord:
+    """
+    一次运行的记录
+
+    cpu_ms 对 track 是整个进程的 CPU 时间（包括插件启动的工作线程），对 track_task 是当前线程的 CPU 时间。
+    peak_memory 是运行期间新增内存的峰值（字节），未跟踪内存时为 0。
+    """
+    plugin_name: str
+    operation: str
+    started: float  # 开始时间（time.time）
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    peak_memory: int = 0
+    rows: int = 0
+    cells: int = 0
+    event_ms: float = 0.0  # 插件相关事件的监听器处理耗时
+    thread: str = ''
+    failed: bool = False
+    regression: Optional[str] = None  # 与基线相比的回退说明
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows * 1000 / self.wall_ms if self.wall_ms > 0 else 0.0
+
+    @property
+    def cells_per_sec(self) -> float:
+        return self.cells * 1000 / self.wall_ms if self.wall_ms > 0 else 0.0
+
+    @property
+    def cost_ms(self) -> float:
+        """单位耗时：有单元格数时为每个单元格的耗时，否则为总耗时"""
+        return self.wall_ms / self.cells if self.cells else self.wall_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['rows_per_sec'] = round(self.rows_per_sec, 1)
+        data['cells_per_sec'] = round(self.cells_per_sec, 1)
+        return data
+
+
 class PluginMonitor:
-    def track_resource_usage(self, plugin_name: str):
-        """跟踪插件资源使用情况"""
-        pass
-        
-    def detect_performance_issues(self, plugin_name: str):
-        """检测性能问题"""
-        pass 
\ No newline at end of file
+    """
+    插件性能监视器
+
+    插件系统用 track 包装 process_data、start、stop 调用，插件用 track_task（见 PluginBase.track_task）
+    包装工作线程中的任务。每次运行记录耗时、CPU 时间、内存峰值、处理的行数和单元格数以及事件处理耗时，
+    按插件和操作保存在固定长度的环形缓冲区中；单位耗时明显高于最近几次运行的中位数时标记为回退，
+    写入警告日志并发送 plugin.performance_regression 事件。INTERACTIVE_OPERATION 包含等待用户的时间，
+    不检查回退。
+
+    tracemalloc 会使分配内存的代码慢 5 倍以上，内存峰值默认不记录，需要时设置 trace_memory。
+    """
+
+    def __init__(self, event_bus=None, history: int = HISTORY_SIZE, trace_memory: bool = False):
+        self._event_bus = event_bus
+        self.history_size = history
+        self.trace_memory = trace_memory
+        self._lock = threading.Lock()
+        self._history: Dict[Tuple[str, str], Deque[RunRecord]] = {}
+        self._tracing = 0  # 正在跟踪内存的运行数，为 0 时停止 tracemalloc
+        self._owns_tracing = False
+        self._active_tasks: Dict[str, int] = {}  # 每个插件正在运行的任务数
+        self.version = 0  # 每增加一条记录加 1，界面据此判断是否需要刷新
+        self._logger = logging.getLogger(__name__)
+
+    @contextmanager
+    def track(self, plugin_name: str, operation: str, rows: int = 0, cells: int = 0):
+        """
+        记录一次插件操作，返回的记录可以在运行中更新 rows 和 cells
+
+        同时进行的多次运行共用 tracemalloc 的峰值，内存峰值只是近似值。
+        """
+        with self._run(plugin_name, operation, rows, cells, time.process_time, self.trace_memory) as record:
+            yield record
+
+    @contextmanager
+    def track_task(self, plugin_name: str, operation: str, rows: int = 0, cells: int = 0):
+        """记录工作线程中的一个任务，只统计当前线程的 CPU 时间，不跟踪内存"""
+        with self._lock:
+            self._active_tasks[plugin_name] = self._active_tasks.get(plugin_name, 0) + 1
+        try:
+            with self._run(plugin_name, operation, rows, cells, time.thread_time, False) as record:
+                yield record
+        finally:
+            with self._lock:
+                self._active_tasks[plugin_name] -= 1
+
+    @contextmanager
+    def _run(self, plugin_name: str, operation: str, rows: int, cells: int, cpu_clock, trace_memory: bool):
+        record = RunRecord(plugin_name, operation, time.time(), rows=rows, cells=cells,
+                           thread=threading.current_thread().name)
+        memory_start = self._start_tracing() if trace_memory else 0
+        event_start = self._event_time(plugin_name)
+        cpu_start = cpu_clock()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record.failed = True
+            raise
+        finally:
+            record.wall_ms = (time.perf_counter() - start) * 1000
+            record.cpu_ms = (cpu_clock() - cpu_start) * 1000
+            record.event_ms = self._event_time(plugin_name) - event_start
+            if trace_memory:
+                record.peak_memory = self._stop_tracing(memory_start)
+            self._add(record)
+
+    def _start_tracing(self) -> int:
+        """开始跟踪内存，返回当前已跟踪的内存"""
+        with self._lock:
+            if self._tracing == 0:
+                # 由其他代码启动的跟踪不负责停止
+                self._owns_tracing = not tracemalloc.is_tracing()
+                if self._owns_tracing:
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+            self._tracing += 1
+            return tracemalloc.get_traced_memory()[0]
+
+    def _stop_tracing(self, memory_start: int) -> int:
+        """结束一次运行的内存跟踪，返回运行期间新增内存的峰值"""
+        with self._lock:
+            peak = tracemalloc.get_traced_memory()[1]
+            self._tracing -= 1
+            if self._tracing == 0 and self._owns_tracing:
+                tracemalloc.stop()
+        return max(peak - memory_start, 0)
+
+    def _event_time(self, plugin_name: str) -> float:
+        if self._event_bus is None:
+            return 0.0
+        return self._event_bus.metrics.owner_time(plugin_name)
+
+    def _add(self, record: RunRecord) -> None:
+        key = (record.plugin_name, record.operation)
+        with self._lock:
+            history = self._history.get(key)
+            if history is None:
+                history = self._history[key] = deque(maxlen=self.history_size)
+            if not record.failed and record.operation != INTERACTIVE_OPERATION:
+                record.regression = self._check_regression(record, history)
+            history.append(record)
+            self.version += 1
+
+        if record.regression:
+            self._logger.warning(f"插件 {record.plugin_name} 的 {record.operation} 性能回退: {record.regression}")
+            if self._event_bus:
+                self._event_bus.emit(PluginEvent('plugin.performance_regression', {
+                    'plugin_name': record.plugin_name,
+                    'operation': record.operation,
+                    'message': record.regression,
+                    'record': record.to_dict()
+                }))
+
+    @staticmethod
+    def _check_regression(record: RunRecord, history: Deque[RunRecord]) -> Optional[str]:
+        """与最近几次成功运行的单位耗时中位数比较，返回回退说明"""
+        recent = [item.cost_ms for item in history if not item.failed][-BASELINE_RUNS:]
+        if len(recent) < MIN_BASELINE_RUNS:
+            return None
+        baseline = statistics.median(recent)
+        if baseline <= 0:
+            return None
+        expected_ms = baseline * record.cells if record.cells else baseline
+        if record.cost_ms > baseline * (1 + REGRESSION_THRESHOLD) and record.wall_ms - expected_ms > REGRESSION_MIN_MS:
+            return f"耗时 {record.wall_ms:.1f}ms，基线 {expected_ms:.1f}ms（{record.cost_ms / baseline:.1f} 倍）"
+        return None
+
+    def get_history(self, plugin_name: str, operation: Optional[str] = None) -> List[RunRecord]:
+        """获取插件的运行记录，按开始时间排列"""
+        with self._lock:
+            records = [record for (name, op), history in self._history.items()
+                       if name == plugin_name and (operation is None or op == operation)
+                       for record in history]
+        records.sort(key=lambda record: record.started)
+        return records
+
+    def get_plugins(self) -> List[str]:
+        """有运行记录的插件"""
+        with self._lock:
+            return sorted({name for name, _ in self._history})
+
+    def get_active_tasks(self, plugin_name: Optional[str] = None) -> int:
+        """正在运行的任务数，不指定插件时为所有插件的合计"""
+        with self._lock:
+            if plugin_name is None:
+                return sum(self._active_tasks.values())
+            return self._active_tasks.get(plugin_name, 0)
+
+    def track_resource_usage(self, plugin_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        汇总插件的资源使用情况
+
+        Returns:
+            {操作: {'runs', 'failed', 'regressions', 'recent_ms', 'median_ms', 'max_ms', 'cpu_ms',
+                    'cpu_ratio', 'peak_memory', 'cells_per_sec', 'event_ms'}}，recent_ms 为最近几次运行的耗时，
+            cpu_ms 和 event_ms 为所有记录的合计，cpu_ratio（CPU 时间/耗时，大于 1 表示多个线程同时工作）
+            和 cells_per_sec 取自最近一次运行
+        """
+        operations: Dict[str, List[RunRecord]] = {}
+        for record in self.get_history(plugin_name):
+            operations.setdefault(record.operation, []).append(record)
+
+        summary = {}
+        for operation, records in operations.items():
+            durations = [record.wall_ms for record in records]
+            last = records[-1]
+            summary[operation] = {
+                'runs': len(records),
+                'failed': sum(record.failed for record in records),
+                'regressions': sum(record.regression is not None for record in records),
+                'recent_ms': [round(duration, 2) for duration in durations[-RECENT_RUNS:]],
+                'median_ms': round(statistics.median(durations), 2),
+                'max_ms': round(max(durations), 2),
+                'cpu_ms': round(sum(record.cpu_ms for record in records), 2),
+                'cpu_ratio': round(last.cpu_ms / last.wall_ms, 2) if last.wall_ms > 0 else 0.0,
+                'peak_memory': max(record.peak_memory for record in records),
+                'cells_per_sec': round(last.cells_per_sec, 1),
+                'event_ms': round(sum(record.event_ms for record in records), 2)
+            }
+        return summary
+
+    def detect_performance_issues(self, plugin_name: str) -> List[str]:
+        """返回插件运行记录中被标记为回退的说明"""
+        return [f"{record.operation}: {record.regression}"
+                for record in self.get_history(plugin_name) if record.regression]
+
+    def clear(self, plugin_name: Optional[str] = None) -> None:
+        """清除运行记录，不指定插件时全部清除"""
+        with self._lock:
+            if plugin_name is None:
+                self._history.clear()
+            else:
+                for key in [key for key in self._history if key[0] == plugin_name]:
+                    del self._history[key]
+            self.version += 1
@@ -1,46 +1,54 @@
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Union
 from PyQt6.QtWidgets import QTableView, QApplication, QMessageBox, QDialog, QProgressDialog
-from PyQt6.QtCore import QModelIndex, Qt, QThreadPool, QRunnable, QObject, pyqtSignal as Signal, QAbstractTableModel, \
-    QMetaObject, QThread, QEventLoop, Q_ARG
+from PyQt6.QtCore import QModelIndex, Qt, QObject, pyqtSignal as Signal, QAbstractTableModel, QEventLoop
 from PyQt6.QtGui import QColor
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+import bisect
 import threading
+import time
 
 from utils.mouse_operations import MouseOperations
 from ui.column_settings_dialog import ColumnSettingsDialog
 from utils.common import safe_float_convert
 from utils.error_handler import ErrorHandler
+from utils.event_bus import Priority
 from ..core.plugin_base import PluginBase
+from ..core.table_handle import TableHandle, Color, HIGHLIGHT_COLOR
+from ..core.cancellation import CancellationToken
+from ..utils.plugin_error import PluginCancelledError
 from ..features.plugin_permissions import PluginPermission
 from ..features.plugin_lifecycle import PluginState
-from models.table_model import TableModel
-import logging
+from models.table_model import TableModel, TableModelHandle
+from logging_config import get_plugin_logger
 
 @dataclass
 class PartTarget:
     row: int
     value: float
-    color: QColor
+    color: Color
+    part_idx: int = -1  # 所属零件类型在 parts_config 中的索引
+
+# 写入模式：full 写入全部结果，diff 只写入有变化的单元格，dry_run 只统计变化不修改表格
+WRITE_MODES = ['diff', 'full', 'dry_run']
+
+# 处理循环中每隔多少行检查一次取消请求
+CANCEL_CHECK_ROWS = 256
 
 class XzltxsPlugin(PluginBase):
     def __init__(self):
         super().__init__()
-        self._logger = logging.getLogger(__name__)
-        self._logger.setLevel(logging.DEBUG)
-        fh = logging.FileHandler('plugin.log')
-        fh.setFormatter(logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        ))
-        self._logger.addHandler(fh)
+        # 处理器由 logging_config 统一配置，插件只使用自己的记录器，重复加载不会重复输出
+        self._logger = get_plugin_logger(self.get_name())
         self.table_view = None  # 使用基类的表格视图管理
+        self.table: Optional[TableHandle] = None  # 当前处理的表格句柄
         self.sp_disk_price = 150
         self._config = {
             'part_code_column': 2,
             'part_name_column': 3,
             'xs_column': 19,
             'price_column': 4,
-            'start_row': 2
+            'start_row': 2,
+            'write_mode': 'diff'
         }
         self._active = False
         # 零件配置
@@ -163,6 +171,23 @@ class XzltxsPlugin(PluginBase):
         
         # 线程安全的锁
         self._model_lock = threading.Lock()
+
+        # 增量重算的依赖关系：行 -> 零件类型，零件类型 -> 行列表
+        self._row_parts: Dict[int, int] = {}
+        self._part_rows: Dict[int, List[int]] = {}
+        self._dependency_columns = range(0)
+        self._valid_parts: Set[tuple] = set()  # 有效的 (编码, 名称)，每次全量处理时重建
+        self._incremental_table: Optional[TableHandle] = None
+        self._incremental_write_mode = 'diff'  # 启用增量重算的那次处理的写入模式
+        self._incremental_updating = False
+
+        # 写入模式及变化统计
+        self.write_mode = 'diff'
+        self._change_summary: Dict[str, Any] = {}
+
+        # 取消令牌；一次全量处理期间的结果先暂存，全部完成后才写入表格，取消或出错时丢弃
+        self._cancel_token = CancellationToken()
+        self._pending_results: Optional[Dict[int, List[PartTarget]]] = None
         
         # 初始化 MouseOperations 实例
         self.mouse_ops = None
@@ -223,6 +248,13 @@ class XzltxsPlugin(PluginBase):
                 'required': True,
                 'default': 2,
                 'description': '起始行'
+            },
+            'write_mode': {
+                'type': str,
+                'required': False,
+                'default': 'diff',
+                'range': WRITE_MODES,
+                'description': '写入模式 (diff/full/dry_run)'
             }
         }
 
@@ -268,6 +300,7 @@ class XzltxsPlugin(PluginBase):
         
     def deactivate(self) -> None:
         """停用插件"""
+        self._disable_incremental_updates()
         self._active = False
         self._state = PluginState.LOADED
         # 清除已授予的权限
@@ -276,6 +309,8 @@ class XzltxsPlugin(PluginBase):
     def cleanup(self) -> None:
         """清理插件资源"""
         try:
+            self._disable_incremental_updates()
+
             # 停止数据处理
             if hasattr(self, 'data_processor'):
                 try:
@@ -292,6 +327,7 @@ class XzltxsPlugin(PluginBase):
                     self.data_processor.stop()
                     self.data_processor.wait(1000)
                     self.data_processor.deleteLater()
+                    self._rollback_transaction()
                 except:
                     pass
                 finally:
@@ -367,18 +403,18 @@ class XzltxsPlugin(PluginBase):
         """处理系统事件"""
         pass
 
-    def calculate_proportional_distribution(self, targets: List[int], current_col: int, model, rules2: Dict[str, Any]) -> List[PartTarget]:
+    def calculate_proportional_distribution(self, targets: List[int], current_col: int, table: TableHandle, rules2: Dict[str, Any]) -> List[PartTarget]:
         """按比例计算分配值"""
         results = []
-        source_color = QColor(255, 255, 0)  # 黄色
+        source_color = HIGHLIGHT_COLOR  # 黄色
         
         # 收集原始值并计算总和
         original_values = []
         total_original = 0.0
         
         with self._model_lock:
-            for row in targets:
-                value = safe_float_convert(model.data(model.index(row, current_col)))
+            for value in table.get_column(current_col, targets):
+                value = safe_float_convert(value)
                 original_values.append(value)
                 total_original += value
         
@@ -438,7 +474,7 @@ class XzltxsPlugin(PluginBase):
     def calculate_value_rule(self, targets: List[int], rule: Dict[str, Any]) -> List[PartTarget]:
         """计算数值规则，返回目标列表"""
         results = []
-        source_color = QColor(255, 255, 0)  # 黄色
+        source_color = HIGHLIGHT_COLOR  # 黄色
         
         # 检查是否需要整数值
         integer = rule.get('integer', False)
@@ -467,7 +503,7 @@ class XzltxsPlugin(PluginBase):
     def calculate_distribution(self, targets: List[int], total: float, method: str = 'equal', integer: bool = False, show_decimal: bool = False) -> List[PartTarget]:
         """计算分配值，返回目标列表"""
         results = []
-        source_color = QColor(255, 255, 0)  # 黄色
+        source_color = HIGHLIGHT_COLOR  # 黄色
         num_targets = len(targets)
         
         if method == 'equal':
@@ -526,14 +562,40 @@ class XzltxsPlugin(PluginBase):
             # 使用具体的值规则
             return self.calculate_value_rule(targets, rule)
 
-    def process_column(self, current_col, cached_data):
+    def classify_part(self, part_code: str, part_name: str, price: float) -> Optional[int]:
+        """根据零件编码、名称和价格确定零件类型，返回 parts_config 中的索引"""
+        for part_config in self.parts_config:
+            # 检查零件代码条件
+            if part_config['code'] in part_code:
+                # 如果是TIRE的code (42751)
+                if part_config['code'] == self.parts_config[0]['code']:
+                    # 名称含 D 的是SP TIRE (第二个配置)，否则是普通TIRE (第一个配置)
+                    return 1 if 'D' in part_name else 0
+
+                # 如果是DISK的code (42700)
+                elif part_config['code'] == self.parts_config[2]['code']:
+                    # 价格不超过阈值的是SP DISK (第四个配置)，否则是普通DISK (第三个配置)
+                    return 3 if price <= self.sp_disk_price else 2
+
+                # 如果是CAP (44732)，使用第五个配置
+                elif part_config['code'] == self.parts_config[4]['code']:
+                    return 4
+        return None
+
+    def process_column(self, current_col, cached_data, table: Optional[TableHandle] = None):
         """处理单列数据"""
-        self._logger.info(f"处理列: {current_col}")
+        # 每列都会执行的日志使用 DEBUG 和延迟格式化，未开启时几乎没有开销
+        self._logger.debug("处理列: %s", current_col)
+        if table is None:
+            table = self.table
         results = []
         
         # 将缓存数据转换为原来的格式: (row, current_value, part_code, part_name, price)
         rows_data = []
-        for row_data in cached_data:
+        check_cancelled = self._cancel_token.raise_if_cancelled
+        for index, row_data in enumerate(cached_data):
+            if index % CANCEL_CHECK_ROWS == 0:
+                check_cancelled()
             current_value = row_data['values'].get(current_col)
             if not current_value:  # 如果为空，跳过
                 continue
@@ -559,97 +621,352 @@ class XzltxsPlugin(PluginBase):
             if not part_code and not part_name:
                 continue
 
-            # 检查每种零件类型
-            for part_idx, part_config in enumerate(self.parts_config):
-                # 检查零件代码条件
-                if part_config['code'] in part_code:
-                    # 如果是TIRE的code (42751)
-                    if part_config['code'] == self.parts_config[0]['code']:  # TIRE的code
-                        # 检查是否是SP TIRE (第二个配置)
-                        if 'D' in part_name:
-                            # 是SP TIRE，使用第二个配置
-                            part_targets[1].append(row)
-                        else:
-                            # 是普通TIRE，使用第一个配置
-                            part_targets[0].append(row)
-                        break
-                    
-                    # 如果是DISK的code (42700)
-                    elif part_config['code'] == self.parts_config[2]['code']:  # DISK的code
-                        # 检查是否是SP DISK (第四个配置)
-                        if price <= self.sp_disk_price:
-                            # 是SP DISK，使用第四个配置
-                            part_targets[3].append(row)
-                        else:
-                            # 是普通DISK，使用第三个配置
-                            part_targets[2].append(row)
-                        break
-
-                    # 如果是CAP (44732)，使用第五个配置
-                    elif part_config['code'] == self.parts_config[4]['code']:
-                        part_targets[4].append(row)
-                        break
+            # 检查零件类型
+            part_idx = self.classify_part(part_code, part_name, price)
+            if part_idx is not None:
+                part_targets[part_idx].append(row)
 
         # 处理每种类型的目标单元格
-        self._logger.info(f"处理当前列{current_col}的目标单元格")
+        self._logger.debug("处理当前列%s的目标单元格", current_col)
         for part_idx, targets in part_targets.items():
             if not targets:  # 跳过没有目标的类型
                 continue
+            check_cancelled()
+            results.extend(self.calculate_part_group(part_idx, targets, current_col, table))
+        self._logger.debug("处理当前列%s的目标单元格完成", current_col)
 
-            part_config = self.parts_config[part_idx]
-            # 使用 rules2 进行处理
-            if 'rules2' in part_config:
-                results.extend(self.calculate_proportional_distribution(
-                    targets,
-                    current_col,
-                    self.table_view.model(),  # 从 table_view 获取 model
-                    part_config['rules2']
-                ))
-            else:
-                # 如果没有 rules2，使用原来的规则
-                results.extend(self.calculate_rules(targets, part_config['rules']))
-        self._logger.info(f"处理当前列{current_col}的目标单元格完成")
-        
         return results
 
-    def apply_results(self, results: List[PartTarget], current_col: int, model):
+    def calculate_part_group(self, part_idx: int, targets: List[int], current_col: int, table: TableHandle) -> List[PartTarget]:
+        """计算单个零件类型在某一列上的分配结果"""
+        part_config = self.parts_config[part_idx]
+        # 使用 rules2 进行处理
+        if 'rules2' in part_config:
+            results = self.calculate_proportional_distribution(
+                targets,
+                current_col,
+                table,
+                part_config['rules2']
+            )
+        else:
+            # 如果没有 rules2，使用原来的规则
+            results = self.calculate_rules(targets, part_config['rules'])
+        for target in results:
+            target.part_idx = part_idx
+        return results
+
+    def get_part_label(self, part_idx: int) -> str:
+        """获取零件类型的显示名称，区分普通件和SP件"""
+        if not 0 <= part_idx < len(self.parts_config):
+            return '未知'
+        part_config = self.parts_config[part_idx]
+        return f"SP {part_config['name']}" if part_config.get('is_special') else part_config['name']
+
+    @staticmethod
+    def _values_equal(old_value: Any, new_value: Any) -> bool:
+        """比较单元格原值和新值，数值按数值比较"""
+        if str(old_value) == str(new_value):
+            return True
+        try:
+            return abs(float(str(old_value).replace(',', '')) - float(new_value)) < 1e-9
+        except (ValueError, TypeError):
+            return False
+
+    def diff_results(self, results: List[PartTarget], current_col: int, table: TableHandle) -> List[PartTarget]:
+        """将计算结果与单元格当前值批量比较，只返回真正发生变化的结果"""
+        current_values = table.get_column(current_col, [target.row for target in results])
+        return [
+            target for target, old_value in zip(results, current_values)
+            if not self._values_equal(old_value, target.value)
+        ]
+
+    def summarize_changes(self, changes: List[PartTarget], current_col: int) -> None:
+        """把一列的变化累加到变化统计中"""
+        with self._model_lock:
+            summary = self._change_summary
+            summary['total'] = summary.get('total', 0) + len(changes)
+            columns = summary.setdefault('columns', {})
+            parts = summary.setdefault('parts', {})
+            if changes:
+                columns[current_col] = columns.get(current_col, 0) + len(changes)
+            for target in changes:
+                label = self.get_part_label(target.part_idx)
+                parts[label] = parts.get(label, 0) + 1
+
+    def handle_column_results(self, results: List[PartTarget], current_col: int, table: TableHandle,
+                              write_mode: Optional[str] = None) -> None:
+        """按写入模式处理一列的计算结果，write_mode 默认为当前的写入模式"""
+        write_mode = write_mode or self.write_mode
+        if write_mode == 'full':
+            self.summarize_changes(results, current_col)
+            self._write_results(results, current_col, table)
+            return
+
+        changes = self.diff_results(results, current_col, table)
+        self.summarize_changes(changes, current_col)
+        if write_mode != 'dry_run' and changes:
+            self._write_results(changes, current_col, table)
+
+    def _write_results(self, results: List[PartTarget], current_col: int, table: TableHandle) -> None:
+        """写入一列的结果；处于事务中时先暂存，提交时统一写入"""
+        with self._model_lock:
+            if self._pending_results is not None:
+                self._pending_results.setdefault(current_col, []).extend(results)
+                return
+        self.apply_results(results, current_col, table)
+
+    def _begin_transaction(self) -> None:
+        """开始一次全量处理：之后的结果只暂存不写入"""
+        with self._model_lock:
+            self._pending_results = {}
+
+    def _commit_transaction(self, table: TableHandle) -> None:
+        """把暂存的结果一次性写入表格"""
+        with self._model_lock:
+            pending, self._pending_results = self._pending_results, None
+        for col, results in sorted((pending or {}).items()):
+            self.apply_results(results, col, table)
+
+    def _rollback_transaction(self) -> None:
+        """丢弃暂存的结果和变化统计，表格保持处理前的状态"""
+        with self._model_lock:
+            self._pending_results = None
+            self._change_summary = {'total': 0, 'columns': {}, 'parts': {}}
+
+    def cancel(self) -> None:
+        """请求取消正在进行的处理，处理代码会在下一个数据块边界退出"""
+        self._cancel_token.cancel()
+
+    def apply_parameters(self, parameters: Dict[str, Any]) -> None:
+        """用运行参数（通常来自插件配置）更新列设置和写入模式"""
+        for key in ('part_code_column', 'part_name_column', 'xs_column', 'price_column', 'start_row'):
+            if key in parameters:
+                setattr(self, key, int(parameters[key]))
+        write_mode = parameters.get('write_mode', self._config.get('write_mode', 'diff'))
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"无效的写入模式: {write_mode}")
+        self.write_mode = write_mode
+        self._change_summary = {'total': 0, 'columns': {}, 'parts': {}}
+
+    def process_table(self, table: TableHandle, progress: Optional[Callable[[int, int], None]] = None,
+                      cancel_token: Optional[CancellationToken] = None, **parameters) -> Dict[str, Any]:
+        """
+        无界面同步处理整个表格，供批处理、多进程和测试等不显示窗口的场景使用
+
+        不弹出列设置对话框和进度条，列设置取自 parameters。
+        全部列处理完成后才写入表格，取消或出错时表格不会被修改。
+
+        Args:
+            table: 表格句柄
+            progress: 进度回调，参数为 (已完成列数, 总列数)
+            cancel_token: 取消令牌，取消后抛出 PluginCancelledError
+
+        Returns:
+            Dict[str, Any]: 变化统计，格式同 get_change_summary
+        """
+        if not self._active:
+            raise RuntimeError("插件未激活")
+        self.apply_parameters(parameters)
+        self._cancel_token = cancel_token or CancellationToken()
+
+        self._begin_transaction()
+        try:
+            max_col = table.column_count()
+            cached_data = self.cache_valid_data(table)
+            if self.write_mode != 'dry_run':
+                # 试运行不修改表格，保留上次处理的依赖关系供增量重算使用
+                self.build_dependency_map(cached_data, max_col)
+            total_cols = max(max_col - self.xs_column, 0)
+            rows = len(cached_data)
+            for done, col in enumerate(range(self.xs_column, max_col), 1):
+                with self.track_task('process_column', rows, rows):
+                    results = self.process_column(col, cached_data, table)
+                    if results:
+                        self.handle_column_results(results, col, table)
+                if progress:
+                    progress(done, total_cols)
+            self._cancel_token.raise_if_cancelled()
+        except BaseException:
+            self._rollback_transaction()
+            raise
+        self._commit_transaction(table)
+        return self.get_change_summary()
+
+    def cache_valid_data(self, table: TableHandle) -> List[Dict[str, Any]]:
+        """缓存有效数据"""
+        valid_data = []
+        start_row = self.start_row
+        max_row = table.row_count()
+        max_col = table.column_count()
+        
+        # 创建parts_config的查找集合，提高查找效率；增量重算时复用
+        valid_parts = self._valid_parts = {
+            (str(config.get('code', '')), config.get('name', ''))
+            for config in self.parts_config
+        }
+        
+        # 批量获取数据
+        check_cancelled = self._cancel_token.raise_if_cancelled
+        for row in range(start_row, max_row):
+            if row % CANCEL_CHECK_ROWS == 0:
+                check_cancelled()
+            part_code = table.get_value(row, self.part_code_column)
+            part_name = table.get_value(row, self.part_name_column)
+            
+            # 检查是否是有效数据
+            if (part_code, part_name) in valid_parts:
+                # 缓存这一行的所有必要数据
+                row_data = {
+                    'row': row,
+                    'part_code': part_code,
+                    'part_name': part_name,
+                    'price': safe_float_convert(table.get_value(row, self.price_column)),
+                    'values': {}  # 存储从xs_column开始到最后一列的所有数据
+                }
+                
+                # 缓存从xs_column开始到最后一列的所有数据
+                for col in range(self.xs_column, max_col):
+                    cell_value = table.get_value(row, col)
+                    # 转换为浮点数，如果转换失败则保留原值
+                    if isinstance(cell_value, (int, float)):
+                        cell_value = float(cell_value)
+                    elif isinstance(cell_value, str):
+                        try:
+                            cell_value = float(cell_value)
+                        except (ValueError, TypeError):
+                            pass
+                    row_data['values'][col] = cell_value
+                    
+                valid_data.append(row_data)
+        
+        return valid_data
+
+    def build_dependency_map(self, cached_data, max_col: int) -> None:
+        """
+        根据缓存数据建立源单元格到输出分组的依赖关系
+
+        编码、名称、价格单元格影响该行所属零件类型在所有系数列上的分组，
+        系数单元格只影响该行所属零件类型在该列上的分组。
+        """
+        with self._model_lock:
+            self._row_parts = {}
+            self._part_rows = {i: [] for i in range(len(self.parts_config))}
+            for row_data in cached_data:
+                part_idx = self.classify_part(row_data['part_code'], row_data['part_name'], row_data['price'])
+                if part_idx is not None:
+                    self._row_parts[row_data['row']] = part_idx
+                    self._part_rows[part_idx].append(row_data['row'])
+            self._dependency_columns = range(self.xs_column, max_col)
+
+    def get_affected_groups(self, row: int, col: int, table: TableHandle) -> Set[tuple]:
+        """获取单元格 (row, col) 变更后需要重新计算的 (零件类型, 列) 分组"""
+        if row < self.start_row:
+            return set()
+
+        if col in (self.part_code_column, self.part_name_column, self.price_column):
+            # 行的零件类型可能改变，旧类型和新类型的所有列都需要重新计算
+            old_part = self._row_parts.get(row)
+            new_part = self._classify_table_row(row, table)
+            if new_part != old_part:
+                if old_part is not None:
+                    del self._row_parts[row]
+                    self._part_rows[old_part].remove(row)
+                if new_part is not None:
+                    self._row_parts[row] = new_part
+                    bisect.insort(self._part_rows[new_part], row)
+            parts = {p for p in (old_part, new_part) if p is not None}
+            return {(p, c) for p in parts for c in self._dependency_columns}
+
+        if col in self._dependency_columns and row in self._row_parts:
+            return {(self._row_parts[row], col)}
+
+        return set()
+
+    def _classify_table_row(self, row: int, table: TableHandle) -> Optional[int]:
+        """从表格中读取一行的零件信息并确定零件类型"""
+        part_code = table.get_value(row, self.part_code_column)
+        part_name = table.get_value(row, self.part_name_column)
+        if (part_code, part_name) not in self._valid_parts:
+            return None
+        price = safe_float_convert(table.get_value(row, self.price_column))
+        return self.classify_part(part_code, part_name, price)
+
+    def recompute_groups(self, groups: Set[tuple], table: TableHandle, write_mode: Optional[str] = None) -> None:
+        """只重新计算并应用受影响的 (零件类型, 列) 分组"""
+        by_column: Dict[int, List[PartTarget]] = {}
+        for part_idx, col in sorted(groups):
+            rows = self._part_rows.get(part_idx, [])
+            targets = [
+                row for row, value in zip(rows, table.get_column(col, rows))
+                if safe_float_convert(value) != 0
+            ]
+            if targets:
+                by_column.setdefault(col, []).extend(
+                    self.calculate_part_group(part_idx, targets, col, table)
+                )
+        for col, results in by_column.items():
+            self.handle_column_results(results, col, table, write_mode)
+
+    def _enable_incremental_updates(self, table: TableHandle) -> None:
+        """全量处理完成后，监听模型的数据变更以进行增量重算"""
+        self._disable_incremental_updates()
+        model = getattr(table, 'model', None)
+        if model is None:
+            return  # 无界面运行时没有数据变更信号
+        self._incremental_table = table
+        self._incremental_write_mode = self.write_mode
+        model.dataChanged.connect(self._on_source_data_changed)
+
+    def _disable_incremental_updates(self) -> None:
+        """停止监听模型的数据变更"""
+        table = getattr(self, '_incremental_table', None)
+        if table is not None:
+            try:
+                table.model.dataChanged.disconnect(self._on_source_data_changed)
+            except (TypeError, RuntimeError):
+                pass
+        self._incremental_table = None
+
+    def _on_source_data_changed(self, top_left, bottom_right, roles=None):
+        """单元格数据变更时，仅重新计算受影响的分组"""
+        if self._incremental_updating or not self._active:
+            return
+        if roles and Qt.ItemDataRole.DisplayRole not in roles and Qt.ItemDataRole.EditRole not in roles:
+            return  # 只有颜色等变更，不影响计算结果
+
+        table = self._incremental_table
+        self._incremental_updating = True
+        try:
+            start = time.perf_counter()
+            groups = set()
+            for row in range(top_left.row(), bottom_right.row() + 1):
+                for col in range(top_left.column(), bottom_right.column() + 1):
+                    groups |= self.get_affected_groups(row, col, table)
+            if groups:
+                # 之后的试运行会改变 write_mode，增量重算仍按启用时的写入模式写入
+                self.recompute_groups(groups, table, self._incremental_write_mode)
+                self._logger.debug("增量重算 %d 个分组，耗时 %.1fms",
+                                   len(groups), (time.perf_counter() - start) * 1000)
+        except Exception as e:
+            self._logger.error(f"增量重算时发生错误: {str(e)}")
+        finally:
+            self._incremental_updating = False
+
+    def apply_results(self, results: List[PartTarget], current_col: int, table: TableHandle):
         """应用处理结果到表格"""
-        self._logger.info(f"开始应用处理结果到列: {current_col}, 目标数量: {len(results)}")
+        self._logger.debug("开始应用处理结果到列: %s, 目标数量: %d", current_col, len(results))
         try:
-            # 批量更新以提高性能
+            # 批量更新以提高性能，按颜色分组后一次写入
             with self._model_lock:
-                # 预先准备所有更新数据
-                updates = []
+                updates_by_color: Dict[Color, Dict[int, Any]] = {}
                 for target in results:
-                    updates.append({
-                        'row': target.row,
-                        'value': target.value,
-                        'color': target.color
-                    })
-                
-                # 批量应用更新
-                if isinstance(model, TableModel):
-                    # 如果是自定义的 TableModel，使用批量更新方法
-                    model.batch_update_cells(current_col, updates)
-                else:
-                    # 对于标准模型，使用常规方式更新
-                    for update in updates:
-                        # 设置单元格值
-                        model.setData(
-                            model.index(update['row'], current_col),
-                            update['value'],
-                            Qt.ItemDataRole.EditRole
-                        )
-                        # 设置单元格颜色
-                        model.setData(
-                            model.index(update['row'], current_col),
-                            update['color'],
-                            Qt.ItemDataRole.BackgroundRole
-                        )
-                    
+                    updates_by_color.setdefault(target.color, {})[target.row] = target.value
+                for color, updates in updates_by_color.items():
+                    table.set_values(current_col, updates, color)
+
         except Exception as e:
             self._logger.error(f"应用结果时发生错误: {str(e)}")
-            ErrorHandler.handle_error(e, self.table_view, "应用结果时发生错误")
+            raise
 
     def _create_progress_dialog(self, total_cols):
         """创建进度条对话框"""
@@ -659,224 +976,171 @@ class XzltxsPlugin(PluginBase):
         progress.setValue(0)
         return progress
 
-    class DataProcessor(QThread):
+    class DataProcessor(QObject):
+        """
+        界面中的数据处理：在插件系统的执行服务中缓存数据，再把每一列作为一个任务提交，
+        不阻塞界面线程。信号在工作线程中发出，由 Qt 排队到界面线程处理。
+        """
         finished = Signal()
         progress = Signal(int)
         error = Signal(str)
         stopped = Signal()
-        task_completed = Signal(int)
-
-        class ColumnTask(QRunnable):
-            def __init__(self, col, cached_data, plugin, callback):
-                super().__init__()
-                self.col = col
-                self.cached_data = cached_data
-                self.plugin = plugin
-                self.callback = callback
-                self._logger = None
-
-            def run(self):
-                try:
-                    self._logger = logging.getLogger(__name__)
-                    self._logger.info(f"开始处理列 {self.col}")
-                    
-                    # 使用缓存的数据调用 process_column
-                    results = self.plugin.process_column(self.col, self.cached_data)
-                    if results:
-                        # 将结果应用到模型
-                        self.plugin.apply_results(results, self.col, self.plugin.table_view.model())
-                    
-                    self.callback()
-                    self._logger.info(f"列 {self.col} 处理完成")
-                except Exception as e:
-                    self._logger.error(f"处理列 {self.col} 时发生错误: {str(e)}")
-                    QMetaObject.invokeMethod(
-                        self.plugin.data_processor,
-                        "error",
-                        Qt.ConnectionType.QueuedConnection,
-                        Q_ARG(str, str(e)))
 
         def __init__(self, plugin):
             super().__init__()
             self.plugin = plugin
-            self._stop_requested = False
-            self._is_stopping = False
+            self._cancel_token = plugin._cancel_token
+            self._service = plugin.get_execution_service()
             self._completed_tasks = 0
+            self._pending_tasks = 0
             self._total_tasks = 0
             self._lock = threading.Lock()
-            self._logger = logging.getLogger(__name__)
-            
-            # 创建线程池并设置父对象
-            self.thread_pool = QThreadPool()
-            self.thread_pool.setParent(self)  # 确保线程池随线程一起销毁
+            self._done = threading.Event()
+            self._error: Optional[str] = None  # 第一个出错的任务的错误信息
+            self._logger = plugin._logger
 
-        def _on_task_completed(self, col):
-            """处理单个任务完成的槽函数"""
-            with self._lock:
-                self._completed_tasks += 1
-                self.progress.emit(self._completed_tasks)
-                self._logger.debug(f"任务完成进度: {self._completed_tasks}/{self._total_tasks}")
+        def start(self):
+            """提交处理任务后立即返回"""
+            self._done.clear()
+            self._error = None
+            try:
+                future = self._service.submit(self._prepare, priority=Priority.HIGH, cancel_token=self._cancel_token)
+            except Exception as e:
+                self._logger.error(f"提交数据处理任务失败: {str(e)}")
+                self._fail(str(e))
+                self._finish()
+                return
+            # 开始前就被取消时 _prepare 不会执行
+            future.add_done_callback(lambda f: f.cancelled() and self._finish())
 
-        def run(self):
+        def _prepare(self):
+            """缓存有效数据，然后为每一列提交一个任务"""
             try:
                 self._logger.info("开始数据处理")
-                model = self.plugin.table_view.model()
-                if not model:
-                    raise ValueError("无表格模型")
-                    
-                max_col = model.columnCount()
-                self._total_tasks = max_col - self.plugin.xs_column
+                table = self.plugin.table
+                if table is None:
+                    raise ValueError("无表格数据")
+
+                max_col = table.column_count()
+                columns = range(self.plugin.xs_column, max_col)
+                self._total_tasks = self._pending_tasks = len(columns)
                 self._completed_tasks = 0
                 self._logger.info(f"总列数: {self._total_tasks}")
-                self.thread_pool.setMaxThreadCount(min(self._total_tasks, 8))
-                
-                # 在主循环前连接信号
-                self.task_completed.connect(self._on_task_completed, Qt.ConnectionType.QueuedConnection)
-                
+
                 # 预处理：缓存有效数据
-                self._logger.info("开始缓存有效数据")
-                cached_data = self._cache_valid_data(model)
+                cached_data = self.plugin.cache_valid_data(table)
                 self._logger.info(f"缓存完成，有效数据行数: {len(cached_data)}")
-                
-                # 创建所有任务
-                tasks = []
-                for col in range(self.plugin.xs_column, max_col):
-                    if self._stop_requested:
-                        break
-                        
-                    self._logger.info(f"创建列 {col} 的处理任务")
-                    task = self.ColumnTask(
-                        col=col,
-                        cached_data=cached_data,  # 传入缓存的数据
-                        plugin=self.plugin,
-                        callback=lambda c=col: self.task_completed.emit(c)
-                    )
-                    tasks.append(task)
-                    
-                # 批量提交任务
-                for task in tasks:
-                    if self._stop_requested:
-                        break
-                    self.thread_pool.start(task)
-                    
-                self._logger.info(f"已提交 {self._total_tasks} 个任务到线程池")
-                
-                # 等待所有任务完成或被终止
-                while not self._stop_requested and self._completed_tasks < self._total_tasks:
-                    if self.thread_pool.waitForDone(100):  # 如果所有任务完成，跳出循环
-                        break
-                    QThread.msleep(10)  # 短暂休眠避免CPU过载
-                    
-                # 确保所有任务都完成或被清理
-                self.thread_pool.waitForDone()
-                
-                # 断开信号连接
-                try:
-                    self.task_completed.disconnect(self._on_task_completed)
-                except:
-                    pass
-                    
-                if self._stop_requested:
-                    self._logger.info("数据处理被用户终止")
-                    self.stopped.emit()
-                else:
-                    self._logger.info("数据处理完成")
-                    self.finished.emit()
-                    
+                if self.plugin.write_mode != 'dry_run':
+                    self.plugin.build_dependency_map(cached_data, max_col)
+            except PluginCancelledError:
+                self._logger.info("数据处理被用户终止")
+                self._finish()
+                return
             except Exception as e:
                 self._logger.error(f"处理数据时发生错误: {str(e)}")
-                self.error.emit(str(e))
+                self._fail(str(e))
+                self._finish()
+                return
 
-        def stop(self):
-            """停止处理"""
-            try:
-                if self._is_stopping:  # 防止重复停止
+            if not columns:
+                self._finish()
+                return
+            for index, col in enumerate(columns):
+                try:
+                    future = self._service.submit(self._process_column, col, cached_data,
+                                                  cancel_token=self._cancel_token)
+                except Exception as e:
+                    self._logger.error(f"提交列 {col} 的任务失败: {str(e)}")
+                    self._fail(str(e))
+                    # 未提交的任务不会结束，从待完成数中扣除，已提交的任务结束后仍只发出一次信号
+                    self._skip_tasks(len(columns) - index)
                     return
-                
-                self._is_stopping = True
-                self._logger.info("强制终止数据处理")
-                self._stop_requested = True
-                
-                # 清空线程池中的所有任务
-                self.thread_pool.clear()
-                
-                # 等待线程池清空
-                self.thread_pool.waitForDone(100)
-                
-                # 发出停止信号
-                self.stopped.emit()
-                
-                # 退出当前线程
-                self.quit()
-                self.wait(1000)  # 等待最多1秒
-                
+                future.add_done_callback(self._on_task_done)
+            self._logger.info(f"已提交 {self._total_tasks} 个任务")
+
+        def _process_column(self, col, cached_data):
+            try:
+                self._logger.debug("开始处理列 %s", col)
+                rows = len(cached_data)
+                with self.plugin.track_task('process_column', rows, rows):
+                    results = self.plugin.process_column(col, cached_data)
+                    if results:
+                        # 按写入模式暂存结果，全部完成后统一写入
+                        self.plugin.handle_column_results(results, col, self.plugin.table)
+                self._logger.debug("列 %s 处理完成", col)
+            except PluginCancelledError:
+                self._logger.debug("列 %s 的处理已取消", col)
             except Exception as e:
-                self._logger.error(f"停止处理时发生错误: {str(e)}")
-                ErrorHandler.handle_error(e,self,f"停止处理时发生错误: {str(e)}")
-            finally:
-                self._is_stopping = False
-
-        def _cache_valid_data(self, model):
-            """缓存有效数据"""
-            valid_data = []
-            start_row = self.plugin.start_row
-            max_row = model.rowCount()
-            max_col = model.columnCount()
-            
-            # 创建parts_config的查找集合，提高查找效率
-            valid_parts = {
-                (str(config.get('code', '')), config.get('name', ''))
-                for config in self.plugin.parts_config
-            }
-            
-            # 批量获取数据
-            for row in range(start_row, max_row):
-                part_code = str(model.data(model.index(row, self.plugin.part_code_column)) or '')
-                part_name = str(model.data(model.index(row, self.plugin.part_name_column)) or '')
-                
-                # 检查是否是有效数据
-                if (part_code, part_name) in valid_parts:
-                    # 缓存这一行的所有必要数据
-                    row_data = {
-                        'row': row,
-                        'part_code': part_code,
-                        'part_name': part_name,
-                        'price': safe_float_convert(model.data(model.index(row, self.plugin.price_column))),
-                        'values': {}  # 存储从xs_column开始到最后一列的所有数据
-                    }
-                    
-                    # 缓存从xs_column开始到最后一列的所有数据
-                    for col in range(self.plugin.xs_column, max_col):
-                        cell_value = model.data(model.index(row, col))
-                        # 转换为浮点数，如果转换失败则保留原值
-                        if isinstance(cell_value, (int, float)):
-                            cell_value = float(cell_value)
-                        elif isinstance(cell_value, str):
-                            try:
-                                cell_value = float(cell_value)
-                            except (ValueError, TypeError):
-                                pass
-                        row_data['values'][col] = cell_value
-                        
-                    valid_data.append(row_data)
-            
-            return valid_data
+                self._logger.error(f"处理列 {col} 时发生错误: {str(e)}")
+                self._fail(str(e))
+
+        def _fail(self, message: str):
+            """记录第一个错误并取消其余任务，所有任务结束后由 _finish 发出 error 信号"""
+            with self._lock:
+                if self._error is None:
+                    self._error = message
+            self._service.cancel(self._cancel_token)
+
+        def _on_task_done(self, future):
+            """每个列任务结束（包括开始前被取消）时调用，最后一个任务结束后发出完成信号"""
+            with self._lock:
+                self._pending_tasks -= 1
+                if not future.cancelled():
+                    self._completed_tasks += 1
+                    self.progress.emit(self._completed_tasks)
+                last = self._pending_tasks == 0
+            if last:
+                self._finish()
+
+        def _skip_tasks(self, count: int):
+            """扣除不会执行的任务，待完成数为 0 时发出完成信号"""
+            with self._lock:
+                self._pending_tasks -= count
+                last = self._pending_tasks == 0
+            if last:
+                self._finish()
+
+        def _finish(self):
+            """所有任务结束后调用一次，只发出 error、stopped、finished 中的一个信号"""
+            # 先标记结束，信号处理函数中调用 wait 时不会阻塞
+            self._done.set()
+            if self._error is not None:
+                self.error.emit(self._error)
+            elif self._cancel_token.cancelled:
+                self._logger.info("数据处理被用户终止")
+                self.stopped.emit()
+            else:
+                self._logger.info("数据处理完成")
+                self.finished.emit()
+
+        def stop(self):
+            """请求停止处理，不阻塞调用线程，处理结束后发出 stopped 信号"""
+            self._logger.info("请求终止数据处理")
+            # 取消尚未开始的任务，正在运行的任务会自行检查取消令牌
+            self._service.cancel(self._cancel_token)
 
-    def process_data(self, table_view: Optional[QTableView] = None, **parameters) -> Any:  # type: ignore[override]  # QTableView, **parameters) -> Any:
-        """处理数据"""
-        # 从 parameters 中获取配置值
-        part_code_column = parameters.get('part_code_column', 2)  # 使用默认值
-        part_name_column = parameters.get('part_name_column', 3)
-        xs_column = parameters.get('xs_column', 19)
-        price_column = parameters.get('price_column', 4)
-        start_row = parameters.get('start_row', 2)
+        def wait(self, timeout_ms: int = -1) -> bool:
+            """等待处理结束，返回是否已结束"""
+            return self._done.wait(None if timeout_ms < 0 else timeout_ms / 1000)
+
+    def process_data(self, table: Union[TableHandle, QTableView, None] = None, **parameters) -> Any:
+        """
+        处理数据
+
+        传入带视图的表格句柄（或 QTableView）时在界面中处理，显示配置对话框和进度条；
+        传入无视图的句柄时直接同步处理，返回变化统计。
+        """
+        if isinstance(table, TableHandle) and table.view is None:
+            return self.process_table(table, **parameters)
+
+        self.apply_parameters(parameters)
 
         try:
             # 启动插件处理
             self.start()  # 调用基类的 start 方法，触发 plugin.started 事件
             
             # 等待数据处理完成
-            result = self._process_data(table_view, **parameters)
+            result = self._process_data(table, **parameters)
             
             # 创建事件循环等待处理完成
             loop = QEventLoop()
@@ -884,8 +1148,13 @@ class XzltxsPlugin(PluginBase):
                 self.data_processor.finished.connect(loop.quit)
                 self.data_processor.stopped.connect(loop.quit)
                 self.data_processor.error.connect(loop.quit)
-                loop.exec()  # 等待直到处理完成
-            
+                # 提交失败时结束信号在连接前已同步发出，已结束的处理不再等待
+                if not self.data_processor.wait(0):
+                    loop.exec()  # 等待直到处理完成
+
+            if result and self.write_mode == 'dry_run':
+                # 试运行返回变化统计，不修改表格
+                return self.get_change_summary()
             return result
         except Exception as e:
             self._logger.error(f"处理数据时发生错误: {str(e)}")
@@ -894,12 +1163,19 @@ class XzltxsPlugin(PluginBase):
             # 确保处理完成后停止插件
             self.stop()  # 调用基类的 stop 方法，触发 plugin.stopped 事件
 
-    def _process_data(self, table_view: QTableView, **parameters) -> Any:
+    def _process_data(self, table: Union[TableHandle, QTableView, None], **parameters) -> Any:
         """处理数据的具体实现"""
         self._logger.info("开始处理数据")
         try:
+            if self.write_mode != 'dry_run':
+                # 试运行不修改表格，上次处理启用的增量重算继续有效
+                self._disable_incremental_updates()
             self._error_occurred = False
-            self.table_view = table_view or self.get_table_view()
+            self._cancel_token = CancellationToken()
+            if isinstance(table, TableHandle):
+                self.table_view = table.view
+            else:
+                self.table_view = table or self.get_table_view()
             if not self.table_view:
                 raise ValueError("无效的表格视图")
                 
@@ -907,10 +1183,12 @@ class XzltxsPlugin(PluginBase):
             self.set_table_view(self.table_view)
 
             # 获取数据模型
-            model = self.table_view.model()
-            if not model:
+            if not self.table_view.model():
                 self._logger.info("无表格模型")
                 raise ValueError("无表格模型")
+            if not isinstance(table, TableHandle):
+                table = TableModelHandle.from_view(self.table_view)
+            self.table = table
             
             # 检查必要权限
             if not self._active:
@@ -945,7 +1223,7 @@ class XzltxsPlugin(PluginBase):
                 return None  # 用户取消配置
             QApplication.processEvents()
 
-            max_col = self.table_view.model().columnCount()
+            max_col = self.table.column_count()
             total_cols = max_col - self.xs_column
             self._logger.info(f"总列数: {total_cols}")
 
@@ -970,8 +1248,9 @@ class XzltxsPlugin(PluginBase):
             self.progress.show()
             QApplication.processEvents()  # 确保UI更新
             
-            # 启动处理器
+            # 启动处理器，结果在处理完成前只暂存不写入
             self._logger.info("启动数据处理器")
+            self._begin_transaction()
             self.data_processor.start()
             
             return True  # 返回 True 表示处理已经开始
@@ -981,38 +1260,56 @@ class XzltxsPlugin(PluginBase):
             self._logger.error(f"处理数据时发生错误: {str(e)}")
             return False
         
+    def get_change_summary(self) -> Dict[str, Any]:
+        """获取最近一次处理的变化统计：总数、每列数量、每种零件类型数量"""
+        with self._model_lock:
+            return {
+                'total': self._change_summary.get('total', 0),
+                'columns': dict(sorted(self._change_summary.get('columns', {}).items())),
+                'parts': dict(self._change_summary.get('parts', {}))
+            }
+
     def _on_processing_finished(self):
         """处理完成时的回调"""
         self._logger.info("数据处理完成")
-        if isinstance(self.table_view.model(), TableModel):
-            self.table_view.model().save_changes()
         if hasattr(self, 'progress') and self.progress:
             self.progress.close()
-        
+        if self.write_mode == 'dry_run':
+            # 试运行没有要写入的结果，结束事务但保留变化统计；否则之后的增量重算结果会一直被暂存
+            with self._model_lock:
+                self._pending_results = None
+            summary = self.get_change_summary()
+            self._logger.info(f"试运行完成，变化统计: {summary}")
+            parts = ', '.join(f"{name}: {count}" for name, count in summary['parts'].items())
+            ErrorHandler.handle_info(
+                f"试运行完成，共 {summary['total']} 个单元格将被修改，涉及 {len(summary['columns'])} 列\n{parts}",
+                self.table_view
+            )
+            return
+        self._commit_transaction(self.table)
+        self.table.commit()
+        # 之后的单元格编辑只重新计算受影响的分组
+        self._enable_incremental_updates(self.table)
+
     def _on_processing_error(self, error_msg):
         """处理错误时的回调"""
         self._logger.error(f"数据处理发生错误: {error_msg}")
         self._error_occurred = True
+        # 所有任务都已结束，丢弃暂存结果，不留下只处理了一部分的列
+        self._rollback_transaction()
+        if hasattr(self, 'progress') and self.progress:
+            self.progress.close()
         ErrorHandler.handle_error(Exception(error_msg), self.table_view, "处理数据时发生错误")
-        self._on_processing_finished()
         
     def _cancel_processing(self):
         """取消处理"""
         try:
             self._logger.warning("用户取消数据处理")
             if hasattr(self, 'data_processor') and self.data_processor:
-                # 先停止处理器
+                # 只发出取消请求，不等待；处理结束后 stopped 信号触发 _on_processing_stopped
                 self.data_processor.stop()
-                
-                # 等待一小段时间确保停止信号被处理
-                QThread.msleep(100)
-                
-                # 然后断开信号连接
                 try:
-                    self.data_processor.finished.disconnect()
-                    self.data_processor.error.disconnect()
                     self.data_processor.progress.disconnect()
-                    self.data_processor.stopped.disconnect()
                     self.progress.canceled.disconnect()
                 except:
                     pass  # 忽略断开连接时的错误
@@ -1024,6 +1321,7 @@ class XzltxsPlugin(PluginBase):
         """处理停止时的回调"""
         try:
             self._logger.info("数据处理已停止")
+            self._rollback_transaction()
             
             # 关闭进度条
             if hasattr(self, 'progress'):
@@ -1163,6 +1461,8 @@ class XzltxsPlugin(PluginBase):
                     value = int(value)
                     if value < 0:
                         raise ValueError(f"{key} 不能为负数")
+                elif key == 'write_mode' and value not in WRITE_MODES:
+                    raise ValueError(f"{key} 必须是 {', '.join(WRITE_MODES)} 之一")
                 self._config[key] = value
                 self._logger.info(f"配置更新成功: {key} = {value}")
         except ValueError as e:
@@ -1247,5 +1547,12 @@ class XzltxsPlugin(PluginBase):
                 'required': True,
                 'default': 2,
                 'description': '起始行'
+            },
+            'write_mode': {
+                'type': str,
+                'required': False,
+                'default': 'diff',
+                'range': WRITE_MODES,
+                'description': '写入模式 (diff/full/dry_run)'
             }
         }
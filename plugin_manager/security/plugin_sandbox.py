@@ -1,11 +1,255 @@
-from typing import Any
+import logging
+import marshal
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..core.cancellation import CancellationToken
+from ..core.table_handle import TableHandle, Color
+from ..utils.plugin_error import PluginCancelledError, PluginLoadError, PluginRuntimeError
+
+try:
+    import resource  # 只有类 Unix 系统提供，Windows 上不限制资源
+except ImportError:
+    resource = None
+
+# 默认资源限制：CPU 时间（秒）、插件可额外使用的内存（MB），以及等待结果的最长时间（秒）。
+# 内存限制是插件加载后在已占用的地址空间之上再允许分配的量，PyQt6、openpyxl、numpy 等
+# 映射的地址空间不计入；清单中的 sandbox.memory_mb 覆盖默认值
+DEFAULT_CPU_SECONDS = 120
+DEFAULT_MEMORY_MB = 1024
+DEFAULT_TIMEOUT = 300
+# 请求取消后等待子进程自行退出的时间（秒），超时后强制结束
+CANCEL_GRACE_SECONDS = 2
+POLL_INTERVAL = 0.05
 
 
 class PluginSandbox:
-    def __init__(self):
-        self._restricted_modules = set()
-        self._resource_limits = {}
-        
-    def execute_in_sandbox(self, plugin_name: str, code: str) -> Any:
-        """在安全环境中执行插件代码"""
-        pass 
\ No newline at end of file
+    """
+    插件沙箱
+
+    在单独的子进程中运行插件的 process_table，子进程设置 CPU 时间和内存上限，
+    插件出错、超限或崩溃都不会影响主进程，计算量大的插件也可以使用另一个 CPU 核心。
+    表格数据序列化后放在共享内存中交给子进程，不经过管道复制；子进程只通过管道返回
+    进度、变化统计和修改的单元格，由主进程写回原表格。
+    子进程使用 spawn 方式启动，避免在已创建 Qt 对象和线程的进程中 fork。
+    子进程只用 PluginLoader 加载目标插件，插件配置是主进程传入的只读副本，
+    不打开插件存储，也不创建事件总线和异步运行器。
+    """
+
+    def __init__(self, plugin_dir: str, cpu_seconds: int = DEFAULT_CPU_SECONDS,
+                 memory_mb: int = DEFAULT_MEMORY_MB, timeout: float = DEFAULT_TIMEOUT):
+        self.plugin_dir = os.path.abspath(plugin_dir)
+        self.timeout = timeout
+        self._resource_limits = {'cpu_seconds': cpu_seconds, 'memory_mb': memory_mb}
+        self._context = multiprocessing.get_context('spawn')
+        self._logger = logging.getLogger(__name__)
+
+    def execute_in_sandbox(self, plugin_name: str, table: TableHandle,
+                           progress: Optional[Callable[[int, int], None]] = None,
+                           cancel_token: Optional[CancellationToken] = None,
+                           limits: Optional[Dict[str, Any]] = None,
+                           config: Optional[Dict[str, Any]] = None, **parameters) -> Dict[str, Any]:
+        """
+        在子进程中运行插件的 process_table，完成后把修改写回 table
+
+        Args:
+            plugin_name: 插件名称
+            table: 表格句柄，子进程中的句柄使用相同的权限位掩码
+            progress: 进度回调，参数为 (已完成数量, 总数)，在调用线程中执行
+            cancel_token: 取消令牌，取消后子进程在下一个数据块边界退出
+            limits: 覆盖默认的资源限制，可包含 cpu_seconds、memory_mb、timeout
+            config: 插件配置，子进程中 get_configuration 返回它的副本
+
+        Returns:
+            插件 process_table 的返回值
+
+        Raises:
+            PluginCancelledError: 处理被取消
+            PluginRuntimeError: 插件出错、超出资源限制或超时
+        """
+        limits = dict(self._resource_limits, **(limits or {}))
+        timeout = limits.pop('timeout', self.timeout)
+
+        data = marshal.dumps([table.get_column(col) for col in range(table.column_count())])
+        shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        try:
+            shm.buf[:len(data)] = data
+            conn, child_conn = self._context.Pipe()
+            cancel_event = self._context.Event()
+            process = self._context.Process(
+                target=_sandbox_main,
+                name=f"PluginSandbox-{plugin_name}",
+                args=(child_conn, cancel_event, self.plugin_dir, plugin_name, shm.name, len(data),
+                      table.row_count(), table.permissions, config or {}, parameters, limits),
+                daemon=True
+            )
+            start = time.perf_counter()
+            process.start()
+            child_conn.close()
+            try:
+                result = self._wait(plugin_name, process, conn, cancel_event, progress, cancel_token, timeout)
+            finally:
+                if process.is_alive():
+                    process.kill()
+                process.join()
+                conn.close()
+            self._logger.info(f"插件 {plugin_name} 在沙箱中运行完成，耗时 {time.perf_counter() - start:.2f}s")
+        finally:
+            shm.close()
+            shm.unlink()
+
+        self._apply_changes(table, result['changes'], result['colors'])
+        return result['summary']
+
+    def _wait(self, plugin_name: str, process, conn, cancel_event,
+              progress: Optional[Callable[[int, int], None]], cancel_token: Optional[CancellationToken],
+              timeout: float) -> Dict[str, Any]:
+        """转发进度和取消请求，直到子进程返回结果或退出"""
+        deadline = time.monotonic() + timeout
+        cancel_deadline = None
+        while True:
+            if cancel_token is not None and cancel_token.cancelled and cancel_deadline is None:
+                cancel_event.set()
+                cancel_deadline = time.monotonic() + CANCEL_GRACE_SECONDS
+
+            message = None
+            if conn.poll(POLL_INTERVAL):
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    # 子进程已退出，管道中没有更多消息
+                    process.join()
+
+            if message is None:
+                if not process.is_alive():
+                    raise PluginRuntimeError(
+                        f"插件 {plugin_name} 的沙箱进程异常退出: {_describe_exit(process.exitcode)}")
+                if cancel_deadline is not None and time.monotonic() > cancel_deadline:
+                    raise PluginCancelledError("处理已取消")
+                if time.monotonic() > deadline:
+                    raise PluginRuntimeError(f"插件 {plugin_name} 在沙箱中运行超过 {timeout} 秒")
+                continue
+
+            kind = message[0]
+            if kind == 'progress':
+                if progress:
+                    progress(message[1], message[2])
+            elif kind == 'done':
+                return message[1]
+            elif kind == 'cancelled':
+                raise PluginCancelledError("处理已取消")
+            else:
+                raise PluginRuntimeError(f"插件 {plugin_name} 在沙箱中出错: {message[1]}")
+
+    @staticmethod
+    def _apply_changes(table: TableHandle, changes: Dict[Tuple[int, int], Any],
+                       colors: Dict[Tuple[int, int], Color]) -> None:
+        """把子进程中的修改按列和颜色分组，批量写回表格"""
+        groups: Dict[Tuple[int, Optional[Color]], Dict[int, Any]] = {}
+        for (row, col), value in changes.items():
+            groups.setdefault((col, colors.get((row, col))), {})[row] = value
+        for (col, color), updates in groups.items():
+            table.set_values(col, updates, color)
+        for (row, col), color in colors.items():
+            if (row, col) not in changes:
+                table.set_color(row, col, color)
+
+
+def _describe_exit(exitcode: Optional[int]) -> str:
+    if exitcode == -signal.SIGKILL:
+        return "进程被强制结束（可能超出内存限制）"
+    if hasattr(signal, 'SIGXCPU') and exitcode == -signal.SIGXCPU:
+        return "超出 CPU 时间限制"
+    return f"退出码 {exitcode}"
+
+
+def _address_space_mb() -> Optional[int]:
+    """当前进程已占用的地址空间（MB），只在 Linux 上可以读取"""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmSize:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _apply_cpu_limit(limits: Dict[str, Any]) -> None:
+    """在子进程中设置 CPU 时间上限"""
+    cpu_seconds = limits.get('cpu_seconds')
+    if resource is None or not cpu_seconds:
+        return
+    # 软限制到达时收到 SIGXCPU，留 1 秒后再由硬限制强制结束
+    resource.setrlimit(resource.RLIMIT_CPU, (int(cpu_seconds), int(cpu_seconds) + 1))
+
+
+def _apply_memory_limit(limits: Dict[str, Any]) -> None:
+    """
+    在子进程中设置地址空间上限
+
+    插件加载后测量已占用的地址空间，上限为它加上 memory_mb，依赖库映射的大小不影响插件可用的内存。
+    无法测量时（非 Linux 系统）不设置上限。
+    """
+    memory_mb = limits.get('memory_mb')
+    if resource is None or not memory_mb:
+        return
+    used_mb = _address_space_mb()
+    if used_mb is None:
+        return
+    size = (used_mb + int(memory_mb)) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (size, size))
+
+
+def _load_plugin(plugin_dir: str, plugin_name: str, permissions: int, config: Dict[str, Any]):
+    """只加载目标插件并用主进程授予的权限激活，不创建插件系统"""
+    # 延迟导入，子进程设置 CPU 限制后再导入插件及其依赖
+    from ..utils.plugin_loader import PluginLoader
+
+    plugin = PluginLoader(plugin_dir).load_standalone(plugin_name, permissions, config)
+    if not hasattr(plugin, 'process_table'):
+        raise PluginLoadError(f"插件 {plugin_name} 不支持无界面运行")
+    return plugin
+
+
+def _sandbox_main(conn, cancel_event, plugin_dir: str, plugin_name: str, shm_name: str, size: int,
+                  row_count: int, permissions: int, config: Dict[str, Any], parameters: Dict[str, Any],
+                  limits: Dict[str, Any]) -> None:
+    """沙箱子进程入口：加载插件，读取共享内存中的表格并运行 process_table"""
+    try:
+        _apply_cpu_limit(limits)
+        plugin = _load_plugin(plugin_dir, plugin_name, permissions, config)
+        _apply_memory_limit(limits)
+
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            columns = marshal.loads(bytes(shm.buf[:size]))
+        finally:
+            shm.close()
+
+        from ..core.table_handle import ColumnTableHandle
+
+        table = ColumnTableHandle(columns, row_count)
+        table.permissions = permissions
+        cancel_token = CancellationToken()
+        threading.Thread(target=lambda: cancel_event.wait() and cancel_token.cancel(),
+                         name='SandboxCancel', daemon=True).start()
+
+        summary = plugin.process_table(
+            table,
+            progress=lambda done, total: conn.send(('progress', done, total)),
+            cancel_token=cancel_token,
+            **parameters
+        )
+        conn.send(('done', {'summary': summary, 'changes': table.changes, 'colors': table.colors}))
+    except PluginCancelledError:
+        conn.send(('cancelled',))
+    except BaseException as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
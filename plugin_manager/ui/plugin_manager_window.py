@@ -4,27 +4,32 @@ from typing import Optional
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                             QListWidget, QListWidgetItem, QLabel, QFileDialog, QMessageBox,
                             QTabWidget, QTextEdit, QFormLayout, QWidget, QCheckBox, QProgressDialog,
-                            QSpinBox, QDoubleSpinBox, QLineEdit)
+                            QSpinBox, QDoubleSpinBox, QLineEdit, QTableWidget, QTableWidgetItem,
+                            QHeaderView, QAbstractItemView)
 from PyQt6.QtCore import Qt, QTimer
 from ..core.plugin_system import PluginSystem
 import os
 from utils.error_handler import ErrorHandler
 import logging
 import traceback
-from plugin_manager.utils.plugin_config import PluginConfig
-import json
+from plugin_manager.utils.plugin_cache import hash_source, check_plugin_safety
 from plugin_manager.features.plugin_permissions import PluginPermission, PluginPermissionManager
 from PyQt6.QtGui import QColor
 from globals import GlobalState
 import logging
 
+# 性能标签页的刷新间隔（毫秒），只在标签页可见时刷新
+PERFORMANCE_REFRESH_MS = 1000
+PERFORMANCE_COLUMNS = ['插件', '操作', '次数', '最近耗时 (ms)', '中位数 (ms)', '单元格/秒',
+                       'CPU/耗时', '内存峰值', '事件耗时 (ms)', '回退']
+
 class PluginManagerWindow(QDialog):
     def __init__(self, plugin_system: PluginSystem, parent=None):
         super().__init__(parent)
         self._logger = logging.getLogger(__name__)
         self.plugin_system = plugin_system
         self.setWindowTitle("插件管理")
-        self.resize(600, 400)
+        self.resize(800, 450)
         
         main_layout = QHBoxLayout()
         
@@ -91,6 +96,9 @@ class PluginManagerWindow(QDialog):
         self.permissions_layout = QVBoxLayout()
         self.permissions_tab.setLayout(self.permissions_layout)
         self.tab_widget.addTab(self.permissions_tab, "权限管理")
+
+        # 性能标签页
+        self._setup_performance_tab()
         
         main_layout.addLayout(left_layout, 1)
         main_layout.addWidget(self.tab_widget, 2)
@@ -100,7 +108,7 @@ class PluginManagerWindow(QDialog):
         self.update_plugin_list()
         
         # 添加配置管理器
-        self.plugin_config = PluginConfig(os.path.join(self.plugin_system.plugin_dir, "configs"))
+        self.plugin_config = self.plugin_system.config
         
         # 使用插件系统的权限管理器
         self.permission_manager = self.plugin_system.permission_manager
@@ -113,6 +121,91 @@ class PluginManagerWindow(QDialog):
         self.plugin_system._event_bus.subscribe('plugin.started', self._on_plugin_started)
         self.plugin_system._event_bus.subscribe('plugin.stopped', self._on_plugin_stopped)
     
+    def _setup_performance_tab(self):
+        """创建性能标签页，显示插件监视器记录的所有插件的运行情况"""
+        self.performance_tab = QWidget()
+        layout = QVBoxLayout()
+        self.pool_label = QLabel()
+        layout.addWidget(self.pool_label)
+
+        self.performance_table = QTableWidget(0, len(PERFORMANCE_COLUMNS))
+        self.performance_table.setHorizontalHeaderLabels(PERFORMANCE_COLUMNS)
+        self.performance_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.performance_table.verticalHeader().setVisible(False)
+        self.performance_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.performance_table)
+
+        reset_button = QPushButton("清除记录")
+        reset_button.clicked.connect(self._clear_performance)
+        layout.addWidget(reset_button, alignment=Qt.AlignmentFlag.AlignRight)
+        self.performance_tab.setLayout(layout)
+        self.tab_widget.addTab(self.performance_tab, "性能")
+
+        # 只在性能标签页可见时定时刷新，记录没有变化时不重建表格
+        self._performance_version = -1
+        self._performance_timer = QTimer(self)
+        self._performance_timer.setInterval(PERFORMANCE_REFRESH_MS)
+        self._performance_timer.timeout.connect(self.refresh_performance_tab)
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
+
+    def _on_tab_changed(self, index: int):
+        if self.tab_widget.widget(index) is self.performance_tab:
+            self._performance_version = -1
+            self.refresh_performance_tab()
+            self._performance_timer.start()
+        else:
+            self._performance_timer.stop()
+
+    def refresh_performance_tab(self):
+        """刷新线程池使用情况和插件运行统计"""
+        monitor = self.plugin_system.monitor
+        stats = self.plugin_system.executor.stats()
+        self.pool_label.setText(
+            f"工作线程: {stats['busy_threads']}/{stats['max_threads']} 工作中，排队 {stats['queued']}；"
+            f"工作进程: {stats['busy_processes']}/{stats['processes']} 工作中，排队 {stats['queued_processes']}；"
+            f"插件任务运行中: {monitor.get_active_tasks()}"
+        )
+        if monitor.version == self._performance_version:
+            return
+        self._performance_version = monitor.version
+
+        rows = []
+        for plugin_name in monitor.get_plugins():
+            for operation, usage in monitor.track_resource_usage(plugin_name).items():
+                rows.append([
+                    plugin_name,
+                    operation,
+                    str(usage['runs']),
+                    ' / '.join(f"{duration:.1f}" for duration in usage['recent_ms']),
+                    f"{usage['median_ms']:.1f}",
+                    f"{usage['cells_per_sec']:,.0f}" if usage['cells_per_sec'] else '-',
+                    f"{usage['cpu_ratio']:.2f}",
+                    self._format_memory(usage['peak_memory']),
+                    f"{usage['event_ms']:.1f}",
+                    str(usage['regressions']) if usage['regressions'] else ''
+                ])
+
+        self.performance_table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col == len(values) - 1 and value:
+                    item.setBackground(QColor(255, 200, 200))  # 有回退的操作标为浅红色
+                self.performance_table.setItem(row, col, item)
+
+    @staticmethod
+    def _format_memory(size: int) -> str:
+        if not size:
+            return '-'
+        if size < 1024 * 1024:
+            return f"{size / 1024:.0f} KB"
+        return f"{size / 1024 / 1024:.1f} MB"
+
+    def _clear_performance(self):
+        self.plugin_system.monitor.clear()
+        self._performance_version = -1
+        self.refresh_performance_tab()
+
     def _on_plugin_started(self, event_data):
         """插件启动时的处理"""
         plugin_name = event_data['plugin_name']
@@ -183,9 +276,14 @@ class PluginManagerWindow(QDialog):
                 progress.setValue(0)
                 
                 try:
-                    # 验证插件签名
+                    # 只读取一次源码，签名验证和安全检查都使用这份内容
+                    with open(file_path, 'rb') as source:
+                        plugin_source = source.read()
+                    plugin_content = plugin_source.decode('utf-8')
+
+                    # 验证插件签名（源码的 SHA-256）
                     signature = self.get_plugin_signature(file_path)
-                    if signature and not self.plugin_config.verify_signature(file_path, signature):
+                    if signature and hash_source(plugin_source) != signature:
                         progress.setLabelText("插件签名验证失败")
                         progress.setValue(100)
                         return False
@@ -196,9 +294,6 @@ class PluginManagerWindow(QDialog):
                     # 获取不带.py后缀的插件名
                     plugin_name = os.path.splitext(os.path.basename(file_path))[0]
                     target_path = os.path.join(self.plugin_system.plugin_dir, f"{plugin_name}.py")
-                    
-                    with open(file_path, 'r', encoding='utf-8') as source:
-                        plugin_content = source.read()
                         
                     # 添加插件安全检查
                     if not self.verify_plugin_safety(plugin_content):
@@ -209,8 +304,8 @@ class PluginManagerWindow(QDialog):
                     progress.setLabelText("正在复制插件文件...")
                     progress.setValue(40)
                     
-                    with open(target_path, 'w', encoding='utf-8') as target:
-                        target.write(plugin_content)
+                    with open(target_path, 'wb') as target:
+                        target.write(plugin_source)
                         
                     progress.setLabelText("正在加载插件...")
                     progress.setValue(60)
@@ -240,12 +335,8 @@ class PluginManagerWindow(QDialog):
             ErrorHandler.handle_error(e, self, "加载插件失败")
     
     def verify_plugin_safety(self, plugin_content):
-        # 检查是否包含危险代码
-        dangerous_imports = ['os.system', 'subprocess', 'eval']
-        for imp in dangerous_imports:
-            if imp in plugin_content:
-                return False
-        return True
+        # 检查是否包含危险代码，规则与插件缓存中保存的检查结果一致
+        return check_plugin_safety(plugin_content)
         
     def on_plugin_selected(self):
         """当选择插件时更新详情信息"""
@@ -481,23 +572,11 @@ class PluginManagerWindow(QDialog):
 
     def get_plugin_signature(self, plugin_path: str) -> Optional[str]:
         """获取插件签名"""
-        signature_file = os.path.join(self.plugin_system.plugin_dir, "signatures.json")
-        if os.path.exists(signature_file):
-            with open(signature_file, 'r') as f:
-                signatures = json.load(f)
-                return signatures.get(os.path.basename(plugin_path))
-        return None
+        return self.plugin_system.store.get_signature(os.path.basename(plugin_path))
         
     def save_plugin_signature(self, plugin_name: str, signature: str):
         """保存插件签名"""
-        signature_file = os.path.join(self.plugin_system.plugin_dir, "signatures.json")
-        signatures = {}
-        if os.path.exists(signature_file):
-            with open(signature_file, 'r') as f:
-                signatures = json.load(f)
-        signatures[plugin_name] = signature
-        with open(signature_file, 'w') as f:
-            json.dump(signatures, f, indent=4)
+        self.plugin_system.store.set_signature(plugin_name, signature)
 
     def update_permissions_tab(self, plugin_name: str):
         """更新权限管理标签页"""
@@ -0,0 +1,158 @@
+import hashlib
+import importlib.util
+import json
+import logging
+import marshal
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+from .plugin_error import PluginLoadError
+
+# 缓存文件放在插件目录的 __pycache__ 中，与 Python 自身的字节码缓存一致，不会被当作插件扫描
+CACHE_DIR_NAME = '__pycache__'
+CACHE_SUFFIX = '.plugincache'
+# 缓存格式版本，修改缓存内容或安全检查规则时递增，使旧缓存失效
+CACHE_VERSION = 1
+
+# 安全检查不通过的代码片段
+DANGEROUS_PATTERNS = ('os.system', 'subprocess', 'eval')
+
+
+def hash_source(source: bytes) -> str:
+    """计算插件源码的 SHA-256，也作为插件签名使用"""
+    return hashlib.sha256(source).hexdigest()
+
+
+def check_plugin_safety(source: str) -> bool:
+    """检查插件源码是否包含危险代码"""
+    return not any(pattern in source for pattern in DANGEROUS_PATTERNS)
+
+
+@dataclass
+class PluginCacheEntry:
+    """单个插件源码的缓存：源码哈希、编译后的代码对象和安全检查结果"""
+    source_hash: str
+    code: Any
+    safe: bool
+
+
+class PluginCache:
+    """
+    插件加载缓存
+
+    每个插件一个缓存文件，保存源码的哈希、编译后的代码对象、安全检查结果和解析后的清单。
+    以文件的 mtime 和大小作为快速校验，未变化时直接使用缓存，不读取源码；
+    mtime 变化时重新计算哈希，哈希未变时只更新时间戳，哈希变化时重新读取、检查并编译。
+    """
+
+    def __init__(self, plugin_dir: str):
+        self.cache_dir = os.path.join(plugin_dir, CACHE_DIR_NAME)
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._logger = logging.getLogger(__name__)
+
+    def _cache_path(self, plugin_name: str) -> str:
+        return os.path.join(self.cache_dir, f"{plugin_name}{CACHE_SUFFIX}")
+
+    @staticmethod
+    def _stat_key(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, plugin_name: str, plugin_path: str) -> PluginCacheEntry:
+        """获取插件源码的缓存，缓存不存在或已失效时重新生成"""
+        try:
+            stat_key = self._stat_key(plugin_path)
+        except OSError as e:
+            raise PluginLoadError(f"插件文件不存在: {plugin_path}: {str(e)}")
+
+        record = self._get_record(plugin_name)
+        cached = record.get('source')
+        if cached is not None and cached['stat'] == stat_key:
+            return PluginCacheEntry(cached['hash'], cached['code'], cached['safe'])
+
+        with open(plugin_path, 'rb') as f:
+            source = f.read()
+        source_hash = hash_source(source)
+        if cached is not None and cached['hash'] == source_hash:
+            # 只是时间戳变化（如 touch、重新检出），代码未变
+            cached = dict(cached, stat=stat_key)
+        else:
+            cached = {
+                'stat': stat_key,
+                'hash': source_hash,
+                'code': compile(source, plugin_path, 'exec', dont_inherit=True),
+                'safe': check_plugin_safety(source.decode('utf-8', errors='replace'))
+            }
+            self._logger.info(f"插件 {plugin_name} 已重新编译")
+
+        self._update(plugin_name, 'source', cached)
+        return PluginCacheEntry(cached['hash'], cached['code'], cached['safe'])
+
+    def get_manifest(self, plugin_name: str, manifest_path: str) -> Dict[str, Any]:
+        """读取插件清单的原始数据，清单文件未变化时使用缓存"""
+        stat_key = self._stat_key(manifest_path)
+        cached = self._get_record(plugin_name).get('manifest')
+        if cached is not None and cached['stat'] == stat_key:
+            return cached['data']
+
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._update(plugin_name, 'manifest', {'stat': stat_key, 'data': data})
+        return data
+
+    def invalidate(self, plugin_name: str) -> None:
+        """删除插件的缓存"""
+        with self._lock:
+            self._records.pop(plugin_name, None)
+        try:
+            os.remove(self._cache_path(plugin_name))
+        except FileNotFoundError:
+            pass
+
+    def _get_record(self, plugin_name: str) -> Dict[str, Any]:
+        """获取插件的缓存记录，内存中没有时读取缓存文件"""
+        with self._lock:
+            record = self._records.get(plugin_name)
+        if record is None:
+            record = self._read(plugin_name)
+            with self._lock:
+                record = self._records.setdefault(plugin_name, record)
+        return record
+
+    def _read(self, plugin_name: str) -> Dict[str, Any]:
+        """读取缓存文件，文件不存在、格式或 Python 版本不符时返回空记录"""
+        try:
+            with open(self._cache_path(plugin_name), 'rb') as f:
+                data = marshal.load(f)
+            if data.get('version') == CACHE_VERSION and data.get('magic') == importlib.util.MAGIC_NUMBER:
+                return {key: data.get(key) for key in ('source', 'manifest')}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self._logger.warning(f"读取插件 {plugin_name} 的缓存失败: {str(e)}")
+        return {'source': None, 'manifest': None}
+
+    def _update(self, plugin_name: str, key: str, value: Dict[str, Any]) -> None:
+        """更新缓存记录并写入文件，先写临时文件再替换，避免其他进程读到不完整的缓存"""
+        with self._lock:
+            record = dict(self._records.get(plugin_name) or {'source': None, 'manifest': None})
+            record[key] = value
+            self._records[plugin_name] = record
+        data = dict(record, version=CACHE_VERSION, magic=importlib.util.MAGIC_NUMBER)
+
+        path = self._cache_path(plugin_name)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                marshal.dump(data, f)
+            os.replace(temp_path, path)
+        except (OSError, ValueError) as e:
+            # 缓存写入失败不影响加载
+            self._logger.warning(f"保存插件 {plugin_name} 的缓存失败: {str(e)}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
@@ -1,52 +1,103 @@
 import os
 import json
-from typing import Dict, Any, Optional
+import atexit
+import threading
+import weakref
+from typing import Dict, Any, Optional, Set
 import logging
 from .plugin_error import PluginConfigError
 from .config_encryption import ConfigEncryption
+from .plugin_store import PluginStore
+
+# 保存配置后延迟写入的时间（秒），这段时间内的多次修改只写一次
+WRITE_BEHIND_DELAY = 0.5
+
+# 进程退出时写入所有实例中尚未保存的配置
+_instances = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for config in list(_instances):
+        config.flush()
+
 
 class PluginConfig:
-    """插件配置管理"""
+    """
+    插件配置管理
+
+    配置解密后缓存在内存中。save_config 只更新缓存并标记需要写入，
+    WRITE_BEHIND_DELAY 秒后在后台统一写入，内容与上次写入相同时不重新加密和写入。
+    写入时先写临时文件再替换，退出前需要调用 flush 写入尚未保存的配置。
+    提供 store 时配置保存在统一存储中，一次 flush 的所有配置在同一个事务中写入。
+    """
     
-    def __init__(self, config_dir: str, encryption: ConfigEncryption = None):
+    def __init__(self, config_dir: str, encryption: ConfigEncryption = None,
+                 write_delay: float = WRITE_BEHIND_DELAY, store: Optional[PluginStore] = None):
         self.config_dir = config_dir
         self._logger = logging.getLogger(__name__)
         self._configs: Dict[str, Dict[str, Any]] = {}
         self._encryption = encryption
+        self._store = store
+        self._write_delay = write_delay
+        self._lock = threading.RLock()
+        self._persisted: Dict[str, str] = {}  # 每个插件最后一次写入的内容（序列化后）
+        self._dirty: Set[str] = set()
+        self._timer: Optional[threading.Timer] = None
         os.makedirs(self.config_dir, exist_ok=True)
+        _instances.add(self)
         
     def _get_config_path(self, plugin_name: str) -> str:
         """获取插件配置文件路径"""
         if self._encryption:
             return os.path.join(self.config_dir, f"{plugin_name}.config.bin")
         return os.path.join(self.config_dir, f"{plugin_name}.config.json")
+
+    @staticmethod
+    def _serialize(config: Dict[str, Any]) -> str:
+        return json.dumps(config, sort_keys=True, ensure_ascii=False)
+        
+    def _decode(self, data: bytes) -> Dict[str, Any]:
+        if not data:
+            return {}
+        if self._encryption:
+            return self._encryption.decrypt_data(data)
+        return json.loads(data.decode('utf-8'))
+
+    def _encode(self, config: Dict[str, Any]) -> bytes:
+        if self._encryption:
+            return self._encryption.encrypt_data(config)
+        return json.dumps(config, indent=4, ensure_ascii=False).encode('utf-8')
         
     def load_config(self, plugin_name: str) -> Dict[str, Any]:
         """加载插件配置"""
+        if self._store is not None:
+            try:
+                data = self._store.get_config_data(plugin_name)
+                config = self._decode(data) if data is not None else {}
+            except Exception as e:
+                self._logger.error(f"加载插件 {plugin_name} 配置失败: {str(e)}")
+                raise PluginConfigError(f"加载配置失败: {str(e)}")
+            with self._lock:
+                self._configs[plugin_name] = config
+                if data is not None:
+                    self._persisted[plugin_name] = self._serialize(config)
+            return config
+
         try:
             config_path = self._get_config_path(plugin_name)
             if os.path.exists(config_path):
-                # 检查文件是否为空
-                if os.path.getsize(config_path) == 0:
-                    self._configs[plugin_name] = {}
-                    return self._configs[plugin_name]
-                    
-                if self._encryption:
-                    with open(config_path, 'rb') as f:
-                        encrypted_data = f.read()
-                        self._configs[plugin_name] = self._encryption.decrypt_data(encrypted_data)
-                else:
-                    with open(config_path, 'r', encoding='utf-8') as f:
-                        self._configs[plugin_name] = json.load(f)
+                # 空文件视为空配置
+                with open(config_path, 'rb') as f:
+                    config = self._decode(f.read())
+                with self._lock:
+                    self._configs[plugin_name] = config
+                    self._persisted[plugin_name] = self._serialize(config)
             else:
-                self._configs[plugin_name] = {}
                 # 创建配置文件并写入空对象
-                if self._encryption:
-                    with open(config_path, 'wb') as f:
-                        f.write(self._encryption.encrypt_data({}))
-                else:
-                    with open(config_path, 'w', encoding='utf-8') as f:
-                        json.dump({}, f)
+                with self._lock:
+                    self._configs[plugin_name] = {}
+                self._write(plugin_name, {})
             return self._configs[plugin_name]
             
         except Exception as e:
@@ -54,16 +105,65 @@ class PluginConfig:
             raise PluginConfigError(f"加载配置失败: {str(e)}")
             
     def save_config(self, plugin_name: str, config: Dict[str, Any]) -> None:
-        """保存插件配置"""
+        """保存插件配置，实际写入在后台延迟进行"""
+        with self._lock:
+            self._configs[plugin_name] = config
+            if self._persisted.get(plugin_name) == self._serialize(config):
+                self._dirty.discard(plugin_name)
+                return
+            self._dirty.add(plugin_name)
+            if self._timer is None:
+                self._timer = threading.Timer(self._write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """立即写入所有尚未保存的配置"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            dirty, self._dirty = self._dirty, set()
+            if self._store is not None:
+                self._write_store(dirty)
+                return
+            for plugin_name in sorted(dirty):
+                try:
+                    self._write(plugin_name, self._configs[plugin_name])
+                except PluginConfigError as e:
+                    self._logger.error(f"保存插件 {plugin_name} 配置失败: {str(e)}")
+
+    def _write_store(self, plugin_names: Set[str]) -> None:
+        """在一个事务中把内容有变化的配置写入统一存储"""
+        items, serialized = {}, {}
+        for plugin_name in plugin_names:
+            config = self._configs[plugin_name]
+            serialized[plugin_name] = self._serialize(config)
+            if self._persisted.get(plugin_name) != serialized[plugin_name]:
+                items[plugin_name] = self._encode(config)
+        if not items:
+            return
         try:
-            config_path = self._get_config_path(plugin_name)
-            if self._encryption:
-                with open(config_path, 'wb') as f:
-                    encrypted_data = self._encryption.encrypt_data(config)
-                    f.write(encrypted_data)
-            else:
-                with open(config_path, 'w', encoding='utf-8') as f:
-                    json.dump(config, f, indent=4, ensure_ascii=False)
+            self._store.put_config_data(items)
+            for plugin_name in items:
+                self._persisted[plugin_name] = serialized[plugin_name]
+        except PluginConfigError as e:
+            # 保留修改，下次 flush 时重试
+            self._dirty.update(items)
+            self._logger.error(f"保存插件配置失败: {str(e)}")
+
+    def _write(self, plugin_name: str, config: Dict[str, Any]) -> None:
+        """写入配置文件，内容未变化时跳过，先写临时文件再替换"""
+        serialized = self._serialize(config)
+        if self._persisted.get(plugin_name) == serialized:
+            return
+        config_path = self._get_config_path(plugin_name)
+        temp_path = f"{config_path}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(self._encode(config))
+            os.replace(temp_path, config_path)
+            self._persisted[plugin_name] = serialized
         except Exception as e:
             raise PluginConfigError(f"保存配置失败: {str(e)}")
             
@@ -23,6 +23,10 @@ class PluginRuntimeError(PluginError):
     """插件运行时错误"""
     pass
 
+class PluginCancelledError(PluginError):
+    """插件处理被取消"""
+    pass
+
 class ErrorHandler:
     """错误处理工具类"""
     
@@ -3,11 +3,36 @@ import sys
 import importlib
 import inspect
 import logging
-from typing import List, Type, Optional, Dict
+from typing import Any, List, Type, Optional, Dict
 from ..core.plugin_interface import PluginInterface
 from ..core.plugin_base import PluginBase
-from .plugin_error import PluginError, PluginLoadError
+from .plugin_error import PluginError, PluginLoadError, PluginRuntimeError
+from .plugin_manifest import PluginManifest, MANIFEST_SUFFIX
+from .plugin_cache import PluginCache
 from ..features.plugin_lifecycle import PluginState
+from ..features.plugin_permissions import PluginPermission
+
+
+class _ReadOnlyConfig:
+    """独立运行的插件的配置：只保存传入的副本，不读写配置文件和插件存储"""
+
+    def __init__(self, plugin_name: str, config: Dict[str, Any]):
+        self._plugin_name = plugin_name
+        self._config = config
+
+    def get_config(self, plugin_name: str) -> Dict[str, Any]:
+        return dict(self._config) if plugin_name == self._plugin_name else {}
+
+    def save_config(self, plugin_name: str, config: Dict[str, Any]) -> None:
+        raise PluginRuntimeError("独立运行的插件不能保存配置")
+
+
+class _StandaloneHost:
+    """独立运行时代替 PluginSystem 设置到插件上，只提供只读配置"""
+
+    def __init__(self, plugin_name: str, config: Dict[str, Any]):
+        self.config = _ReadOnlyConfig(plugin_name, config)
+
 
 class PluginLoader:
     """插件加载器"""
@@ -16,6 +41,7 @@ class PluginLoader:
         self.plugin_dir = plugin_dir
         self.plugin_system = plugin_system
         self._loaded_modules: Dict[str, Any] = {}
+        self.cache = PluginCache(plugin_dir)  # 源码哈希、代码对象和清单的缓存
         self._logger = logging.getLogger(__name__)
         
     def scan_plugins(self) -> List[str]:
@@ -38,6 +64,36 @@ class PluginLoader:
             self._logger.error(f"扫描插件目录时出错: {str(e)}")
             raise PluginError(f"扫描插件失败: {str(e)}")
         
+    def get_manifest_path(self, plugin_name: str) -> str:
+        """获取插件清单文件路径"""
+        return os.path.join(self.plugin_dir, f"{plugin_name}{MANIFEST_SUFFIX}")
+
+    def load_manifest(self, plugin_name: str) -> Optional[PluginManifest]:
+        """读取插件清单，插件没有清单文件时返回 None"""
+        manifest_path = self.get_manifest_path(plugin_name)
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            data = self.cache.get_manifest(plugin_name, manifest_path)
+        except (OSError, ValueError) as e:
+            raise PluginLoadError(f"读取插件清单失败: {manifest_path}: {str(e)}")
+        return PluginManifest.from_dict(data)
+
+    def _exec_module(self, plugin_name: str, plugin_path: str, module_path: str) -> Any:
+        """执行插件模块，源码未变化时直接使用缓存的代码对象，不重新读取和编译"""
+        entry = self.cache.get(plugin_name, plugin_path)
+        if not entry.safe:
+            self._logger.warning(f"插件 {plugin_name} 未通过安全检查")
+        spec = importlib.util.spec_from_file_location(module_path, plugin_path)
+        module = importlib.util.module_from_spec(spec)
+        exec(entry.code, module.__dict__)
+        return module
+
+    def is_plugin_safe(self, plugin_name: str) -> bool:
+        """插件源码是否通过安全检查，结果随缓存保存"""
+        plugin_path = os.path.join(self.plugin_dir, f"{plugin_name}.py")
+        return self.cache.get(plugin_name, plugin_path).safe
+
     def _load_module(self, plugin_name: str, force_reload: bool = False) -> Optional[Type[PluginInterface]]:
         """
         内部方法：加载插件模块
@@ -63,14 +119,10 @@ class PluginLoader:
                 else:
                     # 如果需要强制重新加载，先卸载再加载
                     self.unload_plugin(plugin_name)
-                    spec = importlib.util.spec_from_file_location(module_path, plugin_path)
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
+                    module = self._exec_module(plugin_name, plugin_path, module_path)
             else:
                 # 首次加载模块
-                spec = importlib.util.spec_from_file_location(module_path, plugin_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
+                module = self._exec_module(plugin_name, plugin_path, module_path)
             
             # 4. 保存到已加载模块
             self._loaded_modules[plugin_name] = module
@@ -103,6 +155,24 @@ class PluginLoader:
         """加载插件"""
         return self._load_module(plugin_name, force_reload=False)
             
+    def load_standalone(self, plugin_name: str, permissions: int,
+                        config: Optional[Dict[str, Any]] = None) -> PluginInterface:
+        """
+        不创建插件系统，只加载、实例化并激活一个插件
+
+        沙箱子进程和批处理工作进程使用：不打开插件存储，也不创建事件总线、执行服务和异步运行器。
+        permissions 是已授予权限的位掩码，config 是插件配置的只读副本。
+        """
+        plugin_class = self.load_plugin(plugin_name)
+        plugin = plugin_class()
+        missing_mask = PluginPermission.to_mask(plugin.get_required_permissions()) & ~permissions
+        if missing_mask:
+            raise PluginLoadError(f"插件 {plugin_name} 缺少必要权限: {PluginPermission.from_mask(missing_mask)}")
+        plugin.plugin_system = _StandaloneHost(plugin_name, config or {})
+        plugin.initialize()
+        plugin.activate(PluginPermission.from_mask(permissions))
+        return plugin
+
     def unload_plugin(self, plugin_name: str) -> None:
         """卸载插件"""
         try:
@@ -121,24 +191,9 @@ class PluginLoader:
             raise PluginError(f"卸载插件失败: {str(e)}")
             
     def reload_plugin(self, plugin_name: str) -> Optional[Type[PluginInterface]]:
-        """重新加载插件"""
+        """重新导入插件模块并返回新的插件类，实例的状态交接由 PluginSystem.reload_plugin 完成"""
         try:
-            # 1. 保存当前状态（如果需要）
-            old_plugin = self.plugin_system.get_plugin(plugin_name)
-            saved_state = None
-            if old_plugin:
-                saved_state = old_plugin.save_state()
-            
-            # 2. 强制重新加载模块
-            plugin_class = self._load_module(plugin_name, force_reload=True)
-            
-            # 3. 恢复状态（如果需要）
-            if plugin_class and saved_state:
-                new_plugin = plugin_class()
-                new_plugin.restore_state(saved_state)
-            
-            return plugin_class
-            
+            return self._load_module(plugin_name, force_reload=True)
         except Exception as e:
             self._logger.error(f"重新加载插件失败: {str(e)}")
             raise PluginError(f"重新加载插件失败: {str(e)}")
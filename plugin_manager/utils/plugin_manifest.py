@@ -0,0 +1,73 @@
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Any
+from .plugin_error import PluginLoadError
+from ..features.plugin_dependencies import PluginDependency
+
+# 清单文件与插件模块放在同一目录，文件名为 <插件名>.manifest.json
+MANIFEST_SUFFIX = '.manifest.json'
+
+
+@dataclass
+class PluginManifest:
+    """
+    插件清单
+
+    启动时只读取清单即可显示插件和工具栏按钮、计算加载顺序，
+    插件模块在第一次激活或使用时才导入。示例：
+
+        {
+            "name": "xzltxs",
+            "version": "1.0.0",
+            "description": "修正单台成本中的轮胎系数",
+            "toolbar": {"text": "xzltxs", "icon": "resources/icons/+.png"},
+            "dependencies": [{"name": "other", "version": "1.0.0", "optional": false}],
+            "sandbox": {"enabled": true, "cpu_seconds": 60, "memory_mb": 1024}
+        }
+
+    sandbox.enabled 为 true 时无界面处理（process_table）在资源受限的子进程中运行，见 PluginSandbox。
+    sandbox.memory_mb 是插件加载后还可以分配的内存，不包括 PyQt6 等依赖库已映射的地址空间。
+    """
+    name: str
+    version: str
+    description: str = ''
+    toolbar: Dict[str, Any] = field(default_factory=dict)  # 工具栏按钮: text、icon、tooltip
+    dependencies: List[PluginDependency] = field(default_factory=list)
+    sandbox: Dict[str, Any] = field(default_factory=dict)  # 沙箱设置: enabled、cpu_seconds、memory_mb、timeout
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PluginManifest':
+        """从字典创建清单，缺少必填字段时抛出 PluginLoadError"""
+        for key in ('name', 'version'):
+            if not data.get(key):
+                raise PluginLoadError(f"插件清单缺少字段: {key}")
+
+        dependencies = []
+        for dep in data.get('dependencies', []):
+            # 依赖可以只写插件名，也可以写完整的对象
+            if isinstance(dep, str):
+                dep = {'name': dep}
+            dependencies.append(PluginDependency(
+                name=dep['name'],
+                version=str(dep.get('version', '')),
+                optional=bool(dep.get('optional', False))
+            ))
+
+        return cls(
+            name=str(data['name']),
+            version=str(data['version']),
+            description=str(data.get('description', '')),
+            toolbar=dict(data.get('toolbar', {})),
+            dependencies=dependencies,
+            sandbox=dict(data.get('sandbox', {}))
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'PluginManifest':
+        """读取清单文件"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise PluginLoadError(f"读取插件清单失败: {path}: {str(e)}")
+        return cls.from_dict(data)
@@ -0,0 +1,202 @@
+import os
+import json
+import glob
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Set, Optional, Iterable, Tuple
+from .plugin_error import PluginConfigError
+from .config_encryption import ConfigEncryption
+
+# 统一存储的数据库文件名，放在插件配置目录中
+STORE_FILE_NAME = 'plugins.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS configs (plugin TEXT PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS permissions (
+    plugin TEXT NOT NULL,
+    permission TEXT NOT NULL,
+    PRIMARY KEY (plugin, permission)
+);
+CREATE TABLE IF NOT EXISTS signatures (file TEXT PRIMARY KEY, signature TEXT NOT NULL);
+"""
+
+
+class PluginStore:
+    """
+    插件配置、权限和签名的统一存储
+
+    使用一个 SQLite 数据库保存所有数据，启动时一次读出全部内容缓存在内存中，
+    之后每次修改只在事务中更新变化的行，不再重写整个文件。
+    配置以原始字节保存（是否加密由 PluginConfig 决定），读取时才解密。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        try:
+            # 写入可能来自配置的延迟写入线程，由 _lock 保证串行
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+            self._configs, self._permissions, self._signatures = self._load()
+        except sqlite3.Error as e:
+            raise PluginConfigError(f"打开插件存储失败: {db_path}: {str(e)}")
+
+    def _load(self) -> Tuple[Dict[str, bytes], Dict[str, Set[str]], Dict[str, str]]:
+        """一次读出全部配置、权限和签名"""
+        configs = {plugin: bytes(data) for plugin, data in self._conn.execute('SELECT plugin, data FROM configs')}
+        permissions: Dict[str, Set[str]] = {}
+        for plugin, permission in self._conn.execute('SELECT plugin, permission FROM permissions'):
+            permissions.setdefault(plugin, set()).add(permission)
+        signatures = dict(self._conn.execute('SELECT file, signature FROM signatures'))
+        return configs, permissions, signatures
+
+    def _execute(self, statements: Iterable[Tuple[str, tuple]]) -> None:
+        """在一个事务中执行多条语句"""
+        try:
+            with self._lock, self._conn:
+                for sql, params in statements:
+                    self._conn.execute(sql, params)
+        except sqlite3.Error as e:
+            raise PluginConfigError(f"写入插件存储失败: {str(e)}")
+
+    # 配置
+    def get_config_data(self, plugin_name: str) -> Optional[bytes]:
+        """获取插件配置的原始字节，没有配置时返回 None"""
+        return self._configs.get(plugin_name)
+
+    def put_config_data(self, items: Dict[str, bytes]) -> None:
+        """在一个事务中保存多个插件的配置"""
+        self._execute(
+            ('INSERT OR REPLACE INTO configs (plugin, data) VALUES (?, ?)', (plugin, data))
+            for plugin, data in items.items()
+        )
+        self._configs.update(items)
+
+    # 权限
+    def get_permissions(self) -> Dict[str, Set[str]]:
+        """获取所有插件已授予的权限名称"""
+        return {plugin: set(perms) for plugin, perms in self._permissions.items()}
+
+    def add_permission(self, plugin_name: str, permission: str) -> None:
+        if permission in self._permissions.get(plugin_name, ()):
+            return
+        self._execute([('INSERT OR IGNORE INTO permissions (plugin, permission) VALUES (?, ?)',
+                        (plugin_name, permission))])
+        self._permissions.setdefault(plugin_name, set()).add(permission)
+
+    def remove_permission(self, plugin_name: str, permission: str) -> None:
+        if permission not in self._permissions.get(plugin_name, ()):
+            return
+        self._execute([('DELETE FROM permissions WHERE plugin = ? AND permission = ?',
+                        (plugin_name, permission))])
+        self._permissions[plugin_name].discard(permission)
+
+    # 签名
+    def get_signature(self, file_name: str) -> Optional[str]:
+        return self._signatures.get(file_name)
+
+    def set_signature(self, file_name: str, signature: str) -> None:
+        if self._signatures.get(file_name) == signature:
+            return
+        self._execute([('INSERT OR REPLACE INTO signatures (file, signature) VALUES (?, ?)',
+                        (file_name, signature))])
+        self._signatures[file_name] = signature
+
+    def migrate_legacy(self, config_dir: str, permission_files: Iterable[str], signature_file: str,
+                       encryption: Optional[ConfigEncryption] = None) -> None:
+        """
+        把旧版的单独文件导入数据库，只执行一次
+
+        旧文件保留不删除：configs 目录下的 <插件>.config.bin（加密）、<插件>.config.json 和
+        <插件>.cfg（加密），permissions.json 和 signatures.json。
+        检查和导入在同一个 BEGIN IMMEDIATE 事务中进行，多个进程（如批处理的工作进程）
+        同时第一次启动时只有一个进程导入，其余进程等待后看到已导入的标记。
+        """
+        try:
+            with self._lock, self._conn:
+                self._conn.execute('BEGIN IMMEDIATE')
+                if self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+                    # 打开时数据库还是空的，说明另一个进程在此期间完成了导入，需要重新读取
+                    if not (self._configs or self._permissions or self._signatures):
+                        self._configs, self._permissions, self._signatures = self._load()
+                    return
+                statements, config_count = self._legacy_statements(config_dir, permission_files,
+                                                                   signature_file, encryption)
+                statements.append(("INSERT OR IGNORE INTO meta (key, value) VALUES ('migrated', '1')", ()))
+                for sql, params in statements:
+                    self._conn.execute(sql, params)
+            with self._lock:
+                self._configs, self._permissions, self._signatures = self._load()
+        except sqlite3.Error as e:
+            raise PluginConfigError(f"导入旧版配置失败: {str(e)}")
+        self._logger.info(f"已导入旧版配置 {config_count} 个插件")
+
+    def _legacy_statements(self, config_dir: str, permission_files: Iterable[str], signature_file: str,
+                           encryption: Optional[ConfigEncryption]) -> Tuple[List[Tuple[str, tuple]], int]:
+        """读取旧版文件，返回导入用的语句和配置数量"""
+        configs: Dict[str, bytes] = {}
+        for pattern in ('*.cfg', '*.config.json', '*.config.bin'):  # 后面的格式优先
+            for path in glob.glob(os.path.join(config_dir, pattern)):
+                plugin_name = os.path.basename(path)[:-len(pattern) + 1]
+                config = self._read_legacy_config(path, encryption)
+                if config is not None:
+                    data = json.dumps(config, ensure_ascii=False)
+                    configs[plugin_name] = encryption.encrypt_data(config) if encryption else data.encode('utf-8')
+
+        statements = [('INSERT OR IGNORE INTO configs (plugin, data) VALUES (?, ?)', item)
+                      for item in configs.items()]
+        for permission_file in permission_files:
+            for plugin_name, permission in self._read_legacy_permissions(permission_file):
+                statements.append(('INSERT OR IGNORE INTO permissions (plugin, permission) VALUES (?, ?)',
+                                   (plugin_name, permission)))
+        if os.path.exists(signature_file):
+            try:
+                with open(signature_file, 'r', encoding='utf-8') as f:
+                    for file_name, signature in json.load(f).items():
+                        statements.append(('INSERT OR IGNORE INTO signatures (file, signature) VALUES (?, ?)',
+                                           (file_name, signature)))
+            except (OSError, ValueError) as e:
+                self._logger.warning(f"读取旧签名文件失败: {signature_file}: {str(e)}")
+        return statements, len(configs)
+
+    def _read_legacy_config(self, path: str, encryption: Optional[ConfigEncryption]) -> Optional[dict]:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if not data:
+                return {}
+            if path.endswith('.config.json'):
+                return json.loads(data.decode('utf-8'))
+            if encryption is None:
+                return None
+            return encryption.decrypt_data(data)
+        except Exception as e:
+            self._logger.warning(f"读取旧配置文件失败，已跳过: {path}: {str(e)}")
+            return None
+
+    def _read_legacy_permissions(self, permission_file: str) -> Iterable[Tuple[str, str]]:
+        if not os.path.exists(permission_file):
+            return []
+        try:
+            with open(permission_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self._logger.warning(f"读取旧权限文件失败: {permission_file}: {str(e)}")
+            return []
+        pairs = []
+        for plugin_name, perms in data.items():
+            # 兼容 {"插件": ["权限"]} 和 {"插件": {"permissions": ["权限"]}} 两种格式
+            if isinstance(perms, dict):
+                perms = perms.get('permissions', [])
+            if plugin_name != 'permissions':
+                pairs.extend((plugin_name, permission) for permission in perms)
+        return pairs
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
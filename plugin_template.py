@@ -1,15 +1,17 @@
 from typing import Any, Dict, List, Optional, Set
-from PyQt6.QtWidgets import QTableView, QProgressDialog, QDialog
-from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool
+from PyQt6.QtWidgets import QProgressDialog, QDialog
+from PyQt6.QtCore import Qt, QObject
 from PyQt6.QtCore import pyqtSignal as Signal
-import logging
 from dataclasses import dataclass
 
 from plugin_manager.core.plugin_base import PluginBase
+from plugin_manager.core.cancellation import CancellationToken
+from plugin_manager.core.table_handle import TableHandle
 from plugin_manager.features.plugin_lifecycle import PluginState
 from plugin_manager.features.plugin_permissions import PluginPermission
 from models.table_model import TableModel
 from utils.error_handler import ErrorHandler
+from logging_config import get_plugin_logger
 
 @dataclass
 class ProcessResult:
@@ -23,10 +25,8 @@ class PluginTemplate(PluginBase):
     
     def __init__(self):
         super().__init__()
-        # 初始化日志
-        self._logger = logging.getLogger(self.__class__.__name__)
-        self._logger.setLevel(logging.DEBUG)
-        self._setup_logging()
+        # 初始化日志：处理器和格式由 logging_config 统一配置，级别可按插件单独设置
+        self._logger = get_plugin_logger(self.get_name())
         
         # 插件配置
         self._config = {
@@ -47,14 +47,7 @@ class PluginTemplate(PluginBase):
         # 状态管理
         self._processing = False
         self._error_occurred = False
-        
-    def _setup_logging(self):
-        """设置日志"""
-        fh = logging.FileHandler(f'{self.get_name()}.log')
-        fh.setFormatter(logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        ))
-        self._logger.addHandler(fh)
+        self.table: Optional[TableHandle] = None  # 正在处理的表格句柄
         
     # 基本信息
     def get_name(self) -> str:
@@ -128,44 +121,33 @@ class PluginTemplate(PluginBase):
         progress = Signal(int)
         error = Signal(str)
         
-        class Task(QRunnable):
-            def __init__(self, processor, data):
-                super().__init__()
-                self.processor = processor
-                self.data = data
-                
-            def run(self):
-                try:
-                    # 处理数据
-                    result = self.processor.process_item(self.data)
-                    if result.success:
-                        self.processor.on_item_completed(result)
-                except Exception as e:
-                    self.processor.error.emit(str(e))
-                    
         def __init__(self, plugin):
             super().__init__()
             self.plugin = plugin
-            self.thread_pool = QThreadPool.globalInstance()
-            self._stop_requested = False
+            # 任务提交到插件系统共用的执行服务，不要为每次处理创建线程或线程池
+            self._service = plugin.get_execution_service()
+            self._cancel_token = CancellationToken()
             
         def process(self, data_items):
+            for item in data_items:
+                self._service.submit(self._run_item, item, cancel_token=self._cancel_token)
+                
+        def _run_item(self, item):
             try:
-                for item in data_items:
-                    if self._stop_requested:
-                        break
-                    task = self.Task(self, item)
-                    self.thread_pool.start(task)
+                # 处理数据，耗时记录在插件监视器中；信号由 Qt 排队到界面线程
+                with self.plugin.track_task('process_item', rows=1):
+                    result = self.process_item(item)
+                if result.success:
+                    self.on_item_completed(result)
             except Exception as e:
                 self.error.emit(str(e))
                 
         def stop(self):
-            self._stop_requested = True
-            self.thread_pool.clear()
-            self.thread_pool.waitForDone()
+            # 取消尚未开始的任务，正在运行的任务应检查取消令牌
+            self._service.cancel(self._cancel_token)
             
-    def _process_data(self, table_view: QTableView, **parameters) -> Any:
-        """处理数据的具体实现"""
+    def _process_data(self, table: TableHandle, **parameters) -> Any:
+        """处理数据的具体实现，通过表格句柄读写数据，不直接访问 QTableView"""
         if self._processing:
             return False
             
@@ -175,6 +157,8 @@ class PluginTemplate(PluginBase):
             if not self._active:
                 raise RuntimeError("插件未激活")
                 
+            self.table = table
+
             # 创建进度对话框
             self.progress = QProgressDialog("处理数据中...", "取消", 0, 100)
             self.progress.setWindowModality(Qt.WindowModality.WindowModal)
@@ -186,7 +170,7 @@ class PluginTemplate(PluginBase):
             self.data_processor.finished.connect(self._on_completed)
             
             # 开始处理
-            self.data_processor.process(self._get_data_items(table_view))
+            self.data_processor.process(self._get_data_items(table))
             
             return not self._error_occurred
             
@@ -196,15 +180,17 @@ class PluginTemplate(PluginBase):
         finally:
             self._processing = False
             
-    def _get_data_items(self, table_view: QTableView) -> List[Any]:
-        """获取要处理的数据项"""
+    def _get_data_items(self, table: TableHandle) -> List[Any]:
+        """从表格句柄获取要处理的数据项"""
         raise NotImplementedError
         
     def _on_error(self, error_msg: str):
         """错误处理"""
         self._error_occurred = True
         self._logger.error(f"处理错误: {error_msg}")
-        ErrorHandler.handle_error(Exception(error_msg), self.table_view)
+        # 无界面运行时表格句柄没有视图，错误对话框没有父窗口
+        parent = self.table.view if self.table is not None else None
+        ErrorHandler.handle_error(Exception(error_msg), parent)
         
     def _on_completed(self):
         """处理完成"""
@@ -0,0 +1,69 @@
+import threading
+import time
+import unittest
+from plugin_manager.core.async_api import AsyncRunner, PluginContext
+from plugin_manager.core.cancellation import CancellationToken
+from plugin_manager.core.execution_service import ExecutionService
+from plugin_manager.core.table_handle import ColumnTableHandle
+from plugin_manager.utils.plugin_error import PluginCancelledError
+
+async def double_column(table, context):
+    values = await context.run_in_thread(table.get_column, 0)
+    # run_in_thread 在工作线程中执行，协程本身不在调用线程中
+    context.thread_names.add(threading.current_thread().name)
+    table.set_values(1, {row: int(value) * 2 for row, value in enumerate(values)})
+    context.report_progress(1, 1)
+    return len(values)
+
+class TestAsyncApi(unittest.TestCase):
+    def setUp(self):
+        self.runner = AsyncRunner()
+        self.executor = ExecutionService(max_threads=1)
+
+    def tearDown(self):
+        self.runner.shutdown()
+        self.executor.shutdown()
+
+    def test_process(self):
+        table = ColumnTableHandle([['1', '2'], ['', '']])
+        progress = []
+        context = PluginContext('demo', table, self.runner, self.executor,
+                                progress=lambda done, total: progress.append((done, total)))
+        context.thread_names = set()
+        future = self.runner.submit(double_column(table, context))
+        self.assertEqual(self.runner.wait(future), 2)
+        self.assertEqual(table.get_column(1), ['2', '4'])
+        self.assertEqual(progress, [(1, 1)])
+        self.assertEqual(context.thread_names, {'PluginAsyncLoop'})
+
+    def test_cancel(self):
+        token = CancellationToken()
+        started = threading.Event()
+
+        async def wait_forever():
+            started.set()
+            await self.runner._get_loop().create_future()
+
+        future = self.runner.submit(wait_forever(), token)
+        started.wait(5)
+        token.cancel()
+        with self.assertRaises(PluginCancelledError):
+            future.result(timeout=5)
+
+    def test_token_reuse(self):
+        token = CancellationToken()
+
+        async def done():
+            return 1
+
+        for _ in range(3):
+            self.assertEqual(self.runner.submit(done(), token).result(timeout=5), 1)
+        # 任务结束后回调已注销，之后取消令牌不影响已完成的任务
+        deadline = time.monotonic() + 5
+        while token._callbacks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(token._callbacks, [])
+        token.cancel()
+
+if __name__ == '__main__':
+    unittest.main()
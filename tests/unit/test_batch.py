@@ -0,0 +1,81 @@
+import argparse
+import os
+import shutil
+import tempfile
+import unittest
+import openpyxl
+import batch
+from benchmarks.workbook_factory import make_cost_workbook
+from plugin_manager.core.table_handle import ColumnTableHandle, HIGHLIGHT_COLOR
+from plugin_manager.features.plugin_permissions import ALL_PERMISSIONS
+from plugin_manager.utils.plugin_loader import PluginLoader
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        batch._worker_plugin = None
+        batch._worker_parameters = {}
+
+    def touch(self, *parts):
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'w').close()
+        return path
+
+    def test_collect_files(self):
+        a = self.touch('a.xlsx')
+        b = self.touch('sub', 'b.xlsx')
+        self.touch('~$a.xlsx')
+        self.touch('c.txt')
+        # 目录不递归，通配符可以递归；锁文件跳过，重复的文件只保留一个
+        self.assertEqual(batch.collect_files([self.root]), [a])
+        self.assertEqual(batch.collect_files([os.path.join(self.root, '**', '*.xlsx'), a]), [a, b])
+
+    def test_output_paths(self):
+        a = self.touch('x', 'f.xlsx')
+        b = self.touch('y', 'f.xlsx')
+        self.assertEqual(batch.get_input_root([a, b]), self.root)
+        self.assertEqual(batch.get_output_paths([a, b], 'out', False),
+                         {a: os.path.join('out', 'x', 'f.xlsx'), b: os.path.join('out', 'y', 'f.xlsx')})
+        self.assertEqual(batch.get_output_path(a, None, True), a)
+        self.assertEqual(batch.get_output_path(a, None, False), os.path.join(self.root, 'x', 'f.processed.xlsx'))
+        # 没有公共目录时同名文件的保存路径相同
+        with self.assertRaises(ValueError):
+            batch.get_output_paths([a, b], 'out', False, input_root='')
+
+    def test_parse_parameters(self):
+        self.assertEqual(batch.parse_parameters(['start_row=3', 'write_mode=diff']),
+                         {'start_row': 3, 'write_mode': 'diff'})
+        with self.assertRaises(argparse.ArgumentTypeError):
+            batch.parse_parameters(['start_row'])
+
+    def test_process_file(self):
+        source = os.path.join(self.root, 'cost.xlsx')
+        output = os.path.join(self.root, 'out', 'cost.xlsx')
+        make_cost_workbook(rows=30, coefficient_columns=3, seed=1).save(source)
+        # 与工作进程相同，只加载并激活目标插件
+        loader = PluginLoader(batch.PLUGIN_DIR)
+        batch._worker_plugin = loader.load_standalone('xzltxs', ALL_PERMISSIONS)
+
+        result = batch.process_file(source, output, None)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(result['output'], output)
+
+        # 与直接处理同一张表格的结果比较
+        expected = ColumnTableHandle.from_worksheet(openpyxl.load_workbook(source).active)
+        loader.load_standalone('xzltxs', ALL_PERMISSIONS).process_table(expected)
+        self.assertTrue(expected.changes)
+        worksheet = openpyxl.load_workbook(output).active
+        for (row, col), value in expected.changes.items():
+            self.assertEqual(str(worksheet.cell(row + 1, col + 1).value), str(value))
+        filled = {(cell.row - 1, cell.column - 1) for cells in worksheet.iter_rows() for cell in cells
+                  if cell.fill.fill_type == 'solid'}
+        self.assertEqual(filled, set(expected.colors))
+        row, col = next(iter(expected.colors))
+        self.assertEqual(worksheet.cell(row + 1, col + 1).fill.start_color.rgb, 'FF%02X%02X%02X' % HIGHLIGHT_COLOR)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from benchmarks.suite import check_baseline, make_baseline
+from benchmarks.workbook_factory import (HEADER_ROWS, PART_NAME_COLUMN, XS_COLUMN,
+                                         make_cost_workbook, parse_part_mix)
+
+def make_report(median_ms, peak_memory=0, rows=10):
+    return {
+        'params': {'rows': rows, 'columns': 2},
+        'results': {'load': {'median_ms': median_ms, 'peak_memory': peak_memory}}
+    }
+
+class TestBenchmarks(unittest.TestCase):
+    def test_workbook(self):
+        worksheet = make_cost_workbook(rows=50, coefficient_columns=3, part_mix={'CAP': 1}).active
+        self.assertEqual(worksheet.max_row, HEADER_ROWS + 50)
+        self.assertEqual(worksheet.max_column, XS_COLUMN + 3)
+        self.assertEqual(worksheet.cell(HEADER_ROWS + 1, PART_NAME_COLUMN + 1).value, 'CAP')
+        # 相同参数生成的表格相同
+        again = make_cost_workbook(rows=50, coefficient_columns=3, part_mix={'CAP': 1}).active
+        self.assertEqual(list(worksheet.values), list(again.values))
+
+    def test_parse_part_mix(self):
+        self.assertEqual(parse_part_mix('tire=2,DISK=1'), {'TIRE': 2.0, 'DISK': 1.0})
+        with self.assertRaises(ValueError):
+            parse_part_mix('WHEEL=1')
+
+    def test_check_baseline(self):
+        baseline = make_baseline(make_report(100.0, 10 * 1024 * 1024))
+        self.assertEqual(check_baseline(make_report(120.0, 10 * 1024 * 1024), baseline), [])
+        self.assertEqual(len(check_baseline(make_report(200.0, 20 * 1024 * 1024), baseline)), 2)
+        # 表格参数不同时不比较
+        self.assertEqual(check_baseline(make_report(200.0, rows=20), baseline), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import threading
+import time
+import unittest
+from PyQt6.QtCore import QCoreApplication
+from utils.event_bus import EventBus, batch_reducer
+from plugin_manager.features.plugin_events import EventBus as PluginEventBus
+
+class TestEventBus(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.event_bus = EventBus()
+        self.received = []
+        self.event_bus.subscribe('test.event', self.received.append)
+
+    def tearDown(self):
+        self.event_bus.shutdown()
+
+    def test_same_thread_emit(self):
+        # 测试同一线程中发送的事件同步分发
+        self.event_bus.emit('test.event', {'value': 1})
+        self.assertEqual(self.received, [{'value': 1}])
+
+    def test_cross_thread_emit(self):
+        # 测试其他线程发送的事件在主线程处理事件循环后分发
+        thread = threading.Thread(target=self.event_bus.emit, args=('test.event', {'value': 2}))
+        thread.start()
+        thread.join()
+        self.assertEqual(self.received, [])
+        self.app.processEvents()
+        self.assertEqual(self.received, [{'value': 2}])
+
+    def test_coalescing(self):
+        # 测试合并窗口内的事件只分发一次
+        self.event_bus.set_coalescing('test.event', 20)
+        for value in range(5):
+            self.event_bus.emit('test.event', {'value': value})
+        self.assertEqual(self.received, [])
+        self._wait_events(0.1)
+        self.assertEqual(self.received, [{'value': 4}])
+
+        self.event_bus.set_coalescing('test.event', 20, batch_reducer)
+        self.event_bus.emit('test.event', 1)
+        self.event_bus.emit('test.event', 2)
+        self._wait_events(0.1)
+        self.assertEqual(self.received[-1], [1, 2])
+
+    def test_weak_subscriber(self):
+        # 测试绑定方法的监听器在对象销毁后自动失效
+        class Listener:
+            def on_event(self, data):
+                raise AssertionError("已销毁的监听器不应被调用")
+        listener = Listener()
+        self.event_bus.subscribe('test.event', listener.on_event)
+        del listener
+        self.event_bus.emit('test.event', {'value': 3})
+        self.assertEqual(self.received, [{'value': 3}])
+
+    def test_plugin_event_bus(self):
+        # 测试插件事件总线与应用事件总线互通，并兼容字典格式的事件
+        plugin_events = []
+        plugin_bus = PluginEventBus(self.event_bus)
+        plugin_bus.subscribe('test.event', plugin_events.append)
+        plugin_bus.emit('test.event', {'value': 4}, source='test_plugin')
+        self.assertEqual(self.received, [{'value': 4}])
+        self.assertEqual(plugin_events[0]['data'], {'value': 4})
+        self.assertEqual(plugin_events[0]['source'], 'test_plugin')
+
+    def test_metrics(self):
+        # 测试按事件类型和监听器记录发送次数和处理耗时
+        self.event_bus.emit('test.event', {'value': 5})
+        self.event_bus.emit('test.event', {'value': 6})
+        metrics = self.event_bus.get_metrics()
+        self.assertEqual(metrics['topics']['test.event']['emits'], 2)
+        self.assertEqual(metrics['topics']['test.event']['handler_time']['count'], 2)
+        self.assertEqual(metrics['subscribers'][0]['calls'], 2)
+        self.event_bus.reset_metrics()
+        self.assertEqual(self.event_bus.get_metrics()['topics'], {})
+
+    def _wait_events(self, seconds):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.005)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import threading
+import unittest
+from concurrent.futures import CancelledError
+from plugin_manager.core.cancellation import CancellationToken
+from plugin_manager.core.execution_service import ExecutionService
+from utils.event_bus import Priority
+
+class TestExecutionService(unittest.TestCase):
+    def setUp(self):
+        self.service = ExecutionService(max_threads=1, max_processes=1)
+        # 占住唯一的工作线程，之后提交的任务都在排队
+        self.release = threading.Event()
+        self.blocker = self.service.submit(self.release.wait)
+
+    def tearDown(self):
+        self.release.set()
+        self.service.shutdown()
+
+    def test_priority(self):
+        order = []
+        futures = [
+            self.service.submit(order.append, 'low', priority=Priority.LOW),
+            self.service.submit(order.append, 'normal'),
+            self.service.submit(order.append, 'high', priority=Priority.HIGH)
+        ]
+        self.release.set()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(order, ['high', 'normal', 'low'])
+
+    def test_cancel(self):
+        token = CancellationToken()
+        future = self.service.submit(lambda: 1, cancel_token=token)
+        other = self.service.submit(lambda: 2)
+        self.assertEqual(self.service.cancel(token), 1)
+        self.release.set()
+        with self.assertRaises(CancelledError):
+            future.result(timeout=5)
+        self.assertEqual(other.result(timeout=5), 2)
+
+    def test_process(self):
+        self.assertEqual(self.service.submit_process(pow, 2, 10).result(timeout=30), 1024)
+
+if __name__ == '__main__':
+    unittest.main()
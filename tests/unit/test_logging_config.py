@@ -0,0 +1,37 @@
+import json
+import logging
+import queue
+import unittest
+from logging_config import JsonFormatter, get_plugin_logger, set_plugin_log_level, setup_worker_logging
+
+class TestLoggingConfig(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self._handlers, self._level = list(root.handlers), root.level
+
+    def tearDown(self):
+        root = logging.getLogger()
+        root.handlers[:] = self._handlers
+        root.setLevel(self._level)
+        set_plugin_log_level('demo', logging.NOTSET)
+
+    def test_json_record(self):
+        record = get_plugin_logger('demo').makeRecord(
+            'plugin.demo', logging.INFO, __file__, 1, "处理列: %s", (3,), None, extra={'rows': 10})
+        data = json.loads(JsonFormatter().format(record))
+        self.assertEqual(data['message'], "处理列: 3")
+        self.assertEqual(data['plugin'], 'demo')
+        self.assertEqual(data['rows'], 10)
+
+    def test_plugin_level(self):
+        log_queue = queue.SimpleQueue()
+        setup_worker_logging(log_queue, logging.INFO)
+        logger = get_plugin_logger('demo')
+        logger.debug("隐藏")
+        set_plugin_log_level('demo', 'debug')
+        logger.debug("显示")
+        self.assertEqual(log_queue.get_nowait().getMessage(), "显示")
+        self.assertTrue(log_queue.empty())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+import unittest
+from plugin_manager.utils.plugin_cache import PluginCache, hash_source
+
+class TestPluginCache(unittest.TestCase):
+    def setUp(self):
+        self.plugin_dir = tempfile.mkdtemp()
+        self.plugin_path = os.path.join(self.plugin_dir, 'demo.py')
+        self._write("VALUE = 1\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.plugin_dir)
+
+    def _write(self, source):
+        with open(self.plugin_path, 'w', encoding='utf-8') as f:
+            f.write(source)
+
+    def test_cache_hit_and_invalidation(self):
+        # 测试未修改的插件从缓存文件读取代码，源码变化后自动重新编译
+        entry = PluginCache(self.plugin_dir).get('demo', self.plugin_path)
+        self.assertEqual(entry.source_hash, hash_source(b"VALUE = 1\n"))
+        self.assertTrue(entry.safe)
+
+        cached = PluginCache(self.plugin_dir).get('demo', self.plugin_path)
+        self.assertEqual(cached.source_hash, entry.source_hash)
+        namespace = {}
+        exec(cached.code, namespace)
+        self.assertEqual(namespace['VALUE'], 1)
+
+        self._write("import subprocess\nVALUE = 22\n")
+        changed = PluginCache(self.plugin_dir).get('demo', self.plugin_path)
+        self.assertNotEqual(changed.source_hash, entry.source_hash)
+        self.assertFalse(changed.safe)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import os
+import shutil
+import tempfile
+import unittest
+from plugin_manager.utils.plugin_config import PluginConfig
+
+class TestPluginConfig(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.config = PluginConfig(self.config_dir, write_delay=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.config_dir)
+
+    def test_write_behind(self):
+        # 测试多次保存只在 flush 时写入一次，内容未变化时不写入
+        path = os.path.join(self.config_dir, 'demo.config.json')
+        for value in range(3):
+            self.config.save_config('demo', {'start_row': value})
+        self.assertFalse(os.path.exists(path))
+
+        self.config.flush()
+        self.assertEqual(PluginConfig(self.config_dir).get_config('demo'), {'start_row': 2})
+
+        mtime = os.stat(path).st_mtime_ns
+        self.config.save_config('demo', {'start_row': 2})
+        self.config.flush()
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,15 @@
+import unittest
+from plugin_manager.features.plugin_dependencies import DependencyManager, PluginDependency
+
+class TestDependencyManager(unittest.TestCase):
+    def test_load_levels(self):
+        # 测试互不依赖的插件分在同一层，依赖其他插件的插件排在其后
+        manager = DependencyManager()
+        manager.add_dependency('c', PluginDependency('a', ''))
+        manager.add_dependency('d', PluginDependency('c', ''))
+        manager.add_dependency('d', PluginDependency('b', '', optional=True))
+        levels = manager.get_load_levels(['a', 'b', 'c', 'd'])
+        self.assertEqual(levels, [['a', 'b'], ['c'], ['d']])
+
+if __name__ == '__main__':
+    unittest.main()
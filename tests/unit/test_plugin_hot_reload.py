@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from PyQt6.QtWidgets import QApplication
+from plugin_manager.core.plugin_system import PluginSystem
+from plugin_manager.features.plugin_hot_reload import PluginWatcher
+
+# 与其他界面测试共用 QApplication
+app = QApplication.instance() or QApplication(sys.argv)
+
+PLUGIN_SOURCE = '''
+from plugin_manager.core.plugin_base import PluginBase
+
+class HotDemoPlugin(PluginBase):
+    VERSION = {version!r}
+
+    def get_name(self):
+        return 'hot_demo'
+
+    def get_version(self):
+        return self.VERSION
+
+    def get_description(self):
+        return ''
+
+    def save_state(self):
+        return dict(super().save_state(), counter=getattr(self, 'counter', 0))
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        self.counter = state.get('counter', 0)
+'''
+
+class TestPluginHotReload(unittest.TestCase):
+    def setUp(self):
+        self.plugin_dir = tempfile.mkdtemp()
+        self.write_source('1')
+        self.write_manifest('热重载')
+        self.plugin_system = PluginSystem(plugin_dir=self.plugin_dir)
+
+    def tearDown(self):
+        self.plugin_system.disable_hot_reload()
+        self.plugin_system.store.close()
+        sys.modules.pop('plugin_manager.plugins.hot_demo', None)
+        shutil.rmtree(self.plugin_dir)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.plugin_dir, name)
+        mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        if mtime is not None:
+            # 保证修改时间变化，缓存按修改时间和大小判断文件是否变化
+            os.utime(path, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+
+    def write_source(self, version):
+        self.write_file('hot_demo.py', PLUGIN_SOURCE.format(version=version))
+
+    def write_manifest(self, text):
+        self.write_file('hot_demo.manifest.json', json.dumps(
+            {'name': 'hot_demo', 'version': '1', 'toolbar': {'text': text}}, ensure_ascii=False))
+
+    def test_reload(self):
+        system = self.plugin_system
+        self.assertTrue(system.load_plugin('hot_demo'))
+        self.assertTrue(system.activate_plugin('hot_demo'))
+        old_plugin = system.get_plugin('hot_demo')
+        old_plugin.counter = 5
+
+        self.write_source('2')
+        self.assertTrue(system.reload_plugin('hot_demo'))
+
+        # 新实例使用新代码，状态和激活状态交接，清单保留
+        plugin = system.get_plugin('hot_demo')
+        self.assertIsNot(plugin, old_plugin)
+        self.assertEqual(plugin.get_version(), '2')
+        self.assertEqual(plugin.counter, 5)
+        self.assertTrue(system.is_plugin_active('hot_demo'))
+        self.assertEqual(system.get_plugin_info('hot_demo').manifest.toolbar, {'text': '热重载'})
+
+    def test_manifest_changed(self):
+        system = self.plugin_system
+        system.load_plugin('hot_demo')
+        system.get_plugin('hot_demo')
+        system.reload_plugin('hot_demo')
+        watcher = PluginWatcher(system)
+        self.addCleanup(watcher.stop)
+
+        # 重新加载后清单未变化，只有真正修改清单才算变化
+        self.assertFalse(watcher._manifest_changed('hot_demo', system.get_plugin_info('hot_demo')))
+        self.write_manifest('已修改')
+        self.assertTrue(watcher._manifest_changed('hot_demo', system.get_plugin_info('hot_demo')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from PyQt6.QtWidgets import QApplication
+from plugin_manager.core.plugin_system import PluginSystem
+from plugin_manager.monitoring.plugin_monitor import INTERACTIVE_OPERATION, RunRecord
+from plugin_manager.ui.plugin_manager_window import PERFORMANCE_COLUMNS, PluginManagerWindow
+
+# 与其他界面测试共用 QApplication
+app = QApplication.instance() or QApplication(sys.argv)
+
+class TestPerformanceTab(unittest.TestCase):
+    def setUp(self):
+        self.plugin_dir = tempfile.mkdtemp()
+        self.plugin_system = PluginSystem(plugin_dir=self.plugin_dir)
+        self.monitor = self.plugin_system.monitor
+        self.window = PluginManagerWindow(self.plugin_system)
+
+    def tearDown(self):
+        self.window.close()
+        self.plugin_system.store.close()
+        shutil.rmtree(self.plugin_dir)
+
+    def add(self, operation, wall_ms, cells=0):
+        self.monitor._add(RunRecord('demo', operation, time.time(), wall_ms=wall_ms, cpu_ms=wall_ms, cells=cells))
+
+    def rows(self):
+        table = self.window.performance_table
+        return {table.item(row, 1).text(): [table.item(row, col).text() for col in range(table.columnCount())]
+                for row in range(table.rowCount())}
+
+    def test_refresh(self):
+        for wall_ms in (10.0, 10.0, 10.0, 100.0):
+            self.add('process_column', wall_ms, cells=1000)
+            self.add(INTERACTIVE_OPERATION, wall_ms * 100)
+        self.window.tab_widget.setCurrentWidget(self.window.performance_tab)
+
+        rows = self.rows()
+        regressions = PERFORMANCE_COLUMNS.index('回退')
+        self.assertEqual(rows['process_column'][2], '4')
+        self.assertEqual(rows['process_column'][3], '10.0 / 10.0 / 10.0 / 100.0')
+        self.assertEqual(rows['process_column'][regressions], '1')
+        # 界面运行包括等待对话框的时间，不标记回退
+        self.assertEqual(rows[INTERACTIVE_OPERATION][regressions], '')
+        self.assertEqual(rows[INTERACTIVE_OPERATION][PERFORMANCE_COLUMNS.index('单元格/秒')], '-')
+
+        # 记录没有变化时不重建表格，有新记录时重建
+        item = self.window.performance_table.item(0, 0)
+        self.window.refresh_performance_tab()
+        self.assertIs(self.window.performance_table.item(0, 0), item)
+        self.add('process_column', 10.0, cells=1000)
+        self.window.refresh_performance_tab()
+        self.assertEqual(self.rows()['process_column'][2], '5')
+
+        self.window._clear_performance()
+        self.assertEqual(self.window.performance_table.rowCount(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from plugin_manager.utils.plugin_manifest import PluginManifest
+from plugin_manager.utils.plugin_error import PluginLoadError
+from plugin_manager.features.plugin_dependencies import PluginDependency
+
+class TestPluginManifest(unittest.TestCase):
+    def test_from_dict(self):
+        # 测试清单解析，依赖可以只写插件名
+        manifest = PluginManifest.from_dict({
+            'name': 'demo',
+            'version': '1.0.0',
+            'toolbar': {'text': '演示'},
+            'dependencies': ['base', {'name': 'extra', 'version': '2.0', 'optional': True}]
+        })
+        self.assertEqual(manifest.toolbar['text'], '演示')
+        self.assertEqual(manifest.dependencies, [
+            PluginDependency('base', ''),
+            PluginDependency('extra', '2.0', True)
+        ])
+
+    def test_missing_field(self):
+        # 测试缺少必填字段时报错
+        with self.assertRaises(PluginLoadError):
+            PluginManifest.from_dict({'name': 'demo'})
+
+if __name__ == '__main__':
+    unittest.main()
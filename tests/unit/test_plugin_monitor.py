@@ -0,0 +1,49 @@
+import time
+import unittest
+from collections import deque
+from plugin_manager.monitoring.plugin_monitor import INTERACTIVE_OPERATION, PluginMonitor, RunRecord
+
+class TestPluginMonitor(unittest.TestCase):
+    def setUp(self):
+        self.monitor = PluginMonitor(history=5, trace_memory=True)
+
+    def test_track_records_usage(self):
+        # 测试记录内存峰值和吞吐量，并且只保留最近的记录
+        for _ in range(7):
+            with self.monitor.track('demo', 'process_data', rows=10, cells=100):
+                data = [0] * 10000
+        history = self.monitor.get_history('demo')
+        self.assertEqual(len(history), 5)
+        self.assertGreater(history[-1].peak_memory, 0)
+        self.assertGreater(history[-1].cells_per_sec, 0)
+
+        usage = self.monitor.track_resource_usage('demo')['process_data']
+        self.assertEqual(usage['runs'], 5)
+        self.assertEqual(usage['failed'], 0)
+
+    def test_failed_run(self):
+        with self.assertRaises(ValueError):
+            with self.monitor.track('demo', 'start'):
+                raise ValueError('失败')
+        self.assertTrue(self.monitor.get_history('demo', 'start')[0].failed)
+
+    def test_regression(self):
+        # 测试按单元格耗时与基线比较：单元格多的运行耗时长不算回退
+        def run(wall_ms, cells):
+            return RunRecord('demo', 'process_data', time.time(), wall_ms=wall_ms, cells=cells)
+
+        history = deque(run(10.0, 1000) for _ in range(5))
+        self.assertIsNone(PluginMonitor._check_regression(run(40.0, 4000), history))
+        self.assertIsNotNone(PluginMonitor._check_regression(run(40.0, 1000), history))
+        self.assertIsNone(PluginMonitor._check_regression(run(40.0, 1000), deque(list(history)[:2])))
+
+    def test_interactive_not_checked(self):
+        # 测试包含等待用户时间的界面运行不检查回退
+        for wall_ms in (10.0, 10.0, 10.0, 1000.0):
+            self.monitor._add(RunRecord('demo', INTERACTIVE_OPERATION, time.time(), wall_ms=wall_ms))
+            self.monitor._add(RunRecord('demo', 'process_data', time.time(), wall_ms=wall_ms))
+        issues = self.monitor.detect_performance_issues('demo')
+        self.assertEqual([issue.split(':')[0] for issue in issues], ['process_data'])
+
+if __name__ == '__main__':
+    unittest.main()
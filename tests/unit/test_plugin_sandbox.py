@@ -0,0 +1,91 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from plugin_manager.core.cancellation import CancellationToken
+from plugin_manager.core.table_handle import ColumnTableHandle
+from plugin_manager.security.plugin_sandbox import PluginSandbox
+from plugin_manager.utils.plugin_error import PluginCancelledError, PluginRuntimeError
+
+PLUGIN_SOURCE = '''
+import time
+from plugin_manager.core.plugin_base import PluginBase
+
+class DemoPlugin(PluginBase):
+    def get_name(self):
+        return 'sandbox_demo'
+
+    def get_version(self):
+        return '1.0.0'
+
+    def get_description(self):
+        return ''
+
+    def process_table(self, table, progress=None, cancel_token=None, mode='double', **parameters):
+        while mode == 'spin':
+            cancel_token.raise_if_cancelled()
+        if mode == 'alloc':
+            data = bytearray(512 * 1024 * 1024)
+        if mode == 'config':
+            return self.get_configuration()
+        values = table.get_column(0)
+        table.set_values(1, {row: int(value) * 2 for row, value in enumerate(values)}, (255, 255, 0))
+        if progress:
+            progress(1, 1)
+        return {'total': len(values)}
+'''
+
+class TestPluginSandbox(unittest.TestCase):
+    def setUp(self):
+        self.plugin_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.plugin_dir, 'sandbox_demo.py'), 'w', encoding='utf-8') as f:
+            f.write(PLUGIN_SOURCE)
+        self.sandbox = PluginSandbox(self.plugin_dir, cpu_seconds=3, timeout=30)
+
+    def tearDown(self):
+        sys.modules.pop('plugin_manager.plugins.sandbox_demo', None)
+        shutil.rmtree(self.plugin_dir)
+
+    def test_changes_written_back(self):
+        table = ColumnTableHandle([['1', '2', '3'], ['', '', '']])
+        progress = []
+        result = self.sandbox.execute_in_sandbox('sandbox_demo', table, progress=lambda done, total: progress.append(done))
+        self.assertEqual(result, {'total': 3})
+        self.assertEqual(progress, [1])
+        self.assertEqual(table.get_column(1), ['2', '4', '6'])
+        self.assertEqual(table.colors[(2, 1)], (255, 255, 0))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "只有类 Unix 系统支持资源限制")
+    def test_cpu_limit(self):
+        # 测试死循环的插件被 CPU 时间限制结束，主进程不受影响
+        table = ColumnTableHandle([['1']])
+        with self.assertRaisesRegex(PluginRuntimeError, 'CPU'):
+            self.sandbox.execute_in_sandbox('sandbox_demo', table, mode='spin')
+
+    def test_config_read_only(self):
+        # 测试子进程使用传入的配置，不在插件目录中创建配置存储
+        result = self.sandbox.execute_in_sandbox('sandbox_demo', ColumnTableHandle([['1']]),
+                                                 config={'start_row': 3}, mode='config')
+        self.assertEqual(result, {'start_row': 3})
+        self.assertFalse(os.path.exists(os.path.join(self.plugin_dir, 'configs')))
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "只有 Linux 上测量地址空间")
+    def test_memory_limit(self):
+        # 测试内存限制只计算插件加载后的分配
+        with self.assertRaisesRegex(PluginRuntimeError, 'MemoryError'):
+            self.sandbox.execute_in_sandbox('sandbox_demo', ColumnTableHandle([['1']]),
+                                            limits={'memory_mb': 256}, mode='alloc')
+        result = self.sandbox.execute_in_sandbox('sandbox_demo', ColumnTableHandle([['1']]),
+                                                 limits={'memory_mb': 1024}, mode='alloc')
+        self.assertEqual(result, {'total': 1})
+
+    def test_cancel(self):
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(PluginCancelledError):
+            self.sandbox.execute_in_sandbox('sandbox_demo', ColumnTableHandle([['1']]),
+                                            cancel_token=token, mode='spin')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from plugin_manager.utils.plugin_store import PluginStore
+
+class TestPluginStore(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.config_dir, 'plugins.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.config_dir)
+
+    def _write_json(self, name, data):
+        path = os.path.join(self.config_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        return path
+
+    def test_migrate_legacy(self):
+        # 测试旧版配置、权限和签名文件只导入一次
+        self._write_json('demo.config.json', {'start_row': 3})
+        permission_file = self._write_json('permissions.json', {'demo': ['FILE_READ', 'DATA_READ']})
+        signature_file = self._write_json('signatures.json', {'demo.py': 'abc'})
+
+        store = PluginStore(self.db_path)
+        store.migrate_legacy(self.config_dir, [permission_file], signature_file)
+        self.assertEqual(json.loads(store.get_config_data('demo')), {'start_row': 3})
+        self.assertEqual(store.get_permissions(), {'demo': {'FILE_READ', 'DATA_READ'}})
+        self.assertEqual(store.get_signature('demo.py'), 'abc')
+
+        store.remove_permission('demo', 'DATA_READ')
+        store.close()
+        self._write_json('permissions.json', {'demo': ['NETWORK']})
+
+        reopened = PluginStore(self.db_path)
+        reopened.migrate_legacy(self.config_dir, [permission_file], signature_file)
+        self.assertEqual(reopened.get_permissions(), {'demo': {'FILE_READ'}})
+        reopened.close()
+
+    def test_concurrent_migrate(self):
+        # 测试多个进程同时第一次启动时只导入一次，其余进程读到导入的数据
+        self._write_json('demo.config.json', {'start_row': 3})
+        stores = [PluginStore(self.db_path) for _ in range(2)]
+        # 先占住写锁，两个存储都在导入前等待，释放后依次执行
+        blocker = sqlite3.connect(self.db_path, isolation_level=None)
+        blocker.execute('BEGIN IMMEDIATE')
+        errors = []
+
+        def migrate(store):
+            try:
+                store.migrate_legacy(self.config_dir, [], os.path.join(self.config_dir, 'signatures.json'))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=migrate, args=(store,)) for store in stores]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.3)
+        blocker.execute('COMMIT')
+        blocker.close()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        for store in stores:
+            self.assertEqual(json.loads(store.get_config_data('demo')), {'start_row': 3})
+            store.close()
+
+if __name__ == '__main__':
+    unittest.main()
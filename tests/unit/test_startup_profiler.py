@@ -0,0 +1,29 @@
+import unittest
+from utils.startup_profiler import StartupProfiler, make_budget, check_budget
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_disabled(self):
+        # 测试未启用时不记录任何阶段
+        profiler = StartupProfiler()
+        with profiler.phase('test'):
+            pass
+        self.assertEqual(profiler.report()['phases'], [])
+
+    def test_budget(self):
+        # 测试超出预算的阶段会被报告，小幅波动会被忽略
+        report = {
+            'total_ms': 100.0,
+            'phases': [{'name': 'imports', 'start_ms': 0.0, 'duration_ms': 80.0, 'thread': 'MainThread'}],
+            'imports': [{'module': 'openpyxl', 'cumulative_ms': 50.0, 'self_ms': 1.0}]
+        }
+        budget = make_budget(report)
+        self.assertEqual(check_budget(report, budget), [])
+
+        report['total_ms'] = 103.0
+        report['phases'][0]['duration_ms'] = 200.0
+        violations = check_budget(report, budget)
+        self.assertEqual(len(violations), 1)
+        self.assertIn('imports', violations[0])
+
+if __name__ == '__main__':
+    unittest.main()
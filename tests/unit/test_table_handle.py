@@ -0,0 +1,39 @@
+import unittest
+from plugin_manager.core.table_handle import ColumnTableHandle, HIGHLIGHT_COLOR
+from plugin_manager.features.plugin_permissions import PluginPermission
+
+class TestColumnTableHandle(unittest.TestCase):
+    def setUp(self):
+        self.table = ColumnTableHandle.from_rows([
+            ('编码', '名称', '价格'),
+            ('A1', 'TIRE', 100),
+            ('A2', None),
+        ])
+
+    def test_read(self):
+        # 测试按行构建后的读取，缺失和空单元格返回空字符串
+        self.assertEqual(self.table.row_count(), 3)
+        self.assertEqual(self.table.column_count(), 3)
+        self.assertEqual(self.table.get_value(1, 2), '100')
+        self.assertEqual(self.table.get_value(2, 1), '')
+        self.assertEqual(self.table.get_column(0, [1, 2, 5]), ['A1', 'A2', ''])
+
+    def test_set_values(self):
+        # 测试批量写入会记录修改和颜色
+        self.table.set_values(2, {1: 120.5, 2: 80}, HIGHLIGHT_COLOR)
+        self.assertEqual(self.table.get_column(2), ['价格', '120.5', '80'])
+        self.assertEqual(self.table.changes, {(1, 2): 120.5, (2, 2): 80})
+        self.assertEqual(self.table.colors[(2, 2)], HIGHLIGHT_COLOR)
+
+    def test_permissions(self):
+        # 测试句柄按附加的权限掩码限制读写
+        self.table.permissions = PluginPermission.DATA_READ.mask
+        self.assertEqual(self.table.get_value(1, 0), 'A1')
+        with self.assertRaises(PermissionError):
+            self.table.set_values(2, {1: 0})
+        self.table.permissions = 0
+        with self.assertRaises(PermissionError):
+            self.table.get_column(0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import sys
+import time
+import unittest
+from unittest import mock
+import openpyxl
+from PyQt6.QtWidgets import QApplication
+from models.table_model import TableModel, TableModelHandle
+from plugin_manager.core.cancellation import CancellationToken
+from plugin_manager.core.execution_service import ExecutionService
+from plugin_manager.core.table_handle import ColumnTableHandle
+from plugin_manager.plugins.xzltxs import XzltxsPlugin
+
+# 确保在创建模型之前已有 QApplication
+app = QApplication.instance() or QApplication(sys.argv)
+
+class TestXzltxsIncremental(unittest.TestCase):
+    def setUp(self):
+        worksheet = openpyxl.Workbook().active
+        worksheet.append(['h'] * 22)
+        worksheet.append(['h'] * 22)
+        for _ in range(4):
+            row = [None] * 22
+            row[2:5] = ['42751', 'TIRE', 100]
+            row[19:22] = [1, 2, 3]
+            worksheet.append(row)
+        for _ in range(2):
+            row = [None] * 22
+            row[2:5] = ['42700', 'DISK', 200]
+            row[19:22] = [1, 1, 1]
+            worksheet.append(row)
+        self.model = TableModel(worksheet)
+        self.table = TableModelHandle(self.model)
+        self.plugin = XzltxsPlugin()
+        self.plugin._active = True
+
+    def column(self, col):
+        return [self.model.data(self.model.index(row, col)) for row in range(2, 6)]
+
+    def test_edit_recomputes_affected_groups(self):
+        self.plugin.process_table(self.table, write_mode='diff')
+        self.plugin._enable_incremental_updates(self.table)
+        calls = []
+        calculate_part_group = self.plugin.calculate_part_group
+
+        def record(part_idx, targets, col, table):
+            calls.append((part_idx, col))
+            return calculate_part_group(part_idx, targets, col, table)
+
+        with mock.patch.object(self.plugin, 'calculate_part_group', record):
+            # 系数单元格只影响所在零件类型的这一列
+            self.model.setData(self.model.index(3, 20), '0')
+            self.assertEqual(calls, [(0, 20)])
+            self.assertEqual(self.column(20), ['2', '0', '1', '1'])
+
+            # 价格变化使 DISK 变为 SP DISK，两种类型的所有列都重新计算
+            calls.clear()
+            self.model.setData(self.model.index(6, 4), '100')
+            self.assertEqual(calls, [(part, col) for part in (2, 3) for col in range(19, 22)])
+
+    def test_edit_after_dry_run(self):
+        # 全量处理完成后启用增量重算，与界面处理完成时相同
+        self.plugin.process_table(self.table, write_mode='diff')
+        self.plugin._enable_incremental_updates(self.table)
+        self.assertEqual(self.column(20), ['1', '1', '1', '1'])
+
+        # 按界面的方式试运行：开始事务，逐列处理，完成回调
+        plugin = self.plugin
+        plugin.apply_parameters({'write_mode': 'dry_run'})
+        plugin.table = self.table
+        plugin._error_occurred = False
+        plugin._begin_transaction()
+        cached_data = plugin.cache_valid_data(self.table)
+        for col in range(19, 22):
+            plugin.handle_column_results(plugin.process_column(col, cached_data, self.table), col, self.table)
+        with mock.patch('plugin_manager.plugins.xzltxs.ErrorHandler.handle_info'):
+            plugin._on_processing_finished()
+        self.assertEqual(self.column(20), ['1', '1', '1', '1'])  # 试运行不修改表格
+
+        # 编辑单元格后，同组的其他单元格立即重新分配
+        self.model.setData(self.model.index(3, 20), '0')
+        self.assertEqual(self.column(20), ['2', '0', '1', '1'])
+
+    def run_processor(self, process_column=None, submit_fails=None):
+        """在单个工作线程上运行 DataProcessor，返回发出的结束信号"""
+        plugin = self.plugin
+        plugin.table = ColumnTableHandle.from_rows(
+            [[self.model.data(self.model.index(row, col)) for col in range(22)] for row in range(6)])
+        plugin._cancel_token = CancellationToken()
+        plugin._begin_transaction()
+
+        # 单个工作线程：出错时其余列都还在排队，结果与 CPU 数无关
+        service = ExecutionService(max_threads=1)
+        self.addCleanup(service.shutdown)
+        service_submit = service.submit
+
+        def submit(fn, *args, **kwargs):
+            if submit_fails is not None and submit_fails(args):
+                raise RuntimeError('提交失败')
+            return service_submit(fn, *args, **kwargs)
+
+        service.submit = submit
+        signals = []
+        with mock.patch.object(plugin, 'get_execution_service', return_value=service):
+            processor = plugin.DataProcessor(plugin)
+        processor.error.connect(lambda message: signals.append(message))
+        processor.finished.connect(lambda: signals.append('finished'))
+        processor.stopped.connect(lambda: signals.append('stopped'))
+        with mock.patch.object(plugin, 'process_column', process_column or (lambda *args, **kwargs: [])):
+            processor.start()
+            self.assertTrue(processor.wait(5000))
+        # 信号在 _done 之后从工作线程排队发出
+        deadline = time.monotonic() + 5
+        while not signals and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        app.processEvents()
+        return signals
+
+    def test_column_error(self):
+        columns = []
+
+        def process_column(col, cached_data, table=None):
+            columns.append(col)
+            if col == 19:
+                raise ValueError('列出错')
+            return []
+
+        # 出错后排队的列被取消，只发出一次 error
+        self.assertEqual(self.run_processor(process_column), ['列出错'])
+        self.assertEqual(columns, [19])
+        self.assertTrue(self.plugin._cancel_token.cancelled)
+
+    def test_submit_error(self):
+        # 提交列任务或准备任务失败时同样只发出一次 error，等待处理结束的事件循环可以退出
+        self.assertEqual(self.run_processor(submit_fails=lambda args: args[:1] == (20,)), ['提交失败'])
+        self.assertEqual(self.run_processor(submit_fails=lambda args: True), ['提交失败'])
+
+if __name__ == '__main__':
+    unittest.main()
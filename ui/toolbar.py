@@ -1,6 +1,5 @@
 from typing import Optional, Dict, Any
 
-import openpyxl
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QAction, QIcon
 from PyQt6.QtWidgets import QToolBar, QFileDialog, QMessageBox, QTableView, QTabWidget, QInputDialog, QWidget, \
@@ -9,8 +8,16 @@ from PyQt6.QtWidgets import QToolBar, QFileDialog, QMessageBox, QTableView, QTab
 from globals import GlobalState
 from plugin_manager.ui.plugin_manager_window import PluginManagerWindow
 from utils.error_handler import ErrorHandler
+from utils.lazy_import import lazy_import
 import logging
 from plugin_manager.features.plugin_lifecycle import PluginState
+from plugin_manager.monitoring.plugin_monitor import INTERACTIVE_OPERATION
+
+# openpyxl 只在打开文件时使用，延迟导入以加快启动
+openpyxl = lazy_import('openpyxl')
+
+# 插件状态事件的合并窗口（毫秒）
+PLUGIN_EVENT_WINDOW_MS = 50
 
 
 def get_current_table_view(tab_widget: QTabWidget) -> Optional[QTableView]:
@@ -60,10 +67,15 @@ class ToolBar(QToolBar):
         self.update_plugin_buttons()
 
         self.global_state = GlobalState()
+        # 批量加载/激活插件时会连续发出大量事件，合并后只重建一次按钮
+        for event_type in ("plugin.activated", "plugin.deactivated", "plugin.loaded", "plugin.unloaded",
+                           "plugin.reloaded"):
+            self.global_state.event_bus.set_coalescing(event_type, PLUGIN_EVENT_WINDOW_MS)
         self.global_state.event_bus.subscribe("plugin.activated", self.on_plugin_activated)
         self.global_state.event_bus.subscribe("plugin.deactivated", self.on_plugin_deactivated)
         self.global_state.event_bus.subscribe("plugin.loaded", self.on_plugin_loaded)
         self.global_state.event_bus.subscribe("plugin.unloaded", self.on_plugin_unloaded)
+        self.global_state.event_bus.subscribe("plugin.reloaded", self.on_plugin_reloaded)
     
     def show_plugin_manager(self):
         """显示插件管理窗口"""
@@ -84,9 +96,7 @@ class ToolBar(QToolBar):
             self._logger.info(f"插件{plugin_name}状态：{plugin_state}")
             if plugin_name and plugin_state == PluginState.ACTIVE:
                 self._logger.info(f"激活/停用时添加插件按钮：{plugin_name}")
-                plugin_action = QAction(QIcon("resources/icons/+.png"), plugin_name, self)
-                plugin_action.triggered.connect(lambda checked, name=plugin_name: self.use_plugin(name))
-                self.addAction(plugin_action)
+                self.addAction(self._create_plugin_action(plugin_name))
                 return
 
         self._logger.info(f"初始化或加载/卸载时更新插件按钮")
@@ -96,18 +106,32 @@ class ToolBar(QToolBar):
         for plugin_name, plugin_info in self.plugin_system.get_all_plugins().items():
             if self.plugin_system.get_plugin_state(plugin_name) in [PluginState.ACTIVE, PluginState.LOADED]:
                 self._logger.info(f"初始化或加载/卸载时更新插件按钮：{plugin_name}")
-                plugin_action = QAction(QIcon("resources/icons/+.png"), plugin_name, self)
-                plugin_action.triggered.connect(lambda checked, name=plugin_name: self.use_plugin(name))
-                self.addAction(plugin_action)
+                self.addAction(self._create_plugin_action(plugin_name, plugin_info))
+
+    def _create_plugin_action(self, plugin_name: str, plugin_info=None) -> QAction:
+        """创建插件按钮，文字和图标优先取自插件清单，不需要导入插件模块"""
+        if plugin_info is None:
+            plugin_info = self.plugin_system.get_plugin_info(plugin_name)
+        toolbar = plugin_info.manifest.toolbar if plugin_info and plugin_info.manifest else {}
+        plugin_action = QAction(
+            QIcon(toolbar.get('icon', "resources/icons/+.png")),
+            toolbar.get('text', plugin_name),
+            self
+        )
+        if toolbar.get('tooltip'):
+            plugin_action.setToolTip(toolbar['tooltip'])
+        plugin_action.triggered.connect(lambda checked, name=plugin_name: self.use_plugin(name))
+        return plugin_action
 
     def on_plugin_activated(self, data: Dict[str, Any] = None):
         """处理插件激活事件"""
         self._logger.info("处理插件激活事件")
-        self.update_plugin_buttons(data)
+        # 事件已合并，data 只是窗口内最后一个插件，按所有插件的当前状态重建
+        self.update_plugin_buttons(None)
     def on_plugin_deactivated(self, data: Dict[str, Any] = None):
         """处理插件停用事件"""
         self._logger.info("处理插件停用事件")
-        self.update_plugin_buttons(data)
+        self.update_plugin_buttons(None)
     def on_plugin_loaded(self, data: Dict[str, Any] = None):
         """处理插件加载事件"""
         self._logger.info("处理插件加载事件")
@@ -116,6 +140,10 @@ class ToolBar(QToolBar):
         """处理插件卸载事件"""
         self._logger.info("处理插件卸载事件")
         self.update_plugin_buttons(None)
+    def on_plugin_reloaded(self, data: Dict[str, Any] = None):
+        """处理插件重新加载事件，按钮的文字和图标可能随清单变化，重新创建"""
+        self._logger.info("处理插件重新加载事件")
+        self.update_plugin_buttons(None)
 
     def open_file(self):
         try:
@@ -305,8 +333,11 @@ class ToolBar(QToolBar):
                 return
 
             try:
-                # 使用插件处理数据，自动传入当前表格视图
-                result = plugin.process_data(current_table_view, **parameters)
+                # 使用插件处理数据，传入当前表格视图的句柄
+                table = self.plugin_system.create_table_handle(plugin_name, current_table_view)
+                # 界面运行包括等待对话框的时间，单独记录且不检查回退；处理耗时由插件的 track_task 记录
+                with self.plugin_system.monitor.track(plugin_name, INTERACTIVE_OPERATION):
+                    result = plugin.process_data(table, **parameters)
                 
                 if result is not None:
                     # QMessageBox.information(self, "成功", f"插件 {plugin_name} 处理完成")
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, TYPE_CHECKING
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTabWidget, 
                             QTableView, QHeaderView, QMessageBox, QProgressDialog)
 from PyQt6.QtCore import Qt, QAbstractTableModel
@@ -6,9 +6,11 @@ from globals import GlobalState
 from utils.error_handler import ErrorHandler
 from models.table_model import TableModel
 from PyQt6.QtWidgets import QApplication
-from openpyxl import Workbook
 import logging
 
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+
 class WorkbookWidget(QWidget):
     """工作簿窗口组件，管理Excel工作表的显示"""
     
@@ -19,7 +21,7 @@ class WorkbookWidget(QWidget):
         self.layout.addWidget(self.tab_widget)
         self._logger = logging.getLogger(__name__)
         
-    def load_workbook(self, workbook: Workbook, file_path: str):
+    def load_workbook(self, workbook: 'Workbook', file_path: str):
         """加载工作簿"""
         try:
             # 检查是否已经加载了相同的工作簿
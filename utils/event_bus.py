@@ -1,103 +1,489 @@
 # event_bus.py
-from typing import Dict, List, Callable, Any
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+from typing import Dict, List, Callable, Any, Optional, Tuple, Union
+import heapq
+import inspect
+import itertools
+import json
 import logging
-from collections import defaultdict
-from PyQt6.QtCore import QThreadPool, QRunnable, QTimer, Qt, QObject
+import threading
+import time
+import weakref
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal
 import traceback
+from utils.event_metrics import EventMetrics
+
+# 合并函数：(已合并的数据, 新数据) -> 合并后的数据，第一次调用时已合并的数据为 None
+Reducer = Callable[[Any, Any], Any]
+
+
+class Priority(IntEnum):
+    """事件和监听器的优先级，数值越大越先处理"""
+    LOW = 0
+    NORMAL = 50
+    HIGH = 100
+
+
+class DeliveryMode(Enum):
+    """监听器的执行方式"""
+    SYNC = 'sync'      # 在发送事件的线程中立即执行
+    QUEUED = 'queued'  # 在主线程中执行，主线程发送时立即执行，其他线程发送时排队
+    POOL = 'pool'      # 在事件总线的工作线程池中执行
+
+
+@dataclass
+class Event:
+    """
+    事件基类
+
+    兼容旧的字典格式，可以用 event['type']、event['data']、event['source'] 访问。
+    """
+    type: str
+    data: Any = None
+    source: Optional[str] = None
+    priority: int = Priority.NORMAL
+    timestamp: float = field(default_factory=time.perf_counter)  # 发送时间，用于统计排队延迟
+
+    def __getitem__(self, key: str) -> Any:
+        if key in ('type', 'data', 'source'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+@dataclass
+class PluginEvent(Event):
+    """插件生命周期事件（plugin.loaded、plugin.activated 等），data 中包含 plugin_name"""
+
+    @property
+    def plugin_name(self) -> Optional[str]:
+        return self.data.get('plugin_name') if isinstance(self.data, dict) else None
+
+
+@dataclass
+class ProgressEvent(Event):
+    """处理进度事件，data 为 {'current': 已完成数量, 'total': 总数}，通常需要合并"""
+
+    @property
+    def current(self) -> int:
+        return self.data.get('current', 0) if isinstance(self.data, dict) else 0
+
+    @property
+    def total(self) -> int:
+        return self.data.get('total', 0) if isinstance(self.data, dict) else 0
+
+
+def _callback_name(callback: Callable) -> str:
+    """获取回调函数的可读名称，用于日志"""
+    return getattr(callback, '__qualname__', None) or repr(callback)
+
+
+def batch_reducer(batch: Optional[List[Any]], data: Any) -> List[Any]:
+    """把时间窗口内的所有事件数据收集为列表"""
+    if batch is None:
+        batch = []
+    batch.append(data)
+    return batch
+
+
+class _Subscriber:
+    """
+    事件监听器
+
+    绑定方法使用弱引用，对象被销毁后自动失效，不会因为忘记取消订阅而泄漏；
+    普通函数和 lambda 没有其他引用者，只能保存强引用。
+    """
+    __slots__ = ('_ref', 'mode', 'priority', 'pass_event', 'name')
+
+    def __init__(self, callback: Callable, mode: DeliveryMode, priority: int, pass_event: bool):
+        if inspect.ismethod(callback):
+            self._ref = weakref.WeakMethod(callback)
+        else:
+            self._ref = lambda: callback
+        self.mode = mode
+        self.priority = priority
+        self.pass_event = pass_event
+        self.name = _callback_name(callback)
+
+    def resolve(self) -> Optional[Callable]:
+        """返回回调函数，对象已被销毁时返回 None"""
+        return self._ref()
+
+
+class _Channel:
+    """一个事件类型的监听器列表和排队事件"""
+    __slots__ = ('subscribers', 'queue')
+
+    def __init__(self):
+        # 按优先级排序的不可变元组，分发时无需复制
+        self.subscribers: Tuple[_Subscriber, ...] = ()
+        # 其他线程发送、等待主线程处理的事件: (-优先级, 序号, 事件)
+        self.queue: List[tuple] = []
 
 
 class EventBus(QObject):
+    """
+    应用级事件总线，插件和界面共用
+
+    每种事件类型是一个通道，监听器按优先级排序，并按各自的 DeliveryMode 执行。
+    其他线程发送给 QUEUED 监听器的事件放入通道的优先级队列，由主线程批量处理。
+    监听器执行超时由一个看门狗线程统一检查。
+
+    高频事件可以通过 set_coalescing 开启合并：时间窗口内的同类事件只分发一次。
+    每个事件类型和监听器的发送次数、排队延迟和处理耗时记录在 metrics 中，见 get_metrics。
+    """
+
+    # 有排队事件等待处理时唤醒主线程
+    _wake = pyqtSignal()
+    # 其他线程中开始合并事件时，请求主线程启动合并窗口定时器
+    _flush_requested = pyqtSignal(str)
+
+    # 主线程一次处理排队事件的最长时间（秒），超过后让出事件循环
+    DRAIN_BUDGET = 0.05
+
     def __init__(self):
         super().__init__()
-        self._subscribers = {}
+        self._channels: Dict[str, _Channel] = {}
         self._logger = logging.getLogger(__name__)
-        self._thread_pool = QThreadPool.globalInstance()
         self._timeout = 5000  # 每个监听器的最大执行时间（毫秒）
+        self._thread_ident = threading.get_ident()
+
+        # 排队事件
+        self._queue_lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._wake_pending = False
+
+        # 工作线程池，第一次有 POOL 监听器时创建
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+        # 正在执行的监听器: [事件类型, 回调名称, 开始时间, 是否已告警]
+        self._running: List[list] = []
+        self._watchdog: Optional[threading.Thread] = None
+        self._watchdog_stop = threading.Event()
+
+        # 事件合并: 事件类型 -> (窗口毫秒数, 合并函数)；待分发: 事件类型 -> [首个事件, 合并后的数据, 合并数量]
+        self._coalescing: Dict[str, tuple] = {}
+        self._pending: Dict[str, list] = {}
+        self._pending_lock = threading.Lock()
 
-    def subscribe(self, event_type: str, callback: Callable):
+        # 性能统计，可通过 metrics_enabled 关闭
+        self.metrics = EventMetrics()
+        self.metrics_enabled = True
+        self._dump_thread: Optional[threading.Thread] = None
+        self._dump_stop = threading.Event()
+
+        self._wake.connect(self._drain, Qt.ConnectionType.QueuedConnection)
+        self._flush_requested.connect(self._start_flush_timer, Qt.ConnectionType.QueuedConnection)
+
+    def subscribe(self, event_type: str, callback: Callable,
+                  mode: DeliveryMode = DeliveryMode.QUEUED,
+                  priority: int = Priority.NORMAL,
+                  pass_event: bool = False):
         """
         订阅事件
-        
+
         Args:
             event_type: 事件类型
-            callback: 回调函数
+            callback: 回调函数，绑定方法只保存弱引用
+            mode: 执行方式
+            priority: 优先级，同一事件的监听器按优先级从高到低调用
+            pass_event: 为 True 时回调接收 Event 对象，否则接收事件数据（无数据时不带参数）
         """
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
-        self._subscribers[event_type].append(callback)
+        channel = self._channels.setdefault(event_type, _Channel())
+        subscriber = _Subscriber(callback, mode, priority, pass_event)
+        channel.subscribers = tuple(sorted(
+            channel.subscribers + (subscriber,), key=lambda s: -s.priority
+        ))
+        self._ensure_watchdog()
         self._logger.debug(f"已订阅事件 {event_type}")
 
     def unsubscribe(self, event_type: str, callback: Callable):
         """
         取消订阅事件
-        
+
         Args:
             event_type: 事件类型
             callback: 回调函数
         """
-        if event_type in self._subscribers:
-            self._subscribers[event_type].remove(callback)
-            self._logger.debug(f"已取消订阅事件 {event_type}")
+        channel = self._channels.get(event_type)
+        if channel is None:
+            return
+        channel.subscribers = tuple(
+            s for s in channel.subscribers if s.resolve() not in (None, callback)
+        )
+        self._logger.debug(f"已取消订阅事件 {event_type}")
 
-    def emit(self, event_type: str, data: Dict = None):
+    def emit(self, event: Union[str, Event], data: Any = None,
+             source: Optional[str] = None, priority: int = Priority.NORMAL):
         """
         发送事件
-        
+
+        Args:
+            event: 事件类型或 Event 对象
+            data: 事件数据（event 为事件类型时使用）
+            source: 事件来源，通常是插件名称
+            priority: 事件优先级，排队时高优先级的事件先处理
+        """
+        event_type = event.type if isinstance(event, Event) else event
+        if self.metrics_enabled:
+            self.metrics.record_emit(event_type)
+        channel = self._channels.get(event_type)
+        if channel is None or not channel.subscribers:
+            return
+        if not isinstance(event, Event):
+            event = Event(event_type, data, source, priority)
+        if event_type in self._coalescing:
+            self._coalesce(event)
+        else:
+            self._dispatch(event)
+
+    def _dispatch(self, event: Event):
+        """按监听器的执行方式分发事件"""
+        channel = self._channels.get(event.type)
+        if channel is None:
+            return
+        on_bus_thread = threading.get_ident() == self._thread_ident
+        needs_queue = False
+        for subscriber in channel.subscribers:
+            if subscriber.mode is DeliveryMode.SYNC:
+                self._invoke(subscriber, event)
+            elif subscriber.mode is DeliveryMode.POOL:
+                self._get_pool().submit(self._invoke, subscriber, event)
+            elif on_bus_thread:
+                self._invoke(subscriber, event)
+            else:
+                needs_queue = True
+        if needs_queue:
+            self._enqueue(channel, event)
+
+    def _enqueue(self, channel: _Channel, event: Event):
+        """把事件放入通道队列，必要时唤醒主线程"""
+        with self._queue_lock:
+            heapq.heappush(channel.queue, (-event.priority, next(self._sequence), event))
+            wake = not self._wake_pending
+            self._wake_pending = True
+        if wake:
+            self._wake.emit()
+
+    def _pop_queued(self) -> Optional[Event]:
+        """从所有通道中取出优先级最高的排队事件"""
+        with self._queue_lock:
+            best = None
+            for channel in self._channels.values():
+                if channel.queue and (best is None or channel.queue[0] < best.queue[0]):
+                    best = channel
+            if best is None:
+                self._wake_pending = False
+                return None
+            return heapq.heappop(best.queue)[2]
+
+    def _drain(self):
+        """在主线程中处理排队的事件，超出时间预算时让出事件循环"""
+        deadline = time.perf_counter() + self.DRAIN_BUDGET
+        while True:
+            event = self._pop_queued()
+            if event is None:
+                return
+            channel = self._channels.get(event.type)
+            for subscriber in channel.subscribers if channel else ():
+                if subscriber.mode is DeliveryMode.QUEUED:
+                    self._invoke(subscriber, event)
+            if time.perf_counter() > deadline:
+                self._wake.emit()
+                return
+
+    def _invoke(self, subscriber: _Subscriber, event: Event):
+        """调用单个监听器，记录执行时间"""
+        callback = subscriber.resolve()
+        if callback is None:
+            # 监听器所属对象已被销毁
+            self._remove_dead(event.type)
+            return
+        entry = [event.type, subscriber.name, time.perf_counter(), False]
+        self._running.append(entry)
+        failed = False
+        try:
+            if subscriber.pass_event:
+                callback(event)
+            elif event.data is not None:
+                callback(event.data)
+            else:
+                callback()
+        except Exception as e:
+            failed = True
+            self._logger.error(f"处理事件 {event.type} 时出错: {str(e)}")
+            self._logger.debug(traceback.format_exc())
+        finally:
+            self._running.remove(entry)
+        elapsed = (time.perf_counter() - entry[2]) * 1000
+        if self.metrics_enabled:
+            queue_delay = (entry[2] - event.timestamp) * 1000
+            owner = event.source or (event.plugin_name if isinstance(event, PluginEvent) else None)
+            self.metrics.record_call(event.type, subscriber.name, queue_delay, elapsed, failed, owner)
+        if elapsed > self._timeout:
+            self._logger.warning(f"事件 {event.type} 的监听器 {subscriber.name} 处理超时 ({elapsed:.0f}ms)")
+
+    def _remove_dead(self, event_type: str):
+        """移除已失效的弱引用监听器"""
+        channel = self._channels.get(event_type)
+        if channel is not None:
+            channel.subscribers = tuple(s for s in channel.subscribers if s.resolve() is not None)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """获取执行 POOL 监听器的线程池"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="EventBus")
+        return self._pool
+
+    def set_coalescing(self, event_type: str, window_ms: int = 50, reducer: Optional[Reducer] = None):
+        """
+        开启事件合并
+
+        第一次发送后 window_ms 毫秒内的同类事件合并为一次分发。
+        默认只保留最后一次的数据，指定 reducer 时按 reducer 合并，例如 batch_reducer 收集为列表。
+
         Args:
             event_type: 事件类型
-            data: 事件数据
+            window_ms: 合并窗口（毫秒）
+            reducer: 合并函数
         """
-        if event_type in self._subscribers:
-            for callback in self._subscribers[event_type]:
-                # 创建任务在主线程中执行回调
-                class CallbackTask(QRunnable):
-                    def __init__(self, callback, data, logger):
-                        super().__init__()
-                        self.callback = callback
-                        self.data = data
-                        self.logger = logger
-                        self.is_finished = False
-
-                    def run(self):
-                        # 确保在主线程中执行回调
-                        def execute_in_main_thread():
-                            try:
-                                if self.data:
-                                    self.callback(self.data)
-                                else:
-                                    self.callback()
-                                self.logger.debug(f"事件 {event_type} 处理成功")
-                            except Exception as e:
-                                self.logger.error(f"处理事件 {event_type} 时出错: {str(e)}")
-                                self.logger.debug(traceback.format_exc())
-                            finally:
-                                self.is_finished = True
-
-                        QTimer.singleShot(0, execute_in_main_thread)
-
-                # 创建并启动任务
-                task = CallbackTask(callback, data, self._logger)
-                self._thread_pool.start(task)
-
-                # 设置超时检查
-                timer = QTimer()
-                timer.setSingleShot(True)
-                timer.timeout.connect(
-                    lambda: self._check_timeout(task, event_type)
-                )
-                timer.start(self._timeout)
-
-    def _check_timeout(self, task, event_type: str):
-        """检查任务是否超时"""
-        if not task.is_finished:
-            self._logger.warning(f"事件 {event_type} 处理超时 ({self._timeout}ms)")
+        self._coalescing[event_type] = (window_ms, reducer)
+
+    def clear_coalescing(self, event_type: str):
+        """关闭事件合并，已在窗口中的事件仍会按时分发"""
+        self._coalescing.pop(event_type, None)
+
+    def _coalesce(self, event: Event):
+        """把事件合并到待分发事件中，窗口内的第一个事件负责启动定时器"""
+        window_ms, reducer = self._coalescing[event.type]
+        with self._pending_lock:
+            pending = self._pending.get(event.type)
+            first = pending is None
+            if first:
+                merged = reducer(None, event.data) if reducer else event.data
+                self._pending[event.type] = [event, merged, 1]
+            else:
+                pending[1] = reducer(pending[1], event.data) if reducer else event.data
+                pending[2] += 1
+        if not first:
+            return
+        if threading.get_ident() == self._thread_ident:
+            self._start_flush_timer(event.type)
+        else:
+            self._flush_requested.emit(event.type)
+
+    def _start_flush_timer(self, event_type: str):
+        """在主线程中启动合并窗口定时器"""
+        window_ms = self._coalescing.get(event_type, (0, None))[0]
+        QTimer.singleShot(window_ms, lambda: self._flush(event_type))
+
+    def _flush(self, event_type: str):
+        """分发合并窗口内累积的事件"""
+        with self._pending_lock:
+            pending = self._pending.pop(event_type, None)
+        if pending is None:
+            return
+        # 沿用第一个事件（保留其发送时间），数据替换为合并结果
+        event, data, count = pending
+        self._logger.debug(f"事件 {event_type} 合并了 {count} 次发送")
+        event.data = data
+        self._dispatch(event)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取事件总线的性能统计，格式见 EventMetrics.snapshot"""
+        return self.metrics.snapshot()
+
+    def reset_metrics(self):
+        """清空性能统计"""
+        self.metrics.reset()
+
+    def start_metrics_dump(self, interval: float = 60, path: Optional[str] = None):
+        """
+        定期输出性能统计
+
+        Args:
+            interval: 输出间隔（秒）
+            path: 写入的 JSON 文件路径，为 None 时写入日志（只输出最慢的监听器）
+        """
+        self.stop_metrics_dump()
+        self._dump_stop.clear()
+        self._dump_thread = threading.Thread(
+            target=self._dump_metrics_loop, args=(interval, path), name="EventBusMetrics", daemon=True
+        )
+        self._dump_thread.start()
+
+    def stop_metrics_dump(self):
+        """停止定期输出性能统计"""
+        self._dump_stop.set()
+        if self._dump_thread is not None:
+            self._dump_thread.join(timeout=1)
+            self._dump_thread = None
+
+    def _dump_metrics_loop(self, interval: float, path: Optional[str]):
+        while not self._dump_stop.wait(interval):
+            try:
+                if path:
+                    with open(path, 'w', encoding='utf-8') as f:
+                        json.dump(self.get_metrics(), f, ensure_ascii=False, indent=2)
+                else:
+                    self._logger.info(f"事件总线统计: {json.dumps(self.metrics.slowest(), ensure_ascii=False)}")
+            except Exception as e:
+                self._logger.error(f"输出事件总线统计时出错: {str(e)}")
+
+    def _ensure_watchdog(self):
+        """启动超时检查线程，整个事件总线只有一个"""
+        if self._watchdog is not None and self._watchdog.is_alive():
+            return
+        self._watchdog_stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="EventBusWatchdog", daemon=True)
+        self._watchdog.start()
+
+    def _watch(self):
+        """定期检查正在执行的监听器，超时时告警一次"""
+        # 检查间隔为超时时间的五分之一
+        while not self._watchdog_stop.wait(max(self._timeout / 5000, 0.05)):
+            now = time.perf_counter()
+            for entry in list(self._running):
+                event_type, name, started, warned = entry
+                if not warned and (now - started) * 1000 > self._timeout:
+                    entry[3] = True
+                    self._logger.warning(f"事件 {event_type} 的监听器 {name} 执行超过 {self._timeout}ms，仍未返回")
 
     def clear(self):
         """清除所有订阅"""
-        self._subscribers.clear()
+        self._channels.clear()
+        with self._pending_lock:
+            self._pending.clear()
         self._logger.debug("已清除所有事件订阅")
 
     def shutdown(self):
         """关闭事件总线"""
-        self._thread_pool.waitForDone()
+        self.stop_metrics_dump()
+        self._watchdog_stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
         self._logger.debug("事件总线已关闭")
+
+
+_default_bus: Optional[EventBus] = None
+_default_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """获取应用共享的事件总线，第一次调用时在当前线程（应为主线程）创建"""
+    global _default_bus
+    with _default_bus_lock:
+        if _default_bus is None:
+            _default_bus = EventBus()
+        return _default_bus
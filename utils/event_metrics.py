@@ -0,0 +1,182 @@
+# event_metrics.py
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional, Tuple
+import threading
+
+# 直方图的桶上限（毫秒），按对数间隔划分，最后一个桶收集所有更大的值
+BUCKET_BOUNDS_MS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class Histogram:
+    """固定分桶的耗时直方图，记录一次只需一次二分查找"""
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value_ms: float) -> None:
+        self.counts[bisect_left(BUCKET_BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, p: float) -> float:
+        """估算百分位数，返回所在桶的上限（不超过最大值，毫秒）"""
+        if self.count == 0:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(BUCKET_BOUNDS_MS[index], self.max) if index < len(BUCKET_BOUNDS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 4) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max, 4),
+            'buckets': {
+                (f"<={bound}" if index < len(BUCKET_BOUNDS_MS) else f">{BUCKET_BOUNDS_MS[-1]}"): count
+                for index, (bound, count) in enumerate(zip(BUCKET_BOUNDS_MS + (None,), self.counts))
+                if count
+            }
+        }
+
+
+class _TopicMetrics:
+    """单个事件类型的统计"""
+    __slots__ = ('emits', 'queue_delay', 'handler_time')
+
+    def __init__(self):
+        self.emits = 0
+        self.queue_delay = Histogram()
+        self.handler_time = Histogram()
+
+
+class _SubscriberMetrics:
+    """单个监听器（按事件类型区分）的统计"""
+    __slots__ = ('errors', 'queue_delay', 'handler_time')
+
+    def __init__(self):
+        self.errors = 0
+        self.queue_delay = Histogram()
+        self.handler_time = Histogram()
+
+
+class EventMetrics:
+    """
+    事件总线的性能统计
+
+    按事件类型记录发送次数、排队延迟和处理耗时，按监听器记录排队延迟、处理耗时和错误次数。
+    排队延迟是从发送（合并事件为窗口内第一次发送）到监听器开始执行的时间。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._topics: Dict[str, _TopicMetrics] = {}
+        self._subscribers: Dict[Tuple[str, str], _SubscriberMetrics] = {}
+        # 按事件所属插件（事件的 source 或 PluginEvent 的 plugin_name）累计的 [处理次数, 处理耗时]
+        self._owners: Dict[str, list] = {}
+
+    def record_emit(self, event_type: str) -> None:
+        with self._lock:
+            topic = self._topics.get(event_type)
+            if topic is None:
+                topic = self._topics[event_type] = _TopicMetrics()
+            topic.emits += 1
+
+    def record_call(self, event_type: str, subscriber: str, queue_delay_ms: float,
+                    handler_ms: float, failed: bool = False, owner: Optional[str] = None) -> None:
+        with self._lock:
+            if owner:
+                totals = self._owners.get(owner)
+                if totals is None:
+                    totals = self._owners[owner] = [0, 0.0]
+                totals[0] += 1
+                totals[1] += handler_ms
+
+            topic = self._topics.get(event_type)
+            if topic is None:
+                topic = self._topics[event_type] = _TopicMetrics()
+            topic.queue_delay.record(queue_delay_ms)
+            topic.handler_time.record(handler_ms)
+
+            key = (event_type, subscriber)
+            metrics = self._subscribers.get(key)
+            if metrics is None:
+                metrics = self._subscribers[key] = _SubscriberMetrics()
+            metrics.queue_delay.record(queue_delay_ms)
+            metrics.handler_time.record(handler_ms)
+            if failed:
+                metrics.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取当前统计
+
+        Returns:
+            {'topics': {事件类型: {...}}, 'subscribers': [{'event_type', 'subscriber', ...}],
+             'owners': {插件名: {'calls', 'total_ms'}}}，监听器按总处理耗时从高到低排序
+        """
+        with self._lock:
+            topics = {
+                event_type: {
+                    'emits': topic.emits,
+                    'queue_delay': topic.queue_delay.to_dict(),
+                    'handler_time': topic.handler_time.to_dict()
+                }
+                for event_type, topic in self._topics.items()
+            }
+            subscribers = [
+                {
+                    'event_type': event_type,
+                    'subscriber': name,
+                    'calls': metrics.handler_time.count,
+                    'errors': metrics.errors,
+                    'total_ms': round(metrics.handler_time.total, 4),
+                    'queue_delay': metrics.queue_delay.to_dict(),
+                    'handler_time': metrics.handler_time.to_dict()
+                }
+                for (event_type, name), metrics in self._subscribers.items()
+            ]
+            owners = {
+                owner: {'calls': calls, 'total_ms': round(total, 4)}
+                for owner, (calls, total) in self._owners.items()
+            }
+        subscribers.sort(key=lambda item: item['total_ms'], reverse=True)
+        return {'topics': topics, 'subscribers': subscribers, 'owners': owners}
+
+    def owner_time(self, owner: str) -> float:
+        """插件相关事件的监听器累计处理耗时（毫秒），供插件监视器计算单次运行的增量"""
+        with self._lock:
+            totals = self._owners.get(owner)
+            return totals[1] if totals else 0.0
+
+    def slowest(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """返回总处理耗时最高的监听器的简要信息"""
+        return [
+            {
+                'event_type': item['event_type'],
+                'subscriber': item['subscriber'],
+                'calls': item['calls'],
+                'total_ms': item['total_ms'],
+                'p95_ms': item['handler_time']['p95_ms'],
+                'max_ms': item['handler_time']['max_ms']
+            }
+            for item in self.snapshot()['subscribers'][:limit]
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._topics.clear()
+            self._subscribers.clear()
+            self._owners.clear()
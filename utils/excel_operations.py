@@ -1,12 +1,15 @@
-import pandas as pd
 from PyQt6.QtCore import QAbstractTableModel, Qt, QSortFilterProxyModel, QPoint
 from PyQt6.QtWidgets import (QTableView, QHeaderView, QMenu, QLineEdit, QWidget, 
                           QVBoxLayout, QWidgetAction, QPushButton, QHBoxLayout)
 from PyQt6.QtGui import QColor
 from globals import GlobalState
 from utils.error_handler import ErrorHandler
+from utils.lazy_import import lazy_import
 import logging
 
+# pandas 只在读写文件时使用，延迟导入以加快启动
+pd = lazy_import('pandas')
+
 class ColumnFilterWidget(QWidget):
     def __init__(self, proxy_model, column, parent=None):
         super().__init__(parent)
@@ -0,0 +1,78 @@
+# lazy_import.py
+"""
+重型依赖的延迟导入
+
+pandas、numpy、openpyxl 导入需要几百毫秒，只在打开文件后才用到。模块级使用
+
+    openpyxl = lazy_import('openpyxl')
+
+代替 import openpyxl，第一次访问属性时才真正导入；主窗口显示后再调用 warm_up 在后台线程预先导入，
+打开文件时通常已经导入完成。只用于类型注解的导入放在 TYPE_CHECKING 中。
+"""
+import importlib
+import logging
+import sys
+import threading
+import time
+from typing import Any, Optional
+
+# 启动后在后台预先导入的模块，按依赖顺序排列
+HEAVY_MODULES = ('numpy', 'openpyxl', 'pandas')
+
+
+class LazyModule:
+    """模块代理，第一次访问属性时导入模块"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self) -> Any:
+        if self._module is None:
+            # import_module 自带导入锁，多线程同时访问时只导入一次
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    @property
+    def loaded(self) -> bool:
+        """模块是否已导入"""
+        return self._module is not None or self._name in sys.modules
+
+    def __repr__(self) -> str:
+        state = '已导入' if self.loaded else '未导入'
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """返回延迟导入的模块代理"""
+    return LazyModule(name)
+
+
+def warm_up(*names: str) -> Optional[threading.Thread]:
+    """
+    在后台线程中依次导入模块，不指定时导入 HEAVY_MODULES
+
+    Returns:
+        导入线程，所有模块都已导入时返回 None
+    """
+    pending = [name for name in (names or HEAVY_MODULES) if name not in sys.modules]
+    if not pending:
+        return None
+
+    logger = logging.getLogger(__name__)
+
+    def run():
+        for name in pending:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                logger.info(f"后台导入 {name} 耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+            except ImportError as e:
+                logger.warning(f"后台导入 {name} 失败: {str(e)}")
+
+    thread = threading.Thread(target=run, name='LazyImportWarmUp', daemon=True)
+    thread.start()
+    return thread
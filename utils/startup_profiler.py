@@ -0,0 +1,255 @@
+# startup_profiler.py
+"""
+启动性能分析
+
+设置环境变量 STARTUP_PROFILE=1 或使用 --profile-startup 参数启动时，记录各启动阶段的耗时
+和每个模块的导入耗时，启动完成后写入 logs/startup_profile.json，并与预算文件比较：
+
+    python main.py --profile-startup
+    python -m utils.startup_profiler logs/startup_profile.json            # 检查是否超出预算
+    python -m utils.startup_profiler logs/startup_profile.json --update   # 用本次结果更新预算
+
+本模块只依赖标准库，需要在其他模块之前导入，才能记录到全部导入耗时。
+"""
+import builtins
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+PROFILE_ENV = 'STARTUP_PROFILE'
+PROFILE_ARG = '--profile-startup'
+REPORT_PATH = os.path.join('logs', 'startup_profile.json')
+BUDGET_PATH = 'startup_budget.json'
+BUDGET_TOLERANCE = 0.2  # 超出预算 20% 以上才算回退，避免机器负载的波动
+BUDGET_MIN_MS = 5.0  # 超出不到 5ms 的耗时忽略，避免很短的阶段误报
+TOP_IMPORTS = 30
+
+
+class StartupProfiler:
+    """记录启动阶段和模块导入耗时，未启用时所有方法都是空操作"""
+
+    def __init__(self):
+        self.enabled = False
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._phases: List[Dict[str, Any]] = []
+        self._open_phases: Dict[str, float] = {}
+        self._imports: Dict[str, Dict[str, float]] = {}
+        self._original_import = None
+
+    def enable(self) -> None:
+        """开始记录，替换 __import__ 以统计模块导入耗时"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def disable(self) -> None:
+        """停止记录导入耗时"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # 已导入的模块直接返回，只统计第一次导入
+        if level == 0 and name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)  # 子模块导入的累计耗时
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            if elapsed > 0.01:
+                module = name if level == 0 else self._resolve_name(name, globals, level)
+                with self._lock:
+                    record = self._imports.setdefault(module, {'cumulative_ms': 0.0, 'self_ms': 0.0})
+                    record['cumulative_ms'] += elapsed
+                    record['self_ms'] += max(elapsed - children, 0.0)
+
+    @staticmethod
+    def _resolve_name(name: str, globals, level: int) -> str:
+        """把相对导入转换为完整模块名"""
+        package = (globals or {}).get('__package__') or ''
+        try:
+            return importlib.util.resolve_name('.' * level + name, package)
+        except (ImportError, ValueError):
+            return '.' * level + name
+
+    def begin(self, name: str) -> None:
+        """开始一个阶段，用于开始和结束不在同一个调用中的阶段"""
+        if self.enabled:
+            with self._lock:
+                self._open_phases[name] = time.perf_counter()
+
+    def end(self, name: str) -> None:
+        """结束 begin 开始的阶段"""
+        if not self.enabled:
+            return
+        with self._lock:
+            start = self._open_phases.pop(name, None)
+            if start is not None:
+                self._add_phase(name, start, time.perf_counter())
+
+    @contextmanager
+    def phase(self, name: str):
+        """记录一个阶段的耗时"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._add_phase(name, start, time.perf_counter())
+
+    def _add_phase(self, name: str, start: float, end: float) -> None:
+        self._phases.append({
+            'name': name,
+            'start_ms': round((start - self._start) * 1000, 2),
+            'duration_ms': round((end - start) * 1000, 2),
+            'thread': threading.current_thread().name
+        })
+
+    def report(self) -> Dict[str, Any]:
+        """
+        生成启动报告
+
+        Returns:
+            {'total_ms', 'phases': [...], 'imports': [...]}，导入按累计耗时从高到低排列
+        """
+        with self._lock:
+            phases = sorted(self._phases, key=lambda item: item['start_ms'])
+            imports = [
+                {'module': module, 'cumulative_ms': round(record['cumulative_ms'], 2),
+                 'self_ms': round(record['self_ms'], 2)}
+                for module, record in self._imports.items()
+            ]
+        imports.sort(key=lambda item: item['cumulative_ms'], reverse=True)
+        return {
+            'total_ms': round((time.perf_counter() - self._start) * 1000, 2),
+            'phases': phases,
+            'imports': imports[:TOP_IMPORTS]
+        }
+
+    def finish(self, report_path: str = REPORT_PATH, budget_path: str = BUDGET_PATH) -> Optional[Dict[str, Any]]:
+        """启动完成时调用：停止统计导入，写入报告和日志，并检查预算"""
+        if not self.enabled:
+            return None
+        self.disable()
+        report = self.report()
+        logger = logging.getLogger(__name__)
+
+        os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(format_report(report))
+
+        if os.path.exists(budget_path):
+            for violation in check_budget(report, load_budget(budget_path)):
+                logger.warning(f"启动耗时超出预算: {violation}")
+        return report
+
+
+def format_report(report: Dict[str, Any], top: int = 10) -> str:
+    """把启动报告格式化为便于阅读的文本"""
+    lines = [f"启动总耗时 {report['total_ms']:.1f}ms", "阶段:"]
+    for phase in report['phases']:
+        lines.append(f"  {phase['start_ms']:>9.1f}ms  {phase['duration_ms']:>9.1f}ms  {phase['name']}")
+    lines.append("导入耗时最高的模块（累计/自身）:")
+    for item in report['imports'][:top]:
+        lines.append(f"  {item['cumulative_ms']:>9.1f}ms  {item['self_ms']:>9.1f}ms  {item['module']}")
+    return '\n'.join(lines)
+
+
+def make_budget(report: Dict[str, Any]) -> Dict[str, Any]:
+    """用启动报告生成预算：总耗时、各阶段耗时和耗时最高模块的累计导入耗时"""
+    return {
+        'total_ms': report['total_ms'],
+        'phases': {phase['name']: phase['duration_ms'] for phase in report['phases']},
+        'imports': {item['module']: item['cumulative_ms'] for item in report['imports'][:10]}
+    }
+
+
+def load_budget(path: str = BUDGET_PATH) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_budget(report: Dict[str, Any], budget: Dict[str, Any],
+                 tolerance: float = BUDGET_TOLERANCE) -> List[str]:
+    """
+    检查启动报告是否超出预算
+
+    Returns:
+        超出预算的项目说明，没有回退时返回空列表
+    """
+    violations = []
+
+    def check(name: str, actual: float, limit: Optional[float]):
+        if limit is not None and actual > limit * (1 + tolerance) and actual - limit > BUDGET_MIN_MS:
+            violations.append(f"{name}: {actual:.1f}ms > 预算 {limit:.1f}ms")
+
+    check('总耗时', report['total_ms'], budget.get('total_ms'))
+    phase_budget = budget.get('phases', {})
+    for phase in report['phases']:
+        check(f"阶段 {phase['name']}", phase['duration_ms'], phase_budget.get(phase['name']))
+    import_budget = budget.get('imports', {})
+    for item in report['imports']:
+        check(f"导入 {item['module']}", item['cumulative_ms'], import_budget.get(item['module']))
+    return violations
+
+
+def is_requested(argv: Optional[List[str]] = None) -> bool:
+    """是否通过环境变量或命令行参数请求了启动分析"""
+    argv = sys.argv if argv is None else argv
+    return os.environ.get(PROFILE_ENV, '') not in ('', '0') or PROFILE_ARG in argv
+
+
+# 全局分析器，main.py 在导入其他模块之前启用
+profiler = StartupProfiler()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='检查启动报告是否超出预算')
+    parser.add_argument('report', nargs='?', default=REPORT_PATH, help='启动报告路径')
+    parser.add_argument('--budget', default=BUDGET_PATH, help='预算文件路径')
+    parser.add_argument('--update', action='store_true', help='用本次报告更新预算')
+    parser.add_argument('--tolerance', type=float, default=BUDGET_TOLERANCE, help='允许超出预算的比例')
+    args = parser.parse_args(argv)
+
+    with open(args.report, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    print(format_report(report))
+
+    if args.update:
+        with open(args.budget, 'w', encoding='utf-8') as f:
+            json.dump(make_budget(report), f, ensure_ascii=False, indent=2)
+        print(f"已更新预算: {args.budget}")
+        return 0
+
+    violations = check_budget(report, load_budget(args.budget), args.tolerance)
+    for violation in violations:
+        print(f"超出预算: {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())